@@ -1,7 +1,82 @@
+"""GameWorldNavigator
+
+公开的名称在第一次访问时才导入所在的子模块，导入包本身不会加载OpenCV、OCR模型或Windows相关的模块，
+image_recognition、core以及离线工具(bundle、calibrate、replay)在任何平台上都可以直接使用。
+"""
+import importlib
+from typing import TYPE_CHECKING
+
 from . import config
-from .keyboard_mouse_simulation import (mouse_scroll, mouse_move_to, mouse_click_position, mouse_drag,
-                                        keyboard_up, keyboard_down, keyboard_press)
-from .image_recognition import match_template, where_img
-from .game_controller import Game, GameController
-from .ocr_recognition import get_text_position, text_in_img
-from .exception import TemplateMathingFailure, TextMatchingFailure, WindowOutOfBoundsError
+
+_LAZY = {
+    # clock
+    "Clock": "clock", "RealClock": "clock", "VirtualClock": "clock", "get_clock": "clock", "set_clock": "clock",
+    # keyboard_mouse_simulation
+    "mouse_scroll": "keyboard_mouse_simulation", "mouse_move_to": "keyboard_mouse_simulation",
+    "mouse_click_position": "keyboard_mouse_simulation", "mouse_drag": "keyboard_mouse_simulation",
+    "keyboard_up": "keyboard_mouse_simulation", "keyboard_down": "keyboard_mouse_simulation",
+    "keyboard_press": "keyboard_mouse_simulation",
+    # image_recognition
+    "match_template": "image_recognition", "match_template_multiscale": "image_recognition",
+    "where_img": "image_recognition", "load_template": "image_recognition", "IconLibrary": "image_recognition",
+    "TemplateScaler": "image_recognition",
+    # bundle
+    "TemplateBundle": "bundle", "compile_bundle": "bundle", "get_bundle": "bundle", "set_bundle": "bundle",
+    # game_controller
+    "Game": "game_controller", "GameController": "game_controller",
+    "ControllerPool": "pool",
+    "FlightRecorder": "recorder",
+    "ReplayGame": "replay", "ReplayInput": "replay",
+    # watcher
+    "WatcherSet": "watcher", "TemplateWatcher": "watcher", "ChangeWatcher": "watcher", "PixelWatcher": "watcher",
+    "TextWatcher": "watcher",
+    "ProbeSet": "probe", "BarProbe": "probe",
+    "ControllerClient": "rpc",
+    "ControllerServer": "server",
+    "Tracer": "trace", "get_tracer": "trace", "set_tracer": "trace",
+    # policy
+    "WaitPolicy": "policy", "FixedPolicy": "policy", "BackoffPolicy": "policy", "FastThenRelax": "policy",
+    "poll": "policy",
+    "LatencyMeter": "latency",
+    # ocr_recognition
+    "get_text_position": "ocr_recognition", "text_in_img": "ocr_recognition", "IncrementalOCR": "ocr_recognition",
+    # exception
+    "TemplateMathingFailure": "exception", "TextMatchingFailure": "exception", "WindowOutOfBoundsError": "exception",
+}
+
+__all__ = ["config", *_LAZY]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # 之后的访问不再经过__getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+if TYPE_CHECKING:
+    from .clock import Clock, RealClock, VirtualClock, get_clock, set_clock
+    from .keyboard_mouse_simulation import (mouse_scroll, mouse_move_to, mouse_click_position, mouse_drag,
+                                            keyboard_up, keyboard_down, keyboard_press)
+    from .image_recognition import (match_template, match_template_multiscale, where_img, load_template,
+                                    IconLibrary, TemplateScaler)
+    from .bundle import TemplateBundle, compile_bundle, get_bundle, set_bundle
+    from .game_controller import Game, GameController
+    from .pool import ControllerPool
+    from .recorder import FlightRecorder
+    from .replay import ReplayGame, ReplayInput
+    from .watcher import WatcherSet, TemplateWatcher, ChangeWatcher, PixelWatcher, TextWatcher
+    from .probe import ProbeSet, BarProbe
+    from .rpc import ControllerClient
+    from .server import ControllerServer
+    from .trace import Tracer, get_tracer, set_tracer
+    from .policy import WaitPolicy, FixedPolicy, BackoffPolicy, FastThenRelax, poll
+    from .latency import LatencyMeter
+    from .ocr_recognition import get_text_position, text_in_img, IncrementalOCR
+    from .exception import TemplateMathingFailure, TextMatchingFailure, WindowOutOfBoundsError
@@ -0,0 +1,15 @@
+"""平台后端
+
+窗口查找、前台切换和截图等依赖操作系统的代码放在这里，只有在创建真实的Game时才会导入，
+图像识别、回放、校准等离线功能在任何平台上都不需要加载它们。
+"""
+import sys
+from types import ModuleType
+
+
+def get_backend() -> ModuleType:
+    """ 当前平台的窗口后端模块 """
+    if sys.platform == "win32":
+        from . import win32
+        return win32
+    raise OSError(f"live game windows are not supported on {sys.platform}, use replay.ReplayGame instead")
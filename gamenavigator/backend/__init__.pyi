@@ -0,0 +1,4 @@
+from types import ModuleType
+
+
+def get_backend() -> ModuleType: ...
@@ -0,0 +1,72 @@
+"""Windows窗口后端
+"""
+import ctypes
+from typing import Optional, Tuple
+
+import cv2
+import win32api
+import win32con
+import win32gui
+import win32print
+from PIL import ImageGrab
+from numpy import ndarray, array
+
+
+def get_screen_size() -> Tuple[int, int]:
+    """ 电脑缩放后的分辨率 """
+    w = win32api.GetSystemMetrics(0)
+    h = win32api.GetSystemMetrics(1)
+    return w, h
+
+
+def get_real_size() -> Tuple[int, int]:
+    """ 获取电脑真实分辨率 """
+    hdc = win32gui.GetDC(0)
+    w = win32print.GetDeviceCaps(hdc, win32con.DESKTOPHORZRES)
+    h = win32print.GetDeviceCaps(hdc, win32con.DESKTOPVERTRES)
+    return w, h
+
+
+def get_scaling() -> float:
+    """ 获取电脑缩放率 """
+    return round(get_real_size()[0] / get_screen_size()[0], 2)
+
+
+def find_window(window_class: Optional[str], window_name: str) -> int:
+    return win32gui.FindWindow(window_class, window_name)
+
+
+def get_window_rect(hwnd: int) -> Tuple[int, int, int, int]:
+    """ 窗口在真实分辨率下的矩形(left, top, right, bottom) """
+    x1, y1, x2, y2 = win32gui.GetWindowRect(hwnd)
+    s = get_scaling()  # 电脑缩放率
+    return int(x1 * s), int(y1 * s), int(x2 * s), int(y2 * s)
+
+
+def get_window_scaling(hwnd: int) -> float:
+    """ 窗口所在显示器的DPI缩放 """
+    return ctypes.windll.user32.GetDpiForWindow(hwnd) / 96.0
+
+
+def is_foreground(window_name: str) -> bool:
+    hwnd = win32gui.GetForegroundWindow()
+    return win32gui.GetWindowText(hwnd) == window_name
+
+
+def set_foreground(hwnd: int) -> None:
+    win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+    win32gui.SetForegroundWindow(hwnd)
+
+
+def grab(bbox: Optional[Tuple[int, int, int, int]] = None, all_screens: bool = False) -> ndarray:
+    """ 截图，返回BGR图像 """
+    img = array(ImageGrab.grab(bbox=bbox, all_screens=all_screens))
+    return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+
+
+def get_desktop_origin() -> Tuple[int, int]:
+    """ 虚拟桌面左上角坐标(多显示器时可能为负数) """
+    s = get_scaling()
+    x = win32api.GetSystemMetrics(76)  # SM_XVIRTUALSCREEN
+    y = win32api.GetSystemMetrics(77)  # SM_YVIRTUALSCREEN
+    return int(x * s), int(y * s)
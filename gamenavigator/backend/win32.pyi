@@ -0,0 +1,33 @@
+from typing import Optional, Tuple
+
+from numpy import ndarray
+
+
+def get_screen_size() -> Tuple[int, int]: ...
+
+
+def get_real_size() -> Tuple[int, int]: ...
+
+
+def get_scaling() -> float: ...
+
+
+def find_window(window_class: Optional[str], window_name: str) -> int: ...
+
+
+def get_window_rect(hwnd: int) -> Tuple[int, int, int, int]: ...
+
+
+def get_window_scaling(hwnd: int) -> float: ...
+
+
+def is_foreground(window_name: str) -> bool: ...
+
+
+def set_foreground(hwnd: int) -> None: ...
+
+
+def grab(bbox: Optional[Tuple[int, int, int, int]] = None, all_screens: bool = False) -> ndarray: ...
+
+
+def get_desktop_origin() -> Tuple[int, int]: ...
@@ -0,0 +1,203 @@
+"""模板包
+
+将一个模板目录编译成单个文件，包含每个模板的BGR、灰度、二值图以及可选的ROI和阈值。
+加载时通过numpy.memmap映射整个文件，不需要解码图片，多个进程通过系统缓存共享同一份内存。
+模板以相对路径(不含扩展名)命名，例如 inventory/sword
+
+    python -m gamenavigator.bundle templates templates.gwnb
+
+目录下的bundle.json(可选)可以为模板指定roi threshold mode method，可以由calibrate模块生成:
+    {"inventory/sword": {"roi": [0, 0, 400, 300], "threshold": 0.9, "mode": "gray"}}
+"""
+import argparse
+import json
+import os
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from . import log
+
+MAGIC = b"GWNB"
+VERSION = 1
+ALIGN = 64
+VARIANTS = ("color", "gray", "binary")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+_HEADER = struct.Struct("<4sIQ")
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def iter_templates(directory: str) -> Iterator[Tuple[str, str]]:
+    """遍历模板目录，产生(模板名称, 文件路径)，名称为不含扩展名的相对路径
+
+    Raises:
+        ValueError: 只有扩展名不同的文件(例如a.png和a.jpg)得到相同的名称
+    """
+    seen: Dict[str, str] = {}
+    for root, _, files in os.walk(directory):
+        for file in sorted(files):
+            if not file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(root, file)
+            name = os.path.splitext(os.path.relpath(path, directory))[0].replace(os.sep, "/")
+            if name in seen:
+                raise ValueError(f"templates {seen[name]} and {path} have the same name {name!r}")
+            seen[name] = path
+            yield name, path
+
+
+def compile_bundle(directory: str, output: str, thresh: int = 127) -> int:
+    """编译模板目录
+
+    Args:
+        directory (str): 模板目录
+        output (str): 输出文件
+        thresh (int): 生成二值图使用的阈值 (default 127)
+
+    Returns:
+        int: 模板数量
+    """
+    if not os.path.isdir(directory):
+        raise NotADirectoryError(directory)
+    options: Dict[str, Dict[str, Any]] = {}
+    options_path = os.path.join(directory, "bundle.json")
+    if os.path.exists(options_path):
+        with open(options_path, "r", encoding="utf-8") as f:
+            options = json.load(f)
+
+    blobs: List[np.ndarray] = []
+    entries: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for name, path in iter_templates(directory):
+        color = cv2.imread(path)
+        if color is None:
+            log.warning(f"bundle skip unreadable image {path}")
+            continue
+        gray = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(gray, thresh, 255, cv2.THRESH_BINARY)
+        entry: Dict[str, Any] = dict(options.get(name, {}))
+        for variant, data in zip(VARIANTS, (color, gray, binary)):
+            entry[variant] = dict(offset=offset, shape=list(data.shape))
+            blobs.append(data)
+            offset = _align(offset + data.nbytes)
+        entries[name] = entry
+
+    header = json.dumps(dict(thresh=thresh, templates=entries), ensure_ascii=False).encode("utf-8")
+    data_start = _align(_HEADER.size + len(header))
+    with open(output, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        f.write(b"\0" * (data_start - _HEADER.size - len(header)))
+        position = 0
+        for blob in blobs:
+            f.write(b"\0" * (_align(position) - position))
+            position = _align(position)
+            f.write(np.ascontiguousarray(blob).tobytes())
+            position += blob.nbytes
+    log.debug(f"bundle compiled {len(entries)} templates to {output}")
+    return len(entries)
+
+
+class TemplateBundle:
+    def __init__(self, path: str) -> None:
+        """
+        以memmap方式加载模板包，模板数据是只读视图
+
+        Args:
+            path (str): 模板包文件
+        """
+        with open(path, "rb") as f:
+            magic, version, length = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a template bundle")
+            if version != VERSION:
+                raise ValueError(f"unsupported bundle version {version}")
+            header = json.loads(f.read(length).decode("utf-8"))
+        self.path = path
+        self.thresh = header["thresh"]
+        self._entries: Dict[str, Dict[str, Any]] = header["templates"]
+        data_start = _align(_HEADER.size + length)
+        if os.path.getsize(path) > data_start:
+            self._data = np.memmap(path, dtype=np.uint8, mode="r", offset=data_start)
+        else:
+            self._data = np.empty(0, np.uint8)
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def get(self, name: str, mode: str = "color") -> np.ndarray:
+        """获取模板
+
+        Args:
+            name (str): 模板名称
+            mode (str): color gray binary (default color)
+        """
+        if mode not in VARIANTS:
+            raise ValueError(f"mode must in {VARIANTS}")
+        key = (name, mode)
+        array = self._cache.get(key)
+        if array is None:
+            if name not in self._entries:
+                raise KeyError(f"not have {name}")
+            variant = self._entries[name][mode]
+            shape = tuple(variant["shape"])
+            size = int(np.prod(shape))
+            array = self._data[variant["offset"]:variant["offset"] + size].reshape(shape)
+            self._cache[key] = array
+        return array
+
+    def roi(self, name: str) -> Optional[tuple]:
+        """ 模板的搜索区域(left, top, right, bottom)，没有时返回None """
+        roi = self._entries[name].get("roi")
+        return None if roi is None else tuple(roi)
+
+    def threshold(self, name: str) -> Optional[float]:
+        """ 模板的匹配阈值，没有时返回None """
+        return self._entries[name].get("threshold")
+
+    def option(self, name: str, key: str) -> Any:
+        """ 模板的其他选项(例如校准得到的mode method)，没有时返回None """
+        return self._entries[name].get(key)
+
+
+_bundle: Optional[TemplateBundle] = None
+
+
+def get_bundle() -> Optional[TemplateBundle]:
+    """ 获取默认模板包 """
+    return _bundle
+
+
+def set_bundle(bundle: Optional[TemplateBundle]) -> None:
+    """ 设置默认模板包，image_recognition和GameController会优先按名称在其中查找模板 """
+    global _bundle
+    if bundle is not None and not isinstance(bundle, TemplateBundle):
+        raise TypeError("param bundle must is TemplateBundle type")
+    _bundle = bundle
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="compile a template directory into one bundle file")
+    parser.add_argument("directory", help="template directory")
+    parser.add_argument("output", help="output bundle file")
+    parser.add_argument("--thresh", type=int, default=127, help="threshold for the binary variant")
+    args = parser.parse_args(argv)
+    count = compile_bundle(args.directory, args.output, args.thresh)
+    print(f"{count} templates -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
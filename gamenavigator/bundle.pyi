@@ -0,0 +1,56 @@
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC: bytes
+VERSION: int
+ALIGN: int
+VARIANTS: tuple[str, ...]
+IMAGE_EXTENSIONS: tuple[str, ...]
+_HEADER: struct.Struct
+
+
+def _align(n: int) -> int: ...
+
+
+def iter_templates(directory: str) -> Iterator[Tuple[str, str]]: ...
+
+
+def compile_bundle(directory: str, output: str, thresh: int = 127) -> int: ...
+
+
+class TemplateBundle:
+    path: str
+    thresh: int
+    _entries: Dict[str, Dict[str, Any]]
+    _data: np.ndarray
+    _cache: Dict[tuple, np.ndarray]
+    def __init__(self, path: str) -> None: ...
+
+    def __contains__(self, name: str) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    @property
+    def names(self) -> List[str]: ...
+
+    def get(self, name: str, mode: str = "color") -> np.ndarray: ...
+
+    def roi(self, name: str) -> Optional[tuple[int, int, int, int]]: ...
+
+    def threshold(self, name: str) -> Optional[float]: ...
+
+    def option(self, name: str, key: str) -> Any: ...
+
+
+_bundle: Optional[TemplateBundle]
+
+
+def get_bundle() -> Optional[TemplateBundle]: ...
+
+
+def set_bundle(bundle: Optional[TemplateBundle]) -> None: ...
+
+
+def main(argv: Optional[List[str]] = None) -> None: ...
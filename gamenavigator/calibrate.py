@@ -0,0 +1,198 @@
+"""模板校准
+
+在标注过的录制画面上离线运行模板匹配，为每个模板统计正样本(画面中有该模板)和负样本的匹配分数
+以及命中位置的分布，给出推荐的threshold、mode、method和紧凑的roi，写入模板目录的bundle.json，
+编译模板包后GameController会自动使用这些设置。画面在多个进程中并行匹配。
+
+标注文件为JSON，键为画面路径(相对于标注文件)，值为画面中出现的模板名称，没有列出的模板都是负样本:
+    {"frames/0001.png": ["start", "menu/close"], "frames/0002.png": []}
+
+    python -m gamenavigator.calibrate templates labels.json
+    python -m gamenavigator.bundle templates templates.gwnb
+"""
+import argparse
+import json
+import os
+from multiprocessing import Pool
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .bundle import iter_templates
+from .image_recognition import match_template
+from . import log
+
+MODES = ("gray", "binary", "color")  # 速度从快到慢, 分数相同时优先选择靠前的
+METHODS = ("TM_CCOEFF_NORMED", "TM_CCORR_NORMED")  # 只使用分数越大越好的归一化方法
+
+_templates: Dict[str, np.ndarray] = {}
+
+
+def _init_worker(templates: Dict[str, np.ndarray]) -> None:
+    global _templates
+    _templates = templates
+    cv2.setNumThreads(1)  # 并行由进程完成，避免每个进程再开多线程
+
+
+def _match_frame(path: str) -> Optional[Tuple[str, Tuple[int, int], Dict[tuple, tuple]]]:
+    """ 在一帧上匹配所有模板的所有mode和method，返回(路径, 画面大小(w, h), {(模板, mode, method): (分数, 位置)}) """
+    frame = cv2.imread(path)
+    if frame is None:
+        log.warning(f"calibrate skip unreadable frame {path}")
+        return None
+    h, w = frame.shape[:2]
+    scores: Dict[tuple, tuple] = {}
+    for name, template in _templates.items():
+        th, tw = template.shape[:2]
+        if th > h or tw > w:
+            continue
+        for mode in MODES:
+            for method in METHODS:
+                _, max_val, _, max_loc = match_template(frame, template, mode=mode, method=method)
+                if not np.isfinite(max_val):
+                    max_val = 0.0
+                scores[(name, mode, method)] = (float(max_val), (int(max_loc[0]), int(max_loc[1])))
+    return path, (w, h), scores
+
+
+def _threshold(positives: np.ndarray, negatives: np.ndarray) -> Tuple[float, float, float]:
+    """选择阈值
+
+    正负样本可以完全分开时取两者之间的中点，否则取错误最少的阈值
+
+    Returns:
+        (threshold, margin, accuracy) margin为最小正样本分数与最大负样本分数的差
+    """
+    if len(negatives) == 0:
+        # 没有负样本时略低于最小的正样本分数
+        low = float(positives.min())
+        return low - 0.05, low, 1.0
+    margin = float(positives.min() - negatives.max())
+    if margin > 0:
+        return float(positives.min() + negatives.max()) / 2, margin, 1.0
+    candidates = np.unique(np.concatenate([positives, negatives]))
+    correct = (positives[None, :] >= candidates[:, None]).sum(axis=1) + \
+              (negatives[None, :] < candidates[:, None]).sum(axis=1)
+    best = int(correct.argmax())
+    return float(candidates[best]), margin, float(correct[best]) / (len(positives) + len(negatives))
+
+
+def summarize(results: Sequence[tuple], labels: Dict[str, Collection[str]], templates: Dict[str, np.ndarray],
+              padding: int = 8) -> Dict[str, Dict[str, Any]]:
+    """根据每帧的匹配结果为每个模板选择mode、method、threshold和roi
+
+    Args:
+        results: _match_frame的结果
+        labels: 画面路径 -> 出现的模板名称
+        templates: 模板名称 -> 模板
+        padding (int): roi向外扩展的像素
+
+    Returns:
+        dict: 模板名称 -> bundle.json中的选项
+    """
+    config: Dict[str, Dict[str, Any]] = {}
+    for name, template in templates.items():
+        th, tw = template.shape[:2]
+        best: Optional[tuple] = None
+        for mode_index, mode in enumerate(MODES):
+            for method in METHODS:
+                key = (name, mode, method)
+                positives, negatives, locations, sizes = [], [], [], []
+                for path, size, scores in results:
+                    if key not in scores:
+                        continue
+                    score, loc = scores[key]
+                    if name in labels[path]:
+                        positives.append(score)
+                        locations.append(loc)
+                        sizes.append(size)
+                    else:
+                        negatives.append(score)
+                if not positives:
+                    continue
+                positives_array = np.array(positives)
+                negatives_array = np.array(negatives)
+                threshold, margin, accuracy = _threshold(positives_array, negatives_array)
+                rank = (accuracy, margin, -mode_index)
+                if best is None or rank > best[0]:
+                    best = (rank, mode, method, threshold, positives_array, negatives_array, locations, sizes)
+        if best is None:
+            log.warning(f"calibrate: template {name} has no positive frames")
+            continue
+        (accuracy, margin, _), mode, method, threshold, positives_array, negatives_array, locations, sizes = best
+        xs = np.array([loc[0] for loc in locations])
+        ys = np.array([loc[1] for loc in locations])
+        width = min(s[0] for s in sizes)
+        height = min(s[1] for s in sizes)
+        roi = [max(int(xs.min()) - padding, 0), max(int(ys.min()) - padding, 0),
+               min(int(xs.max()) + tw + padding, width), min(int(ys.max()) + th + padding, height)]
+        config[name] = dict(
+            threshold=round(threshold, 4), mode=mode, method=method, roi=roi,
+            calibration=dict(positives=len(positives_array), negatives=len(negatives_array),
+                             positive_min=round(float(positives_array.min()), 4),
+                             negative_max=round(float(negatives_array.max()), 4) if len(negatives_array) else None,
+                             margin=round(margin, 4), accuracy=round(accuracy, 4)))
+        log.debug(f"calibrate {name}: {config[name]}")
+    return config
+
+
+def calibrate(template_dir: str, labels_path: str, processes: Optional[int] = None, padding: int = 8,
+              output: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """校准模板目录中的所有模板
+
+    Args:
+        template_dir (str): 模板目录
+        labels_path (str): 标注文件
+        processes (int, None): 进程数, None为CPU核心数
+        padding (int): roi向外扩展的像素 (default 8)
+        output (str, None): 输出文件, None为模板目录下的bundle.json。已有的文件会被合并，只更新校准得到的选项
+
+    Returns:
+        dict: 校准结果
+    """
+    templates: Dict[str, np.ndarray] = {}
+    for name, path in iter_templates(template_dir):
+        template = cv2.imread(path)
+        if template is None:
+            log.warning(f"calibrate skip unreadable template {path}")
+            continue
+        templates[name] = template
+    with open(labels_path, "r", encoding="utf-8") as f:
+        raw_labels: Dict[str, List[str]] = json.load(f)
+    root = os.path.dirname(os.path.abspath(labels_path))
+    labels = {os.path.join(root, path): set(names) for path, names in raw_labels.items()}
+
+    with Pool(processes, initializer=_init_worker, initargs=(templates,)) as pool:
+        results = [r for r in pool.imap_unordered(_match_frame, list(labels), chunksize=8) if r is not None]
+    config = summarize(results, labels, templates, padding)
+
+    output = os.path.join(template_dir, "bundle.json") if output is None else output
+    options: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(output):
+        with open(output, "r", encoding="utf-8") as f:
+            options = json.load(f)
+    for name, option in config.items():
+        options.setdefault(name, {}).update(option)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(options, f, ensure_ascii=False, indent=2)
+    return config
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="calibrate template thresholds, modes and ROIs on labelled frames")
+    parser.add_argument("templates", help="template directory")
+    parser.add_argument("labels", help="labels json: {frame path: [template names]}")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default cpu count)")
+    parser.add_argument("--padding", type=int, default=8, help="roi padding in pixels")
+    parser.add_argument("--output", default=None, help="output json (default <templates>/bundle.json)")
+    args = parser.parse_args(argv)
+    config = calibrate(args.templates, args.labels, args.processes, args.padding, args.output)
+    for name, option in config.items():
+        stats = option["calibration"]
+        print(f"{name}: threshold={option['threshold']} mode={option['mode']} method={option['method']} "
+              f"roi={option['roi']} margin={stats['margin']} accuracy={stats['accuracy']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MODES: tuple[str, ...]
+METHODS: tuple[str, ...]
+_templates: Dict[str, np.ndarray]
+
+
+def _init_worker(templates: Dict[str, np.ndarray]) -> None: ...
+
+
+def _match_frame(path: str) -> Optional[Tuple[str, Tuple[int, int], Dict[tuple, tuple]]]: ...
+
+
+def _threshold(positives: np.ndarray, negatives: np.ndarray) -> Tuple[float, float, float]: ...
+
+
+def summarize(results: Sequence[tuple], labels: Dict[str, Collection[str]], templates: Dict[str, np.ndarray],
+              padding: int = 8) -> Dict[str, Dict[str, Any]]: ...
+
+
+def calibrate(template_dir: str, labels_path: str, processes: Optional[int] = None, padding: int = 8,
+              output: Optional[str] = None) -> Dict[str, Dict[str, Any]]: ...
+
+
+def main(argv: Optional[List[str]] = None) -> None: ...
@@ -0,0 +1,65 @@
+"""时钟
+
+包内所有的等待、超时和输入延迟都通过时钟完成。
+RealClock使用单调时钟和真实的sleep；VirtualClock的sleep立即返回并推进虚拟时间，
+用于测试和离线模拟，使超时行为确定且不需要真实等待。
+"""
+import time
+from abc import ABC, abstractmethod
+from threading import Lock
+
+
+class Clock(ABC):
+    @abstractmethod
+    def time(self) -> float:
+        """ 当前时间(秒)，只能用于计算时间差 """
+        pass
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        pass
+
+
+class RealClock(Clock):
+    def time(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    def __init__(self, start: float = 0.0) -> None:
+        self._now = float(start)
+        self._lock = Lock()
+
+    def time(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        """ 立即返回并将时间推进seconds """
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """ 推进虚拟时间 """
+        if seconds < 0:
+            raise ValueError("param seconds must not be negative")
+        with self._lock:
+            self._now += seconds
+
+
+_clock: Clock = RealClock()
+
+
+def get_clock() -> Clock:
+    """ 获取包默认使用的时钟 """
+    return _clock
+
+
+def set_clock(clock: Clock) -> None:
+    """ 设置包默认使用的时钟，之后创建的对象和键鼠模拟函数都会使用该时钟 """
+    global _clock
+    if not isinstance(clock, Clock):
+        raise TypeError("param clock must is Clock type")
+    _clock = clock
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from threading import Lock
+
+
+class Clock(ABC):
+    @abstractmethod
+    def time(self) -> float: ...
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None: ...
+
+
+class RealClock(Clock):
+    def time(self) -> float: ...
+
+    def sleep(self, seconds: float) -> None: ...
+
+
+class VirtualClock(Clock):
+    _now: float
+    _lock: Lock
+    def __init__(self, start: float = 0.0) -> None: ...
+
+    def time(self) -> float: ...
+
+    def sleep(self, seconds: float) -> None: ...
+
+    def advance(self, seconds: float) -> None: ...
+
+
+_clock: Clock
+
+
+def get_clock() -> Clock: ...
+
+
+def set_clock(clock: Clock) -> None: ...
@@ -1,3 +1,4 @@
-from .pos import Pos
-from .rect import Rect
+from .pos import Pos, PosArray
+from .rect import Rect, RectArray
+from .result import MatchResult
 from .interface import InterfaceBase, Interface
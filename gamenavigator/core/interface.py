@@ -2,9 +2,10 @@
 通过创建一个个游戏界面类从而达到操控游戏的目的
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Union, Callable
+from typing import TYPE_CHECKING, Dict, Optional, Union, Callable
 
-from cv2.typing import MatLike
+if TYPE_CHECKING:
+    from cv2.typing import MatLike
 
 
 
@@ -34,6 +35,7 @@ class Interface(InterfaceBase):
         self.__callable: Optional[Callable] = None
         self.__items: Dict[str, "Interface"] = dict()
         self.__parent: Optional["Interface"] = None
+        self.__detector: Optional[Callable] = None
     
     def add_subinterface(self, i_obj: "Interface", callable: Callable) -> None:
         """ 添加新的子界面 """
@@ -59,6 +61,36 @@ class Interface(InterfaceBase):
         """ 返回当前界面 """
         return self.__current
 
+    def detect(self, img: "MatLike") -> Optional["Interface"]:
+        """识别截图所处的界面
+
+        先检查子界面(深度优先)再检查自身，返回第一个is_visible的界面，都不满足时返回None
+        识别成功后会设置当前界面
+        """
+        for interface in self.__items.values():
+            found = interface.detect(img)
+            if found is not None:
+                return found
+        if self.is_visible(img):
+            self._set_current(self)
+            return self
+        return None
+
+    def is_visible(self, img: "MatLike") -> bool:
+        """ 使用识别器判断截图是否处于该界面，没有识别器时返回False """
+        if self.__detector is None:
+            return False
+        return bool(self.__detector(img))
+
+    def set_detector(self, detector: Optional[Callable]) -> None:
+        """设置界面识别器
+
+        识别器接收截图返回bool，例如probe模块中的ProbeSet，也可以是执行模板匹配的函数
+        """
+        if detector is not None and not callable(detector):
+            raise TypeError("detector must be callable")
+        self.__detector = detector
+
     def get_subinterface(self, i_name: str) -> "Interface":
         """获取界面
 
@@ -28,12 +28,14 @@ class Interface(InterfaceBase):
     __callable: Optional[Callable]
     __items: Dict[str, "Interface"]
     __parent: Optional["Interface"]
+    __detector: Optional[Callable]
     def __init__(self, i_name: str) -> None:
         super().__init__(i_name)
         self.__current: "Interface" = self
         self.__callable: Optional[Callable] = None
         self.__items: Dict[str, "Interface"] = dict()
         self.__parent: Optional["Interface"] = None
+        self.__detector: Optional[Callable] = None
     
     def add_subinterface(self, i_obj: "Interface", callable: Callable) -> None: ...
     
@@ -43,6 +45,12 @@ class Interface(InterfaceBase):
     
     def current(self) -> "Interface": ...
 
+    def detect(self, img: MatLike) -> Optional["Interface"]: ...
+
+    def is_visible(self, img: MatLike) -> bool: ...
+
+    def set_detector(self, detector: Optional[Callable]) -> None: ...
+
     def get_subinterface(self, i_name: str) -> "Interface": ...
     
     def parent(self) -> Union["Interface", None]: ...
@@ -1,31 +1,40 @@
 """ 这里定义了坐标类 """
+from operator import index
+
+import numpy as np
 
 
 class Pos:
-    def __init__(self, *args) -> None:
+    __slots__ = ("_x", "_y", "_is_game")
+
+    def __init__(self, *args, is_game: bool = False) -> None:
         """
         Initialize a new Pos object.
 
         * Pos(tuple): where tuple is of the form (x, y)
-        * Pos(x, y): where x and y are integers
+        * Pos(x, y): where x and y are integers (numpy integers are accepted)
+
+        Pos is immutable and hashable, is_game marks a coordinate that is already on the screen.
         """
         if len(args) == 1:
             arg = args[0]
             if isinstance(arg, tuple):
                 if len(arg) != 2:
                     raise TypeError("Tuple must have exactly two elements")
-                self._x, self._y = arg
+                x, y = arg
             else:
                 raise TypeError("If a single argument is provided, it must be a tuple of two integers")
         elif len(args) == 2:
-            if isinstance(args[0], int) and isinstance(args[1], int):
-                self._x, self._y = args
-            else:
-                raise TypeError("If two arguments are provided, they must be integers")
+            x, y = args
         else:
             raise TypeError("Pos takes either one tuple or two integers as arguments")
-
-        self.is_game = False
+        try:
+            x, y = index(x), index(y)
+        except TypeError:
+            raise TypeError("Pos coordinates must be integers") from None
+        object.__setattr__(self, "_x", x)
+        object.__setattr__(self, "_y", y)
+        object.__setattr__(self, "_is_game", bool(is_game))
 
     @property
     def x(self) -> int:
@@ -35,11 +44,36 @@ class Pos:
     def y(self) -> int:
         return self._y
 
+    @property
+    def is_game(self) -> bool:
+        return self._is_game
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Pos is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("Pos is immutable")
+
     def __add__(self, other):
-        return Pos(self.x + other.x, self.y + other.y)
+        return Pos(self._x + other.x, self._y + other.y)
 
     def __sub__(self, other):
-        return Pos(self.x - other.x, self.y - other.y)
+        return Pos(self._x - other.x, self._y - other.y)
+
+    def __iter__(self):
+        yield self._x
+        yield self._y
+
+    def __eq__(self, other):
+        if not isinstance(other, Pos):
+            return NotImplemented
+        return self._x == other._x and self._y == other._y and self._is_game == other._is_game
+
+    def __hash__(self):
+        return hash((self._x, self._y, self._is_game))
+
+    def __reduce__(self):
+        return _pos, (self._x, self._y, self._is_game)
 
     def __str__(self):
         return f"Pos({self._x}, {self._y})"
@@ -48,6 +82,116 @@ class Pos:
         return self.__str__()
 
 
+def _pos(x: int, y: int, is_game: bool) -> Pos:
+    """ pickle使用 """
+    return Pos(x, y, is_game=is_game)
+
+
+class PosArray:
+    __slots__ = ("_data", "_is_game")
+
+    def __init__(self, data=(), is_game: bool = False) -> None:
+        """
+        一组坐标，底层是形状为(N, 2)的只读int64数组，所有批量运算都是向量化的
+
+        * PosArray(ndarray): 形状为(N, 2)的数组
+        * PosArray([(x, y), ...]) 或 PosArray([Pos, ...])
+        """
+        if isinstance(data, PosArray):
+            array = data._data
+        elif isinstance(data, np.ndarray):
+            array = data
+        else:
+            array = np.array([tuple(p) for p in data], dtype=np.int64)
+        array = np.asarray(array, dtype=np.int64).reshape(-1, 2)
+        if array.flags.writeable:
+            array = array.copy()
+            array.flags.writeable = False
+        object.__setattr__(self, "_data", array)
+        object.__setattr__(self, "_is_game", bool(is_game))
+
+    @classmethod
+    def from_where(cls, positions: tuple) -> "PosArray":
+        """ 由np.where(res >= threshold)的结果(行, 列)生成 """
+        ys, xs = positions
+        return cls(np.stack([xs, ys], axis=1))
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._data[:, 1]
+
+    @property
+    def is_game(self) -> bool:
+        return self._is_game
+
+    def __setattr__(self, key, value):
+        raise AttributeError("PosArray is immutable")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            x, y = self._data[item]
+            return Pos(int(x), int(y), is_game=self._is_game)
+        return PosArray(self._data[item], self._is_game)
+
+    def __iter__(self):
+        for x, y in self._data.tolist():
+            yield Pos(x, y, is_game=self._is_game)
+
+    def __eq__(self, other):
+        if not isinstance(other, PosArray):
+            return NotImplemented
+        return self._is_game == other._is_game and np.array_equal(self._data, other._data)
+
+    def __hash__(self):
+        return hash((self._data.tobytes(), self._data.shape, self._is_game))
+
+    def translate(self, dx: int, dy: int, is_game: bool = None) -> "PosArray":
+        """ 所有坐标平移(dx, dy) """
+        if is_game is None:
+            is_game = self._is_game
+        return PosArray(self._data + np.array([dx, dy], dtype=np.int64), is_game)
+
+    def __add__(self, other: Pos) -> "PosArray":
+        return self.translate(other.x, other.y, False)
+
+    def __sub__(self, other: Pos) -> "PosArray":
+        return self.translate(-other.x, -other.y, False)
+
+    def to_screen(self, rect) -> "PosArray":
+        """ 将窗口内坐标转换为屏幕坐标 """
+        return self.translate(rect.left, rect.top, True)
+
+    def in_bounds(self, rect) -> np.ndarray:
+        """ 每个坐标是否在rect内(包含边界)，返回bool数组 """
+        x, y = self.x, self.y
+        return (x >= rect.left) & (x <= rect.right) & (y >= rect.top) & (y <= rect.bottom)
+
+    def scale(self, factor: float) -> "PosArray":
+        """ 坐标按比例缩放(四舍五入) """
+        return PosArray(np.rint(self._data * factor).astype(np.int64), self._is_game)
+
+    def tolist(self) -> list:
+        """ 转换为[(x, y), ...] """
+        return [tuple(p) for p in self._data.tolist()]
+
+    def __str__(self):
+        return f"PosArray({self.tolist()})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
 if __name__ == '__main__':
     p = Pos(1, 2)
     print(p)
@@ -1,12 +1,14 @@
-from typing import Union, Tuple
+from typing import Iterable, Iterator, Optional, Union, Tuple
+
+import numpy as np
 
 
 class Pos:
-    is_game: bool
     _x: int
     _y: int
+    _is_game: bool
 
-    def __init__(self, *args: Union[Tuple[int, int], int]) -> None: ...
+    def __init__(self, *args: Union[Tuple[int, int], int], is_game: bool = False) -> None: ...
 
     @property
     def x(self) -> int: ...
@@ -14,10 +16,73 @@ class Pos:
     @property
     def y(self) -> int: ...
 
+    @property
+    def is_game(self) -> bool: ...
+
     def __add__(self, other: "Pos") -> "Pos": ...
 
     def __sub__(self, other: "Pos") -> "Pos": ...
 
+    def __iter__(self) -> Iterator[int]: ...
+
+    def __eq__(self, other: object) -> bool: ...
+
+    def __hash__(self) -> int: ...
+
+    def __str__(self) -> str: ...
+
+    def __repr__(self) -> str: ...
+
+
+def _pos(x: int, y: int, is_game: bool) -> Pos: ...
+
+
+class PosArray:
+    _data: np.ndarray
+    _is_game: bool
+
+    def __init__(self, data: Union[np.ndarray, "PosArray", Iterable[Union[Pos, Tuple[int, int]]]] = (),
+                 is_game: bool = False) -> None: ...
+
+    @classmethod
+    def from_where(cls, positions: tuple) -> "PosArray": ...
+
+    @property
+    def data(self) -> np.ndarray: ...
+
+    @property
+    def x(self) -> np.ndarray: ...
+
+    @property
+    def y(self) -> np.ndarray: ...
+
+    @property
+    def is_game(self) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, item) -> Union[Pos, "PosArray"]: ...
+
+    def __iter__(self) -> Iterator[Pos]: ...
+
+    def __eq__(self, other: object) -> bool: ...
+
+    def __hash__(self) -> int: ...
+
+    def translate(self, dx: int, dy: int, is_game: Optional[bool] = None) -> "PosArray": ...
+
+    def __add__(self, other: Pos) -> "PosArray": ...
+
+    def __sub__(self, other: Pos) -> "PosArray": ...
+
+    def to_screen(self, rect) -> "PosArray": ...
+
+    def in_bounds(self, rect) -> np.ndarray: ...
+
+    def scale(self, factor: float) -> "PosArray": ...
+
+    def tolist(self) -> list[tuple[int, int]]: ...
+
     def __str__(self) -> str: ...
 
     def __repr__(self) -> str: ...
@@ -1,9 +1,18 @@
+from operator import index
+
+import numpy as np
+
+from .pos import Pos, PosArray
+
+
 class Rect:
+    __slots__ = ("_left", "_top", "_right", "_bottom")
+
     def __init__(self, left: int, top: int, right: int, bottom: int):
-        self._top = top
-        self._left = left
-        self._bottom = bottom
-        self._right = right
+        object.__setattr__(self, "_left", index(left))
+        object.__setattr__(self, "_top", index(top))
+        object.__setattr__(self, "_right", index(right))
+        object.__setattr__(self, "_bottom", index(bottom))
 
     @property
     def top(self) -> int:
@@ -21,11 +30,169 @@ class Rect:
     def right(self) -> int:
         return self._right
 
+    @property
+    def width(self) -> int:
+        return self._right - self._left
+
+    @property
+    def height(self) -> int:
+        return self._bottom - self._top
+
+    @property
+    def center(self) -> Pos:
+        return Pos((self._left + self._right) // 2, (self._top + self._bottom) // 2)
+
     def rect(self) -> tuple[int, int, int, int]:
         return self._left, self._top, self._right, self.bottom
 
+    def contains(self, pos: Pos) -> bool:
+        """ pos是否在矩形内(包含边界) """
+        return self._left <= pos.x <= self._right and self._top <= pos.y <= self._bottom
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Rect is immutable")
+
+    def __delattr__(self, key):
+        raise AttributeError("Rect is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Rect):
+            return NotImplemented
+        return self.rect() == other.rect()
+
+    def __hash__(self):
+        return hash(self.rect())
+
+    def __reduce__(self):
+        return Rect, self.rect()
+
     def __str__(self):
         return f"{self._left, self._top, self._right, self._bottom}"
 
     def __repr__(self):
         return self.__str__()
+
+
+class RectArray:
+    __slots__ = ("_data",)
+
+    def __init__(self, data=()) -> None:
+        """
+        一组矩形，底层是形状为(N, 4)的只读int64数组，每行为(left, top, right, bottom)
+
+        * RectArray(ndarray): 形状为(N, 4)的数组
+        * RectArray([(left, top, right, bottom), ...]) 或 RectArray([Rect, ...])
+        """
+        if isinstance(data, RectArray):
+            array = data._data
+        elif isinstance(data, np.ndarray):
+            array = data
+        else:
+            array = np.array([r.rect() if isinstance(r, Rect) else tuple(r) for r in data], dtype=np.int64)
+        array = np.asarray(array, dtype=np.int64).reshape(-1, 4)
+        if array.flags.writeable:
+            array = array.copy()
+            array.flags.writeable = False
+        object.__setattr__(self, "_data", array)
+
+    @classmethod
+    def from_positions(cls, positions: PosArray, width: int, height: int) -> "RectArray":
+        """ 以positions为左上角、大小为(width, height)的矩形，例如where_img的匹配结果 """
+        data = positions.data
+        return cls(np.concatenate([data, data + np.array([width, height], dtype=np.int64)], axis=1))
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._data
+
+    @property
+    def left(self) -> np.ndarray:
+        return self._data[:, 0]
+
+    @property
+    def top(self) -> np.ndarray:
+        return self._data[:, 1]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self._data[:, 2]
+
+    @property
+    def bottom(self) -> np.ndarray:
+        return self._data[:, 3]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.right - self.left
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.bottom - self.top
+
+    def __setattr__(self, key, value):
+        raise AttributeError("RectArray is immutable")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return Rect(*self._data[item].tolist())
+        return RectArray(self._data[item])
+
+    def __iter__(self):
+        for r in self._data.tolist():
+            yield Rect(*r)
+
+    def __eq__(self, other):
+        if not isinstance(other, RectArray):
+            return NotImplemented
+        return np.array_equal(self._data, other._data)
+
+    def __hash__(self):
+        return hash((self._data.tobytes(), self._data.shape))
+
+    def centers(self) -> PosArray:
+        """ 每个矩形的中心 """
+        data = self._data
+        return PosArray(np.stack([(data[:, 0] + data[:, 2]) // 2, (data[:, 1] + data[:, 3]) // 2], axis=1))
+
+    def translate(self, dx: int, dy: int) -> "RectArray":
+        return RectArray(self._data + np.array([dx, dy, dx, dy], dtype=np.int64))
+
+    def scale(self, factor: float) -> "RectArray":
+        return RectArray(np.rint(self._data * factor).astype(np.int64))
+
+    def contains(self, positions: PosArray) -> np.ndarray:
+        """ 每个矩形是否包含对应的坐标(逐行比较)，返回bool数组 """
+        x, y = positions.x, positions.y
+        return (x >= self.left) & (x <= self.right) & (y >= self.top) & (y <= self.bottom)
+
+    def intersect(self, other) -> tuple:
+        """与Rect或RectArray(逐行)求交集
+
+        Returns:
+            (RectArray, ndarray): 交集矩形以及交集是否非空的bool数组，空交集的宽高为0
+        """
+        if isinstance(other, Rect):
+            other = np.array(other.rect(), dtype=np.int64)
+        elif isinstance(other, RectArray):
+            other = other.data
+        else:
+            raise TypeError("param other must is Rect or RectArray type")
+        a = self._data
+        left = np.maximum(a[..., 0], other[..., 0])
+        top = np.maximum(a[..., 1], other[..., 1])
+        right = np.maximum(np.minimum(a[..., 2], other[..., 2]), left)
+        bottom = np.maximum(np.minimum(a[..., 3], other[..., 3]), top)
+        valid = (right > left) & (bottom > top)
+        return RectArray(np.stack([left, top, right, bottom], axis=1)), valid
+
+    def tolist(self) -> list:
+        return [tuple(r) for r in self._data.tolist()]
+
+    def __str__(self):
+        return f"RectArray({self.tolist()})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -1,3 +1,10 @@
+from typing import Iterable, Iterator, Tuple, Union
+
+import numpy as np
+
+from .pos import Pos, PosArray
+
+
 class Rect:
     _left: int
     _top: int
@@ -17,8 +24,78 @@ class Rect:
     @property
     def right(self) -> int: ...
 
+    @property
+    def width(self) -> int: ...
+
+    @property
+    def height(self) -> int: ...
+
+    @property
+    def center(self) -> Pos: ...
+
     def rect(self) -> tuple[int, int, int, int]: ...
 
+    def contains(self, pos: Pos) -> bool: ...
+
+    def __eq__(self, other: object) -> bool: ...
+
+    def __hash__(self) -> int: ...
+
+    def __str__(self) -> str: ...
+
+    def __repr__(self) -> str: ...
+
+
+class RectArray:
+    _data: np.ndarray
+    def __init__(self, data: Union[np.ndarray, "RectArray", Iterable[Union[Rect, Tuple[int, int, int, int]]]] = ()) -> None: ...
+
+    @classmethod
+    def from_positions(cls, positions: PosArray, width: int, height: int) -> "RectArray": ...
+
+    @property
+    def data(self) -> np.ndarray: ...
+
+    @property
+    def left(self) -> np.ndarray: ...
+
+    @property
+    def top(self) -> np.ndarray: ...
+
+    @property
+    def right(self) -> np.ndarray: ...
+
+    @property
+    def bottom(self) -> np.ndarray: ...
+
+    @property
+    def width(self) -> np.ndarray: ...
+
+    @property
+    def height(self) -> np.ndarray: ...
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, item) -> Union[Rect, "RectArray"]: ...
+
+    def __iter__(self) -> Iterator[Rect]: ...
+
+    def __eq__(self, other: object) -> bool: ...
+
+    def __hash__(self) -> int: ...
+
+    def centers(self) -> PosArray: ...
+
+    def translate(self, dx: int, dy: int) -> "RectArray": ...
+
+    def scale(self, factor: float) -> "RectArray": ...
+
+    def contains(self, positions: PosArray) -> np.ndarray: ...
+
+    def intersect(self, other: Union[Rect, "RectArray"]) -> tuple["RectArray", np.ndarray]: ...
+
+    def tolist(self) -> list[tuple[int, int, int, int]]: ...
+
     def __str__(self) -> str: ...
 
     def __repr__(self) -> str: ...
@@ -0,0 +1,41 @@
+""" 匹配结果 """
+from typing import NamedTuple, Optional, Tuple
+
+from .pos import Pos
+
+
+class MatchResult(NamedTuple):
+    """
+    一次匹配成功的结果
+
+    * template: 模板名称(图像路径、模板包中的名称、文字等)
+    * pos: 匹配位置的左上角(窗口内坐标)，探针等没有位置的结果为None
+    * size: 匹配区域的大小(w, h)
+    * score: 匹配分数
+    * timestamp: 截图的时间(Clock时间)
+    """
+    template: str
+    pos: Optional[Pos]
+    size: Tuple[int, int]
+    score: float
+    timestamp: float
+
+    @property
+    def center(self) -> Optional[Pos]:
+        """ 匹配区域的中心 """
+        if self.pos is None:
+            return None
+        return Pos(self.pos.x + self.size[0] // 2, self.pos.y + self.size[1] // 2)
+
+    def point(self, position: str = "center") -> Optional[Pos]:
+        """ 匹配区域的 left center right 点(垂直方向居中) """
+        if self.pos is None:
+            return None
+        if position not in ("left", "center", "right"):
+            raise ValueError("position must be left, center or right")
+        y = self.pos.y + self.size[1] // 2
+        if position == "left":
+            return Pos(self.pos.x, y)
+        if position == "right":
+            return Pos(self.pos.x + self.size[0], y)
+        return self.center
@@ -0,0 +1,16 @@
+from typing import NamedTuple, Optional, Tuple
+
+from .pos import Pos
+
+
+class MatchResult(NamedTuple):
+    template: str
+    pos: Optional[Pos]
+    size: Tuple[int, int]
+    score: float
+    timestamp: float
+
+    @property
+    def center(self) -> Optional[Pos]: ...
+
+    def point(self, position: str = "center") -> Optional[Pos]: ...
@@ -1,58 +1,44 @@
 import os.path
-import time
-import ctypes
 from datetime import datetime
-from typing import Union
+from typing import Any, Dict, List, Optional, Union
 from threading import Thread
 
-import win32api
-import win32con
-import win32gui
-import win32print
-import cv2
-from PIL import ImageGrab
 from cv2.typing import MatLike
-from numpy import ndarray, array
-
-from .core import Pos, Rect
-from .keyboard_mouse_simulation import (mouse_click_position, mouse_move_to, mouse_scroll,
-                                        keyboard_press, keyboard_down, keyboard_up, mouse_drag)
-from .image_recognition import match_template
+from numpy import ndarray
+import numpy as np
+
+from .core import Pos, PosArray, Rect, MatchResult
+from . import keyboard_mouse_simulation
+from .backend import get_backend
+from .image_recognition import (match_template, match_template_multiscale, load_template, template_thresh,
+                                TemplateScaler, _resize)
+from .bundle import TemplateBundle, get_bundle
 from .ocr_recognition import get_text_position
 from .exception import TemplateMathingFailure, WindowOutOfBoundsError, TextMatchingFailure
+from .recorder import FlightRecorder
+from .clock import Clock, get_clock
+from .watcher import Watcher, WatcherSet
+from .probe import ProbeSet
+from .policy import WaitPolicy, poll, to_policy
+from .trace import span
 from . import log
 
-
-def _get_screen_size():
-    """ 电脑缩放后的分辨率 """
-    w = win32api.GetSystemMetrics(0)
-    h = win32api.GetSystemMetrics(1)
-    return w, h
-
-
-def _get_read_size():
-    """ 获取电脑真实分辨率 """
-    hdc = win32gui.GetDC(0)
-    w = win32print.GetDeviceCaps(hdc, win32con.DESKTOPHORZRES)
-    h = win32print.GetDeviceCaps(hdc, win32con.DESKTOPVERTRES)
-    return w, h
-
-
-def _get_scaling() -> float:
-    """ 获取电脑缩放率 """
-    return round(_get_read_size()[0] / _get_screen_size()[0], 2)
+DELAYS = {"set_foreground": 1.0}  # 输入后默认的等待时间(秒)，没有列出的操作不等待
 
 
 class Game:
     def __init__(self, game_class: Union[str, None], game_name: str):
         """
+        真实的游戏窗口，创建时才加载当前平台的窗口后端(见backend模块)
+
         :param game_class: 游戏类名
         :param game_name: 游戏名称
         """
         self.screenshot: ndarray
+        self._backend = get_backend()
         self._game_class = game_class
         self._game_name = game_name
-        self._hwnd = win32gui.FindWindow(game_class, game_name)
+        self._hwnd = self._backend.find_window(game_class, game_name)
 
         log.debug(f"class : {game_class}, name : {game_name}, hwnd : {self._hwnd}")
 
@@ -82,48 +68,78 @@ class Game:
 
     @property
     def scaling(self) -> float:
-        return ctypes.windll.user32.GetDpiForWindow(self._hwnd) / 96.0
+        return self._backend.get_window_scaling(self._hwnd)
 
     @property
     def name(self) -> str:
         return self._game_name
 
+    def is_foreground(self) -> bool:
+        """ 游戏是否处于前台 """
+        return self._backend.is_foreground(self._game_name)
+
     def set_foreground(self) -> None:
         """ 设置游戏到前台API """
-        win32gui.ShowWindow(self._hwnd, win32con.SW_RESTORE)
-        win32gui.SetForegroundWindow(self._hwnd)
+        self._backend.set_foreground(self._hwnd)
 
     def get_screenshot(self) -> ndarray:
         """ 游戏截图API """
-        grab = ImageGrab.grab(bbox=(self.get_rect().rect()))
-        img = array(grab)
-        img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        img = self._backend.grab(self.get_rect().rect())
         self.screenshot = img
         return img
 
     def get_rect(self) -> Rect:
         """ 获取游戏的矩形 """
-        x1, y1, x2, y2 = win32gui.GetWindowRect(self._hwnd)
-        s = _get_scaling()  # 电脑缩放率
-        x1, y1 = int(x1 * s), int(y1 * s)
-        x2, y2 = int(x2 * s), int(y2 * s)
-        return Rect(x1, y1, x2, y2)
+        return Rect(*self._backend.get_window_rect(self._hwnd))
 
 
 class GameController:
-    def __init__(self, game_class: Union[str, None], game_name: str, debug=False, filename=""):
+    def __init__(self, game_class: Union[str, None], game_name: str, debug=False, filename="",
+                 recorder: Optional[FlightRecorder] = None, game=None, backend=None,
+                 clock: Optional[Clock] = None, bundle: Optional[TemplateBundle] = None,
+                 scaler: Optional[TemplateScaler] = None, policy: Optional[WaitPolicy] = None,
+                 delays: Optional[Dict[str, float]] = None):
         """
         将debug设置为True后需要设置filename才会将调试信息保存
 
+        调试模式下最近的截图、操作和匹配分数保存在recorder中，出错时异步导出到filename目录
+
+        传入game和backend可以替换真实的游戏窗口和键鼠模拟，例如使用replay模块中的ReplayGame和ReplayInput
+        在录制的画面上运行脚本
+
         Args:
             game_class (str, None): 游戏类型
             game_name (str): 游戏名称
             debug (bool): 调试模式
             filename (str): 调试模式存储的文件路径
+            recorder (FlightRecorder, None): 调试记录器, 调试模式下默认创建
+            game (Game, None): 游戏对象, 为None时根据game_class和game_name查找窗口
+            backend: 键鼠模拟后端, 为None时使用keyboard_mouse_simulation，
+                mouse_click_position和mouse_scroll需要接受clock参数，输入的延迟使用控制器的时钟
+            clock (Clock, None): 等待和超时使用的时钟, 为None时使用包默认时钟
+            bundle (TemplateBundle, None): 模板包, 图片参数可以使用其中的模板名称, 为None时使用默认模板包
+            scaler (TemplateScaler, None): 模板缩放, 模板和模板包中的roi会按当前窗口大小缩放, 为None时不缩放
+            policy (WaitPolicy, None): 等待和点击重试没有指定spacing时使用的策略, 为None时每秒检查一次
+            delays (dict, None): 操作名称 -> 输入后等待画面响应的时间(秒)，覆盖DELAYS中的默认值，
+                操作名称为click press mouse_drag mouse_scroll mouse_move_to down_keyboard_time set_foreground，
+                可以使用latency.LatencyMeter测量
         """
-        self.game = Game(game_class, game_name)
+        self.game = Game(game_class, game_name) if game is None else game
+        self.input = keyboard_mouse_simulation if backend is None else backend
+        self.clock = get_clock() if clock is None else clock
+        self.bundle = bundle
+        self.scaler = scaler
+        self.policy = to_policy(policy)
+        self.delays: Dict[str, float] = dict(DELAYS)
+        if delays is not None:
+            self.delays.update(delays)
+        self.watchers = WatcherSet()
+        self._frame_time = 0.0
         self.debug = debug
         self.filename = filename
+        if recorder is None and debug:
+            recorder = FlightRecorder(clock=self.clock)
+        self.recorder = recorder
 
     def click_pos(self, pos: Pos) -> None:
         """模拟鼠标点击游戏内坐标API
@@ -138,23 +154,26 @@ class GameController:
             self.image_debug("Error")
             raise
 
-    def click_image(self, *images: Union[str, ndarray, MatLike], **kwargs):
+    def click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> MatchResult:
         """模拟鼠标点击游戏内图片API
 
-        鼠标点击图片中心位置，若传入多个图像则只会点击一个
+        鼠标点击图片中心位置，若传入多个图像则只会点击一个，返回被点击的匹配结果
 
         Args:
-            images (str, ndarray, MatLike): 图像
+            images (str, ndarray, MatLike): 图像、图像路径或模板包中的模板名称
 
         Keyword Arguments:
-            threshold (int, float): 匹配阈值(default 0.8)
-            mode (str): 匹配模式(default)
+            threshold (int, float): 匹配阈值(default 模板包中的阈值或0.8)
+            mode (str): 匹配模式(default 模板包中的模式或color)
             x (int): x偏移 (default 0)
             y (int): y偏移 (default 0)
+            multiscale (bool): 未达到阈值时进行多尺度匹配 (default False)
+            timeout (int, float): 匹配失败时重试的时间, 0为不重试 (default 0)
+            spacing (int, float, WaitPolicy): 重试间隔或等待策略 (default 控制器的policy)
         """
         self.set_foreground()
         try:
-            self._click_image(*images, **kwargs)
+            return self._click_image(*images, **kwargs)
         except TemplateMathingFailure:
             self.image_debug("Error")
             raise
@@ -162,6 +181,8 @@ class GameController:
     def click_text(self, text: str, position: str = "center", **kwargs) -> None:
         """模拟鼠标点击游戏内文字API
 
+        点击文字外接矩形的左端、中心或右端(垂直方向居中)，与wait_and_click_text点击的位置相同
+
         Args:
             text (str): 文字
             position (str): 文字位置(default "center") left, center, right
@@ -169,11 +190,15 @@ class GameController:
         Keyword Arguments:
             x (int): x偏移 (default 0)
             y (int): y偏移 (default 0)
+            timeout (int, float): 识别失败时重试的时间, 0为不重试 (default 0)
+            spacing (int, float, WaitPolicy): 重试间隔或等待策略 (default 控制器的policy)
         """
         if not isinstance(text, str):
             raise TypeError("text must is str type")
         if not isinstance(position, str):
             raise TypeError("position must is str type")
+        if position not in ("left", "center", "right"):
+            raise ValueError("position must be left, center or right")
         try:
             self._click_text(text, position, **kwargs)
         except TextMatchingFailure:
@@ -183,7 +208,7 @@ class GameController:
     def down_keyboard_time(self, key: str, stop_time: float, thread=False) -> Union[None, Thread]:
         """模拟按压键盘的时间
 
-        开启线程后将在子线程中运行从而不阻塞主线程，因为这个按压时间是通过time.sleep()实现的
+        开启线程后将在子线程中运行从而不阻塞主线程，因为这个按压时间是通过clock.sleep()实现的
 
         Args:
             key (str): 键盘按键
@@ -198,14 +223,17 @@ class GameController:
         if not isinstance(thread, bool):
             raise TypeError("param thread must is bool type")
         self.set_foreground()
+        self._record_action("down_keyboard_time", key=key, stop_time=stop_time)
 
         def func():
-            keyboard_down(key)
-            time.sleep(stop_time)
-            keyboard_up(key)
+            with span("down_keyboard_time", "input", key=key, stop_time=stop_time):
+                self.input.keyboard_down(key)
+                self.clock.sleep(stop_time)
+                self.input.keyboard_up(key)
+            self._settle("down_keyboard_time")
 
         if thread:
-            t = Thread(target=func)
+            t = Thread(target=func, name=f"down_keyboard_time({key})")
             t.start()
             return t
             # 运行子线程并且返回子线程
@@ -215,28 +243,44 @@ class GameController:
 
     def get_screenshot(self) -> ndarray:
         """ 获取游戏截图 """
-        return self.game.get_screenshot()
+        return self._get_screenshot()
+
+    def add_watcher(self, watcher: Watcher) -> Watcher:
+        """添加区域监视器
+
+        之后每次截图(包括click_image、wait_image等内部的截图)都会检查所有监视器，
+        条件刚满足时调用监视器的回调
+        """
+        return self.watchers.add(watcher)
+
+    def poll_watchers(self) -> list:
+        """ 截图一次并检查所有监视器，返回本次触发的监视器 """
+        return self.watchers.evaluate(self.game.get_screenshot())
 
     def image_debug(self, level="Debug") -> None:
-        """ 保存调试照片 """
+        """保存调试照片
+
+        由recorder在后台线程导出最近的若干帧以及对应的操作和匹配分数，不阻塞当前线程
+        """
         if not isinstance(level, str):
             raise TypeError("param level must is str type")
-        if self.debug and self.filename:
-            filename = self.__image_filename(level)
-            cv2.imwrite(filename, self.game.screenshot)
+        if self.debug and self.filename and self.recorder is not None:
+            self.recorder.dump(self.__image_filename(level), game=self.__game_meta())
 
     def press(self, key: str) -> None:
         """ 模拟键盘按键按压API """
         self.set_foreground()
-        keyboard_press(key)
+        self._record_action("press", key=key)
+        with span("keyboard_press", "input", key=key):
+            self.input.keyboard_press(key)
+        self._settle("press")
 
     def set_foreground(self) -> None:
         """ 设置游戏到前台 """
-        hwnd = win32gui.GetForegroundWindow()
-        text = win32gui.GetWindowText(hwnd)
-        if text != self.game.name:
-            self.game.set_foreground()
-            time.sleep(1)
+        if not self.game.is_foreground():
+            with span("set_foreground", "window"):
+                self.game.set_foreground()
+                self.clock.sleep(self.delays.get("set_foreground", 0))
 
     @property
     def screenshot(self) -> ndarray:
@@ -267,7 +311,10 @@ class GameController:
         except WindowOutOfBoundsError:
             self.image_debug("Error")
             raise
-        mouse_drag(start, end, button)
+        self._record_action("mouse_drag", start=(start.x, start.y), end=(end.x, end.y), button=button)
+        with span("mouse_drag", "input"):
+            self.input.mouse_drag(start, end, button)
+        self._settle("mouse_drag")
 
     def mouse_scroll(self, pos: Pos, scale: int, count: int, duration=0.0):
         """鼠标移动至pos滚动scale刻度count次
@@ -279,109 +326,206 @@ class GameController:
         """
         self.set_foreground()
         self.mouse_move_to(pos, duration)
-        mouse_scroll(scale, count)
+        self._record_action("mouse_scroll", scale=scale, count=count)
+        with span("mouse_scroll", "input", scale=scale, count=count):
+            self.input.mouse_scroll(scale, count, clock=self.clock)
+        self._settle("mouse_scroll")
 
-    def wait_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> None:
+    def wait_image(self, *images: Union[str, ndarray, MatLike, ProbeSet], **kwargs) -> List[MatchResult]:
         """等待游戏内图片API
 
+        每次截图后匹配所有图片，返回满足条件的那一帧中匹配成功的结果(按images的顺序)
+
         Args:
-            images: (str, ndarray, MatLike)可以多张图片，也可以单张图片
+            images: (str, ndarray, MatLike, ProbeSet)可以多张图片，也可以单张图片，str可以是模板包中的模板名称，
+                ProbeSet满足时算匹配成功(不需要模板匹配)
 
         Keyword Arguments:
             all (bool): True等待所有图片，False其中一个图片(default False)
             timeout (int, float): 等待时间(default 60)
-            spacing (int, float): 每次匹配时间间隔(default 1)
-            threshold (int, float): 达到该阈值算匹配成功(default 0.8)
-            mode (str): 匹配模式
+            spacing (int, float, WaitPolicy): 每次匹配时间间隔或等待策略(default 控制器的policy)
+            threshold (int, float): 达到该阈值算匹配成功(default 模板包中的阈值或0.8)
+            mode (str): 匹配模式(default 模板包中的模式或color)
+            multiscale (bool): 未达到阈值时进行多尺度匹配 (default False)
+
+        Returns:
+            list[MatchResult]: 匹配成功的结果，all为False时至少有一个
 
         Raises:
             TimeoutError: 超时
         """
         self.set_foreground()
         try:
-            self._wait_image(*images, **kwargs)
+            return self._wait_image(*images, **kwargs)
         except TimeoutError:
             self.image_debug("Error")
             raise
 
+    def wait_and_click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> MatchResult:
+        """等待图片出现并点击API
+
+        直接点击等待成功那一帧中的匹配位置，不再重新截图匹配。若传入多个图像则点击第一个匹配成功的
+
+        Keyword Arguments:
+            与wait_image相同(不支持all)，以及
+            x (int): x偏移 (default 0)
+            y (int): y偏移 (default 0)
+
+        Returns:
+            MatchResult: 被点击的匹配结果
+
+        Raises:
+            TimeoutError: 超时
+        """
+        x = kwargs.pop("x", 0)
+        y = kwargs.pop("y", 0)
+        kwargs["all"] = False
+        if not isinstance(x, int):
+            raise TypeError("param x must is int type")
+        if not isinstance(y, int):
+            raise TypeError("param y must is int type")
+        result = self.wait_image(*images, **kwargs)[0]
+        if result.pos is None:
+            raise TypeError("the matched image has no position to click")
+        self.click_pos(result.center + Pos(x, y))
+        return result
+
+    def wait_text(self, text: str, **kwargs) -> MatchResult:
+        """等待游戏内文字出现API
+
+        Keyword Arguments:
+            timeout (int, float): 等待时间(default 60)
+            spacing (int, float, WaitPolicy): 每次识别时间间隔或等待策略(default 控制器的policy)
+
+        Returns:
+            MatchResult: 文字区域的外接矩形
+
+        Raises:
+            TimeoutError: 超时
+        """
+        if not isinstance(text, str):
+            raise TypeError("text must is str type")
+        self.set_foreground()
+        try:
+            return self._wait_text(text, **kwargs)
+        except TimeoutError:
+            self.image_debug("Error")
+            raise
+
+    def wait_and_click_text(self, text: str, position: str = "center", **kwargs) -> MatchResult:
+        """等待文字出现并点击API
+
+        直接点击识别成功那一帧中的文字位置，不再重新进行OCR
+
+        Args:
+            text (str): 文字
+            position (str): 文字位置(default "center") left, center, right
+
+        Keyword Arguments:
+            与wait_text相同，以及
+            x (int): x偏移 (default 0)
+            y (int): y偏移 (default 0)
+        """
+        if position not in ("left", "center", "right"):
+            raise ValueError("position must be left, center or right")
+        x = kwargs.pop("x", 0)
+        y = kwargs.pop("y", 0)
+        result = self.wait_text(text, **kwargs)
+        self.click_pos(result.point(position) + Pos(x, y))
+        return result
+
     def _click_pos(self, pos: Pos) -> None:
         """ 点击游戏内某个坐标 """
         game_pos = self._to_game_pos(pos)
-        mouse_click_position(game_pos)
+        self._record_action("click", pos=(game_pos.x, game_pos.y))
+        with span("mouse_click_position", "input", pos=(game_pos.x, game_pos.y)):
+            self.input.mouse_click_position(game_pos, clock=self.clock)
+        self._settle("click")
 
-    def _click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> None:
+    def _click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> MatchResult:
         """ 点击游戏内图片 """
         x = kwargs.get("x", 0)
         y = kwargs.get("y", 0)
-        threshold = kwargs.get("threshold", 0.8)
-        mode = kwargs.get("mode", "color")
+        threshold = kwargs.get("threshold")
+        mode = kwargs.get("mode")
+        multiscale = kwargs.get("multiscale", False)
+        timeout = kwargs.get("timeout", 0)
+        policy = to_policy(kwargs.get("spacing"), self.policy)
         if not isinstance(x, int):
             raise TypeError("param x must is int type")
         if not isinstance(y, int):
             raise TypeError("param y must is int type")
-        if not isinstance(threshold, (int, float)):
+        if not isinstance(threshold, (int, float, type(None))):
             raise TypeError("param threshold must is int or float type")
-        if not isinstance(mode, str):
+        if not isinstance(mode, (str, type(None))):
             raise TypeError("param mode must is str type")
-        screenshot = self.game.get_screenshot()
-        v, p = 0.0, Pos(0, 0)
-        log.debug(f"click image: threshold={threshold}, mode={mode}")
         for image in images:
             if not isinstance(image, (str, ndarray)):
                 raise TypeError("param image must is str or ndarray type")
-            if isinstance(image, str):
-                image = cv2.imread(image)
-            _, max_val, _, max_loc = match_template(screenshot, image, mode=mode)
-            if max_val < threshold:
-                if max_val > v:
-                    v = max_val
-                    p = Pos(max_loc)
-                continue
-                # 低于阈值的跳过
-            else:
-                log.debug(f"max_val={max_val}, threshold={threshold}")
-                h, w = image.shape[:2]
-                center = Pos(max_loc[0] + w // 2, max_loc[1] + h // 2)
-                center += Pos(x, y)
-                self.click_pos(center)
-                return
+        v, p, t = 0.0, Pos(0, 0), threshold
+        log.debug(f"click image: threshold={threshold}, mode={mode}")
+        for _ in poll(timeout, policy, self.clock):
+            screenshot = self._get_screenshot()
+            for image in images:
+                image_threshold = self._threshold(image, threshold)
+                max_val, max_loc, template = self._match(screenshot, image, mode, image_threshold, multiscale)
+                if max_val < image_threshold:
+                    if max_val > v:
+                        v, t = max_val, image_threshold
+                        p = Pos(max_loc)
+                    continue
+                    # 低于阈值的跳过
+                else:
+                    log.debug(f"max_val={max_val}, threshold={image_threshold}")
+                    h, w = template.shape[:2]
+                    result = MatchResult(self._template_name(image), Pos(max_loc), (w, h), max_val,
+                                         self._frame_time)
+                    self.click_pos(result.center + Pos(x, y))
+                    return result
         log.error(f"template matching failure, max value is {v}")
-        raise TemplateMathingFailure(f"Threshold: {v} < {threshold}, GamePos: {p}")
+        raise TemplateMathingFailure(f"Threshold: {v} < {t}, GamePos: {p}")
 
     def _click_text(self, text: str, position: str = "center", **kwargs) -> None:
         """ 点击游戏内文字 """
         x = kwargs.get("x", 0)
         y = kwargs.get("y", 0)
-        add_pos = Pos(x, y)
-        positions = get_text_position(self.game.get_screenshot(), text)
-        if positions.size == 0:
+        timeout = kwargs.get("timeout", 0)
+        policy = to_policy(kwargs.get("spacing"), self.policy)
+        for _ in poll(timeout, policy, self.clock):
+            box = get_text_position(self._get_screenshot(), text)
+            if box.size != 0:
+                break
+        else:
             raise TextMatchingFailure(f"The text does not exist in the game")
             # 没有匹配到相关的文字
-        index = 0
-        if position == "center":
-            index = (positions.size - 1) // 2
-            if index < 0:
-                index = 0
-        elif position == "right":
-            index = -1
-        position = positions[index]
-        x, y = position
-        pos = Pos(int(x), int(y)) + add_pos
-        self.click_pos(pos)
+        self.click_pos(self._text_result(text, box).point(position) + Pos(x, y))
 
     def _mouse_move_to(self, pos: Pos, duration: float) -> None:
         """ 将鼠标移动至某坐标点上 """
         game_pos = self._to_game_pos(pos)
-        mouse_move_to(game_pos, duration)
+        self._record_action("mouse_move_to", pos=(game_pos.x, game_pos.y), duration=duration)
+        with span("mouse_move_to", "input", pos=(game_pos.x, game_pos.y), duration=duration):
+            self.input.mouse_move_to(game_pos, duration)
+        self._settle("mouse_move_to")
 
-    def _to_game_pos(self, pos: Pos) -> Pos:
-        """ 将坐标转换成游戏坐标 """
+    def _to_game_pos(self, pos: Union[Pos, PosArray]) -> Union[Pos, PosArray]:
+        """ 将坐标转换成游戏坐标，PosArray会一次性转换并检查所有坐标 """
         if pos.is_game:
             return pos
         rect = self.game.get_rect()
+        if isinstance(pos, PosArray):
+            game_pos = pos.to_screen(rect)
+            outside = ~game_pos.in_bounds(rect)
+            if outside.any():
+                x2, y2 = game_pos[int(outside.argmax())]
+                log.error(f"The given coordinate ({x2}, {y2}) is outside")
+                raise WindowOutOfBoundsError(f"{int(outside.sum())} coordinates such as ({x2}, {y2}) are outside "
+                                             f"the game window bounds "
+                                             f"({rect.left}, {rect.top}) - ({rect.right}, {rect.bottom})")
+            return game_pos
         x1, y1 = pos.x, pos.y
         x2, y2 = x1 + rect.left, y1 + rect.top
-        game_pos = Pos(x2, y2)
+        game_pos = Pos(x2, y2, is_game=True)
         # 坐标转换成游戏内坐标
         if x2 < rect.left or x2 > rect.right or y2 < rect.top or y2 > rect.bottom:
             log.error(f"The given coordinate ({x2}, {y2}) is outside")
@@ -391,46 +535,197 @@ class GameController:
             # 给出的坐标超出游戏窗口范围
         return game_pos
 
-    def _wait_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> None:
+    def _wait_image(self, *images: Union[str, ndarray, MatLike, ProbeSet], **kwargs) -> List[MatchResult]:
         """ 等待图片 """
         all_ = kwargs.get("all", False)
-        threshold = kwargs.get("threshold", 0.8)
-        mode = kwargs.get("mode", "color")
+        threshold = kwargs.get("threshold")
+        mode = kwargs.get("mode")
+        multiscale = kwargs.get("multiscale", False)
         timeout = kwargs.get("timeout", 60)  # second
-        spacing = kwargs.get("spacing", 1)  # second
-        start_time = time.time()
+        policy = to_policy(kwargs.get("spacing"), self.policy)
         length = len(images)
         if not isinstance(all_, bool):
             raise TypeError("param all must is bool type")
-        if not isinstance(threshold, (int, float)):
+        if not isinstance(threshold, (int, float, type(None))):
             raise TypeError("param threshold must is int or float type")
-        if not isinstance(mode, str):
+        if not isinstance(mode, (str, type(None))):
             raise TypeError("param mode must is str type")
-        if not isinstance(timeout, int):
-            raise TypeError("param timeout must is int type")
-        if not isinstance(spacing, int):
-            raise TypeError("param spacing must is int type")
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+            raise TypeError("param timeout must is int or float type")
 
-        while time.time() - start_time <= timeout:
-            count = 0
+        for _ in poll(timeout, policy, self.clock):
+            results = []
+            screenshot = self._get_screenshot()
             for image in images:
-                screenshot = self.game.get_screenshot()
-                _, max_val, _, max_loc = match_template(screenshot, image, mode=mode)
-                if max_val >= threshold:
-                    count += 1
-                    if not all_:
-                        # 不需要全部匹配成功
-                        return
-                if count == length:
+                if isinstance(image, ProbeSet):
+                    if image(screenshot):
+                        results.append(MatchResult("ProbeSet", None, (0, 0), 1.0, self._frame_time))
+                else:
+                    image_threshold = self._threshold(image, threshold)
+                    max_val, max_loc, template = self._match(screenshot, image, mode, image_threshold, multiscale)
+                    if max_val >= image_threshold:
+                        h, w = template.shape[:2]
+                        results.append(MatchResult(self._template_name(image), Pos(max_loc), (w, h),
+                                                   max_val, self._frame_time))
+                if results and not all_:
+                    # 不需要全部匹配成功
+                    return results
+                if len(results) == length:
                     # 全部匹配成功
-                    return
-            time.sleep(spacing)
-        log.error(f"Wait timeout: timeout={timeout}, spacing={spacing}")
+                    return results
+        log.error(f"Wait timeout: timeout={timeout}, policy={policy}")
+        raise TimeoutError(f"Wait timeout")
+
+    def _wait_text(self, text: str, **kwargs) -> MatchResult:
+        """ 等待文字 """
+        timeout = kwargs.get("timeout", 60)  # second
+        policy = to_policy(kwargs.get("spacing"), self.policy)
+        for _ in poll(timeout, policy, self.clock):
+            box = get_text_position(self._get_screenshot(), text)
+            if box.size != 0:
+                return self._text_result(text, box)
+        log.error(f"Wait text timeout: timeout={timeout}, policy={policy}")
         raise TimeoutError(f"Wait timeout")
 
+    def _text_result(self, text: str, box: ndarray) -> MatchResult:
+        """ OCR文本框(多边形顶点)的外接矩形 """
+        left, top = np.min(box, axis=0).astype(int)
+        right, bottom = np.max(box, axis=0).astype(int)
+        return MatchResult(text, Pos(int(left), int(top)), (int(right - left), int(bottom - top)),
+                           1.0, self._frame_time)
+
+    def _get_bundle(self) -> Optional[TemplateBundle]:
+        return get_bundle() if self.bundle is None else self.bundle
+
+    def _match(self, screenshot: ndarray, image: Union[str, ndarray, MatLike], mode: Optional[str],
+               threshold: float = 0.0, multiscale: bool = False) -> tuple:
+        """匹配单个模板
+
+        模板包中指定了roi的模板只在roi内搜索，返回的坐标已加上roi的偏移。
+        mode为None时使用模板包中的mode(没有时为color)，匹配方法使用模板包中的method(没有时为TM_CCOEFF_NORMED)。
+        设置了scaler时模板和roi按当前窗口大小缩放，multiscale为True且未达到threshold时再进行多尺度匹配
+
+        Returns:
+            (max_val, max_loc, template) template为实际参与匹配的模板
+        """
+        mode = self._option(image, "mode", mode, "color")
+        with span("match", "match", template=self._template_name(image), mode=mode) as args:
+            max_val, max_loc, template = self.__match(screenshot, image, mode, threshold, multiscale)
+            args.update(score=float(max_val), loc=tuple(int(v) for v in max_loc))
+        self._record_match(self._template_name(image), max_val, max_loc)
+        return max_val, max_loc, template
+
+    def __match(self, screenshot: ndarray, image: Union[str, ndarray, MatLike], mode: str,
+                threshold: float, multiscale: bool) -> tuple:
+        bundle = self._get_bundle()
+        template = load_template(image, mode, bundle)
+        method = self._option(image, "method", None, "TM_CCOEFF_NORMED")
+        # 模板包的二值图以模板包的thresh生成，画面使用同一个阈值
+        thresh = template_thresh(image, bundle)
+        roi = None
+        if isinstance(image, str) and bundle is not None and image in bundle:
+            roi = bundle.roi(image)
+        if self.scaler is not None:
+            h, w = screenshot.shape[:2]
+            self.scaler.update((w, h), self.game.scaling if self.scaler.use_dpi else 1.0)
+            template = self.scaler.scale(template, (image, mode) if isinstance(image, str) else None)
+            if roi is not None:
+                roi = self.scaler.scale_roi(roi)
+        left, top = 0, 0
+        if roi is not None:
+            left, top, right, bottom = roi
+            screenshot = screenshot[top:bottom, left:right]
+        h, w = screenshot.shape[:2]
+        if template.shape[0] > h or template.shape[1] > w:
+            # 模板比画面(或roi)大时不可能匹配，视为分数0
+            max_val, max_loc = 0.0, (0, 0)
+        else:
+            _, max_val, _, max_loc = match_template(screenshot, template, mode=mode, method=method, thresh=thresh)
+        if multiscale and max_val < threshold:
+            try:
+                _, value, _, loc, scale = match_template_multiscale(screenshot, template, mode=mode, method=method,
+                                                                    thresh=thresh)
+            except ValueError:
+                # 所有比例下模板都比画面大
+                value, loc, scale = 0.0, (0, 0), 1.0
+            if value > max_val:
+                log.debug(f"multiscale match: scale={scale}, max_val={value}")
+                max_val, max_loc = value, loc
+                template = _resize(template, scale)
+        max_loc = (max_loc[0] + left, max_loc[1] + top)
+        return max_val, max_loc, template
+
+    def _option(self, image: Union[str, ndarray, MatLike], key: str, value: Any, default: Any) -> Any:
+        """ 未指定value时使用模板包中该模板的key选项(mode method等)，都没有时为default """
+        if value is not None:
+            return value
+        bundle = self._get_bundle()
+        if isinstance(image, str) and bundle is not None and image in bundle:
+            option = bundle.option(image, key)
+            if option is not None:
+                return option
+        return default
+
+    def _threshold(self, image: Union[str, ndarray, MatLike], threshold: Optional[float]) -> float:
+        """ 未指定阈值时使用模板包中的阈值，都没有时为0.8 """
+        if threshold is not None:
+            return threshold
+        bundle = self._get_bundle()
+        if isinstance(image, str) and bundle is not None and image in bundle:
+            value = bundle.threshold(image)
+            if value is not None:
+                return value
+        return 0.8
+
+    def _get_screenshot(self) -> ndarray:
+        """ 截图并交给recorder记录 """
+        with span("capture", "capture"):
+            screenshot = self.game.get_screenshot()
+        self._frame_time = self.clock.time()
+        if self.recorder is not None:
+            self.recorder.record_frame(screenshot)
+        if len(self.watchers):
+            with span("watchers", "match"):
+                self.watchers.evaluate(screenshot)
+        return screenshot
+
+    def _settle(self, action: str) -> None:
+        """ 输入后等待画面响应，等待时间由delays设置 """
+        delay = self.delays.get(action, 0)
+        if delay > 0:
+            with span("settle", "wait", action=action, delay=delay):
+                self.clock.sleep(delay)
+
+    def _record_action(self, action: str, **info) -> None:
+        if self.recorder is not None:
+            self.recorder.record_action(action, **info)
+
+    def _record_match(self, template: str, score: float, loc: tuple) -> None:
+        if self.recorder is not None:
+            self.recorder.record_match(template, score, loc)
+
+    @staticmethod
+    def _template_name(image: Union[str, ndarray, MatLike]) -> str:
+        """ 模板的名称, 用于调试记录 """
+        if isinstance(image, str):
+            return image
+        return f"ndarray{tuple(image.shape)}"
+
+    def __game_meta(self) -> dict:
+        """游戏窗口的几何信息, 随调试记录一起保存以便回放
+
+        在异常处理中调用，窗口已关闭等原因无法获取的信息不保存，不掩盖原来的异常
+        """
+        meta = dict(cls=self.game.cls, name=self.game.name)
+        try:
+            meta["rect"] = list(self.game.get_rect().rect())
+            meta["scaling"] = self.game.scaling
+        except Exception as e:
+            log.warning(f"debug dump without window geometry: {e!r}")
+        return meta
+
     def __image_filename(self, level: str) -> str:
-        """ 获取图片保存名称 """
+        """ 获取调试记录保存的目录名称 """
         return os.path.join(self.filename,
                             f"[{level}]" +
-                            datetime.now().strftime("%Y-%m-%d (%H-%M-%S)") +
-                            ".png")
+                            datetime.now().strftime("%Y-%m-%d (%H-%M-%S)"))
@@ -1,23 +1,25 @@
 from threading import Thread
-from typing import Union
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Union
 
 from cv2.typing import MatLike
 from numpy import ndarray
 
-from .core import Pos, Rect
+from .core import Pos, PosArray, Rect, MatchResult
+from .recorder import FlightRecorder
+from .clock import Clock
+from .bundle import TemplateBundle
+from .image_recognition import TemplateScaler
+from .watcher import Watcher, WatcherSet
+from .probe import ProbeSet
+from .policy import WaitPolicy
 
-
-def _get_screen_size(): ...
-
-
-def _get_read_size(): ...
-
-
-def _get_scaling() -> float: ...
+DELAYS: Dict[str, float]
 
 
 class Game:
     screenshot: ndarray
+    _backend: ModuleType
     _game_class: Union[str, None]
     _game_name: str
     _hwnd: int
@@ -44,6 +46,8 @@ class Game:
     @property
     def name(self) -> str: ...
 
+    def is_foreground(self) -> bool: ...
+
     def set_foreground(self) -> None: ...
 
     def get_screenshot(self) -> ndarray: ...
@@ -55,11 +59,24 @@ class GameController:
     game: Game
     debug: bool
     filename: str
-    def __init__(self, game_class: Union[str, None], game_name: str, debug=False, filename=""): ...
+    recorder: Optional[FlightRecorder]
+    input: Any
+    clock: Clock
+    bundle: Optional[TemplateBundle]
+    scaler: Optional[TemplateScaler]
+    policy: WaitPolicy
+    delays: Dict[str, float]
+    watchers: WatcherSet
+    _frame_time: float
+    def __init__(self, game_class: Union[str, None], game_name: str, debug=False, filename="",
+                 recorder: Optional[FlightRecorder] = None, game: Optional[Game] = None, backend: Any = None,
+                 clock: Optional[Clock] = None, bundle: Optional[TemplateBundle] = None,
+                 scaler: Optional[TemplateScaler] = None, policy: Optional[WaitPolicy] = None,
+                 delays: Optional[Dict[str, float]] = None): ...
 
     def click_pos(self, pos: Pos) -> None: ...
 
-    def click_image(self, *images: Union[str, ndarray, MatLike], **kwargs): ...
+    def click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> MatchResult: ...
 
     def click_text(self, text: str, position: str = "center", **kwargs) -> None: ...
 
@@ -67,6 +84,10 @@ class GameController:
 
     def get_screenshot(self) -> ndarray: ...
 
+    def add_watcher(self, watcher: Watcher) -> Watcher: ...
+
+    def poll_watchers(self) -> list[Watcher]: ...
+
     def image_debug(self, level="Debug") -> None: ...
 
     def press(self, key: str) -> None: ...
@@ -82,18 +103,54 @@ class GameController:
 
     def mouse_scroll(self, pos: Pos, scale: int, count: int, duration=0.0): ...
 
-    def wait_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> None: ...
+    def wait_image(self, *images: Union[str, ndarray, MatLike, ProbeSet], **kwargs) -> List[MatchResult]: ...
+
+    def wait_and_click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> MatchResult: ...
+
+    def wait_text(self, text: str, **kwargs) -> MatchResult: ...
+
+    def wait_and_click_text(self, text: str, position: str = "center", **kwargs) -> MatchResult: ...
 
     def _click_pos(self, pos: Pos) -> None: ...
 
-    def _click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> None: ...
+    def _click_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> MatchResult: ...
 
     def _click_text(self, text: str, position: str = "center", **kwargs) -> None: ...
 
     def _mouse_move_to(self, pos: Pos, duration: float) -> None: ...
 
-    def _to_game_pos(self, pos: Pos) -> Pos: ...
+    def _to_game_pos(self, pos: Union[Pos, PosArray]) -> Union[Pos, PosArray]: ...
+
+    def _wait_image(self, *images: Union[str, ndarray, MatLike, ProbeSet], **kwargs) -> List[MatchResult]: ...
+
+    def _wait_text(self, text: str, **kwargs) -> MatchResult: ...
+
+    def _text_result(self, text: str, box: ndarray) -> MatchResult: ...
+
+    def _get_bundle(self) -> Optional[TemplateBundle]: ...
+
+    def _match(self, screenshot: ndarray, image: Union[str, ndarray, MatLike], mode: Optional[str],
+               threshold: float = 0.0, multiscale: bool = False)\
+            -> tuple[float, tuple[int, int], ndarray]: ...
+
+    def __match(self, screenshot: ndarray, image: Union[str, ndarray, MatLike], mode: str,
+                threshold: float, multiscale: bool) -> tuple[float, tuple[int, int], ndarray]: ...
+
+    def _option(self, image: Union[str, ndarray, MatLike], key: str, value: Any, default: Any) -> Any: ...
+
+    def _threshold(self, image: Union[str, ndarray, MatLike], threshold: Optional[float]) -> float: ...
+
+    def _get_screenshot(self) -> ndarray: ...
+
+    def _settle(self, action: str) -> None: ...
+
+    def _record_action(self, action: str, **info) -> None: ...
+
+    def _record_match(self, template: str, score: float, loc: tuple) -> None: ...
+
+    @staticmethod
+    def _template_name(image: Union[str, ndarray, MatLike]) -> str: ...
 
-    def _wait_image(self, *images: Union[str, ndarray, MatLike], **kwargs) -> None: ...
+    def __game_meta(self) -> dict: ...
 
     def __image_filename(self, level: str) -> str: ...
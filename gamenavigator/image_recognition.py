@@ -1,16 +1,56 @@
+from collections import OrderedDict
+
 import cv2
 import numpy as np
 from typing import Union
 from cv2.typing import MatLike
 
+from .bundle import TemplateBundle, get_bundle
+
 
-def __to_ndarray(img: Union[str, np.ndarray, MatLike]) -> Union[np.ndarray, MatLike]:
-    """ 若img是图像路径则读取后返回，否则直接返回 """
+def __to_ndarray(img: Union[str, np.ndarray, MatLike], mode: str = "color") -> Union[np.ndarray, MatLike]:
+    """ 若img是模板名称或图像路径则读取后返回，否则直接返回 """
     if isinstance(img, str):
-        img = cv2.imread(img)
+        img = load_template(img, mode)
     return img
 
 
+def load_template(img: Union[str, np.ndarray, MatLike], mode: str = "color",
+                  bundle: Union[TemplateBundle, None] = None) -> Union[np.ndarray, MatLike]:
+    """读取模板
+
+    img是字符串时优先在模板包中按名称查找(返回mode对应的预处理版本)，找不到时当作图像路径读取
+
+    Args:
+        img (str, ndarray, MatLike): 模板名称、图像路径或图像
+        mode (str): 匹配模式 color gray binary (default color)
+        bundle (TemplateBundle, None): 模板包, 为None时使用默认模板包
+    """
+    if not isinstance(img, str):
+        return img
+    if bundle is None:
+        bundle = get_bundle()
+    if bundle is not None and img in bundle:
+        return bundle.get(img, mode)
+    template = cv2.imread(img)
+    if template is None:
+        raise FileNotFoundError(f"template '{img}' is not in the bundle and can not be read")
+    return template
+
+
+def template_thresh(img: Union[str, np.ndarray, MatLike], bundle: Union[TemplateBundle, None] = None) -> int:
+    """二值图模式默认的阈值
+
+    模板包中的二值图在编译时以模板包的thresh生成，画面需要使用同一个阈值二值化，
+    img是模板包中的模板名称时返回模板包的thresh，否则为127
+    """
+    if bundle is None:
+        bundle = get_bundle()
+    if isinstance(img, str) and bundle is not None and img in bundle:
+        return bundle.thresh
+    return 127
+
+
 def match_template(img: Union[str, np.ndarray, MatLike], template: Union[str, np.ndarray, MatLike], **kwargs) -> tuple:
     """图像匹配
     使用的是cv2的模板匹配，必须要保证 img 和 template 是属于同一种类型图像，即都是灰度图或彩色图，且大小一致。
@@ -19,7 +59,7 @@ def match_template(img: Union[str, np.ndarray, MatLike], template: Union[str, np
     Keyword Arguments:
         method (str): 模板匹配方法，默认是TM_CCOEFF_NORMED  str类型
         mode (str): 匹配模式 color binary gray (default color)
-        thresh (int): 只有在二值图模式下才有用  int类型
+        thresh (int): 只有在二值图模式下才有用  int类型 (default 模板包的thresh或127)
         max_val (int): 只有在二值图模式下才有用  int类型
 
     Returns:
@@ -30,13 +70,19 @@ def match_template(img: Union[str, np.ndarray, MatLike], template: Union[str, np
     elif not isinstance(template, (str, np.ndarray, MatLike)):
         raise TypeError("only accept str or np.ndarray or MatLike")
 
+    mode = kwargs.get("mode", "color")
+    thresh = kwargs.get("thresh")
+    if thresh is None:
+        thresh = template_thresh(template)
+    elif mode == "binary" and thresh != template_thresh(template):
+        # 模板包中的二值图以另一个阈值生成，使用灰度图在thresh下重新二值化
+        template = __to_ndarray(template, "gray")
     img = __to_ndarray(img)
-    template = __to_ndarray(template)
+    template = __to_ndarray(template, mode)
 
     method = kwargs.get("method", "TM_CCOEFF_NORMED")
     methods = ("TM_SQDIFF", "TM_SQDIFF_NORMED", "TM_CCOEFF_NORMED",
                "TM_CCORR_NORMED", "TM_CCORR", "TM_CCOEFF")
-    mode = kwargs.get("mode", "color")
     modes = ("color", "gray", "binary")
 
     # 判断传入的关键词是否支持
@@ -74,7 +120,6 @@ def match_template(img: Union[str, np.ndarray, MatLike], template: Union[str, np
         return cv2.minMaxLoc(res)
         # 灰度图模式
     else:
-        thresh = kwargs.get("thresh", 127)
         max_val = kwargs.get("max_val", 255)
         _, img_binary = cv2.threshold(img_gray, thresh, max_val, cv2.THRESH_BINARY)
         _, template_binary = cv2.threshold(template_gray, thresh, max_val, cv2.THRESH_BINARY)
@@ -96,3 +141,229 @@ def where_img(img: Union[str, np.ndarray, MatLike], template: Union[str, np.ndar
     res = cv2.matchTemplate(img, template, cv2.TM_CCOEFF_NORMED)
     positions = np.where(res >= threshold)
     return tuple(zip(*positions[::-1]))
+
+
+class IconLibrary:
+    def __init__(self, size: tuple = (12, 12), bins: int = 8) -> None:
+        """图标库
+
+        为每个模板预先计算一个紧凑的描述子(缩略图向量 + 颜色直方图)并存入同一个矩阵，
+        识别时先用一次矩阵运算筛选出最相近的k个候选，再只对候选进行cv2.matchTemplate验证。
+
+        Args:
+            size (tuple): 缩略图大小(w, h) (default (12, 12))
+            bins (int): 每个颜色通道的直方图分箱数 (default 8)
+        """
+        if not isinstance(bins, int) or bins < 1:
+            raise ValueError("param bins must be a positive int")
+        self.size = tuple(size)
+        self.bins = bins
+        self.names: list = []
+        self._templates: dict = dict()
+        self._matrix = np.empty((0, self.size[0] * self.size[1] * 3 + bins * 3), np.float32)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._templates
+
+    def add(self, name: str, template: Union[str, np.ndarray, MatLike]) -> None:
+        """ 添加模板，模板必须是BGR格式 """
+        if not isinstance(name, str):
+            raise TypeError("param name must is str type")
+        if name in self._templates:
+            raise ValueError(f"A template named '{name}' already exists.")
+        if isinstance(template, str):
+            template = cv2.imread(template)
+        if template is None or template.ndim != 3:
+            raise ValueError(f"template '{name}' must be a BGR image")
+        self._templates[name] = template
+        self.names.append(name)
+        self._dirty = True
+
+    def get(self, name: str) -> np.ndarray:
+        """ 获取模板 """
+        return self._templates[name]
+
+    def build(self) -> None:
+        """ 计算所有模板的描述子矩阵，add之后第一次查询时会自动调用 """
+        if not self.names:
+            self._matrix = self._matrix[:0]
+        else:
+            self._matrix = np.stack([self.descriptor(self._templates[n]) for n in self.names])
+        self._dirty = False
+
+    def descriptor(self, img: np.ndarray) -> np.ndarray:
+        """ 计算图像的描述子, 单位长度的float32向量 """
+        thumb = cv2.resize(img, self.size, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+        thumb -= thumb.mean()
+        norm = np.linalg.norm(thumb)
+        if norm > 0:
+            thumb /= norm
+        hist = np.concatenate([cv2.calcHist([img], [c], None, [self.bins], [0, 256]).ravel() for c in range(3)])
+        hist /= max(float(np.linalg.norm(hist)), 1e-6)
+        vector = np.concatenate([thumb, hist]).astype(np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-6)
+
+    def shortlist(self, img: Union[str, np.ndarray, MatLike], k: int = 5) -> list:
+        """筛选与img最相近的k个模板
+
+        Returns:
+            list[(name, similarity)]: 按相似度从高到低排列
+        """
+        if isinstance(img, str):
+            img = cv2.imread(img)
+        if self._dirty:
+            self.build()
+        if not self.names:
+            return []
+        similarity = self._matrix @ self.descriptor(img)
+        k = min(k, len(self.names))
+        index = np.argpartition(-similarity, k - 1)[:k]
+        index = index[np.argsort(-similarity[index])]
+        return [(self.names[i], float(similarity[i])) for i in index]
+
+    def identify(self, img: Union[str, np.ndarray, MatLike], k: int = 5, threshold: float = 0.8, **kwargs) -> tuple:
+        """识别img中是哪一个模板
+
+        img是包含单个图标的截图区域，只对shortlist筛选出的k个候选进行模板匹配
+
+        Keyword Arguments:
+            与match_template相同的method mode thresh max_val
+
+        Returns:
+            (name, max_val, max_loc)，没有候选达到阈值时返回(None, 最高分数, None)
+        """
+        if isinstance(img, str):
+            img = cv2.imread(img)
+        best_val, best_name, best_loc = 0.0, None, None
+        ih, iw = img.shape[:2]
+        for name, _ in self.shortlist(img, k):
+            template = self._templates[name]
+            th, tw = template.shape[:2]
+            if th > ih or tw > iw:
+                # 模板比截图大时缩小到截图内
+                scale = min(ih / th, iw / tw)
+                template = cv2.resize(template, (max(int(tw * scale), 1), max(int(th * scale), 1)),
+                                      interpolation=cv2.INTER_AREA)
+            _, max_val, _, max_loc = match_template(img, template, **kwargs)
+            if max_val > best_val:
+                best_val, best_name, best_loc = max_val, name, max_loc
+        if best_val < threshold:
+            return None, best_val, None
+        return best_name, best_val, best_loc
+
+
+def match_template_multiscale(img: Union[str, np.ndarray, MatLike], template: Union[str, np.ndarray, MatLike],
+                              scales: tuple = (0.8, 0.9, 1.0, 1.1, 1.2), **kwargs) -> tuple:
+    """多尺度图像匹配
+
+    将模板按scales中的每个比例缩放后分别匹配，返回分数最高的结果
+
+    Keyword Arguments:
+        与match_template相同
+
+    Returns:
+        min_val, max_val, min_loc, max_loc, scale
+    """
+    kwargs.setdefault("thresh", template_thresh(template))
+    img = __to_ndarray(img)
+    template = __to_ndarray(template, kwargs.get("mode", "color"))
+    best = None
+    ih, iw = img.shape[:2]
+    for scale in scales:
+        scaled = _resize(template, scale)
+        h, w = scaled.shape[:2]
+        if h > ih or w > iw:
+            continue
+        result = match_template(img, scaled, **kwargs)
+        if best is None or result[1] > best[1]:
+            best = result + (scale,)
+    if best is None:
+        raise ValueError("template is larger than image at every scale")
+    return best
+
+
+def _resize(img: np.ndarray, scale: float) -> np.ndarray:
+    """ 按比例缩放图像，缩小使用INTER_AREA，放大使用INTER_LINEAR """
+    if scale == 1.0:
+        return img
+    h, w = img.shape[:2]
+    size = (max(int(round(w * scale)), 1), max(int(round(h * scale)), 1))
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+    return cv2.resize(img, size, interpolation=interpolation)
+
+
+class TemplateScaler:
+    def __init__(self, reference_size: tuple, reference_scaling: float = 1.0, use_dpi: bool = False,
+                 cache_size: int = 128) -> None:
+        """模板缩放
+
+        模板在reference_size分辨率的窗口中截取，匹配前根据当前窗口大小将模板缩放到对应的大小。
+        缩放后的模板会被缓存，只有窗口大小或缩放率变化时才重新生成，缓存只保留最近使用的cache_size个模板
+
+        Args:
+            reference_size (tuple): 截取模板时的窗口大小(w, h)
+            reference_scaling (float): 截取模板时的电脑缩放率 (default 1.0)
+            use_dpi (bool): 游戏界面随电脑缩放率而不是窗口大小缩放时为True (default False)
+            cache_size (int): 缓存的模板数量 (default 128)
+        """
+        if cache_size < 1:
+            raise ValueError("param cache_size must be positive")
+        if len(reference_size) != 2:
+            raise ValueError("param reference_size must be (w, h)")
+        self.reference_size = tuple(reference_size)
+        self.reference_scaling = reference_scaling
+        self.use_dpi = use_dpi
+        self.factor = 1.0
+        self._geometry: Union[tuple, None] = None
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+
+    def update(self, size: tuple, scaling: float = 1.0) -> float:
+        """根据当前窗口大小(w, h)和缩放率计算缩放比例，几何信息变化时清空缓存
+
+        Returns:
+            float: 缩放比例
+        """
+        geometry = (tuple(size), scaling)
+        if geometry == self._geometry:
+            return self.factor
+        if self.use_dpi:
+            factor = scaling / self.reference_scaling
+        else:
+            factor = min(size[0] / self.reference_size[0], size[1] / self.reference_size[1])
+        self._geometry = geometry
+        if round(factor, 3) != round(self.factor, 3):
+            self._cache.clear()
+        self.factor = round(factor, 3)
+        return self.factor
+
+    def scale(self, template: np.ndarray, key=None) -> np.ndarray:
+        """返回按当前比例缩放后的模板
+
+        Args:
+            template (ndarray): 模板
+            key: 缓存键(例如模板名称和匹配模式), 为None时以模板对象本身作为键
+        """
+        if self.factor == 1.0:
+            return template
+        # 以id为键时检查是否为同一个数组，缓存中保留的引用使该id在缓存期间不会被其他数组复用
+        identity = key is None
+        key = id(template) if identity else key
+        cached = self._cache.get(key)
+        if cached is not None and (not identity or cached[0] is template):
+            self._cache.move_to_end(key)
+            return cached[1]
+        scaled = _resize(template, self.factor)
+        self._cache[key] = (template, scaled)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return scaled
+
+    def scale_roi(self, roi: tuple) -> tuple:
+        """ 将参考分辨率下的区域(left, top, right, bottom)换算到当前窗口 """
+        return tuple(int(round(v * self.factor)) for v in roi)
@@ -1,9 +1,20 @@
+from collections import OrderedDict
+
 import numpy as np
 from typing import Union
 from cv2.typing import MatLike
 
+from .bundle import TemplateBundle
+
+
+def __to_ndarray(img: Union[str, np.ndarray, MatLike], mode: str = "color") -> Union[np.ndarray, MatLike]: ...
+
 
-def __to_ndarray(img: Union[str, np.ndarray, MatLike]) -> Union[np.ndarray, MatLike]: ...
+def load_template(img: Union[str, np.ndarray, MatLike], mode: str = "color",
+                  bundle: Union[TemplateBundle, None] = None) -> Union[np.ndarray, MatLike]: ...
+
+
+def template_thresh(img: Union[str, np.ndarray, MatLike], bundle: Union[TemplateBundle, None] = None) -> int: ...
 
 
 def match_template(img: Union[str, np.ndarray, MatLike], template: Union[str, np.ndarray, MatLike], **kwargs)\
@@ -12,3 +23,56 @@ def match_template(img: Union[str, np.ndarray, MatLike], template: Union[str, np
 
 def where_img(img: Union[str, np.ndarray, MatLike], template: Union[str, np.ndarray, MatLike], threshold=0.8)\
         -> tuple[tuple[int, int]]: ...
+
+
+class IconLibrary:
+    size: tuple[int, int]
+    bins: int
+    names: list[str]
+    _templates: dict[str, np.ndarray]
+    _matrix: np.ndarray
+    _dirty: bool
+    def __init__(self, size: tuple = (12, 12), bins: int = 8) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __contains__(self, name: str) -> bool: ...
+
+    def add(self, name: str, template: Union[str, np.ndarray, MatLike]) -> None: ...
+
+    def get(self, name: str) -> np.ndarray: ...
+
+    def build(self) -> None: ...
+
+    def descriptor(self, img: np.ndarray) -> np.ndarray: ...
+
+    def shortlist(self, img: Union[str, np.ndarray, MatLike], k: int = 5) -> list[tuple[str, float]]: ...
+
+    def identify(self, img: Union[str, np.ndarray, MatLike], k: int = 5, threshold: float = 0.8, **kwargs)\
+            -> tuple[Union[str, None], float, Union[tuple[int, int], None]]: ...
+
+
+def match_template_multiscale(img: Union[str, np.ndarray, MatLike], template: Union[str, np.ndarray, MatLike],
+                              scales: tuple = (0.8, 0.9, 1.0, 1.1, 1.2), **kwargs)\
+        -> tuple[float, float, tuple[int, int], tuple[int, int], float]: ...
+
+
+def _resize(img: np.ndarray, scale: float) -> np.ndarray: ...
+
+
+class TemplateScaler:
+    reference_size: tuple[int, int]
+    reference_scaling: float
+    use_dpi: bool
+    factor: float
+    cache_size: int
+    _geometry: Union[tuple, None]
+    _cache: OrderedDict
+    def __init__(self, reference_size: tuple, reference_scaling: float = 1.0, use_dpi: bool = False,
+                 cache_size: int = 128) -> None: ...
+
+    def update(self, size: tuple, scaling: float = 1.0) -> float: ...
+
+    def scale(self, template: np.ndarray, key=None) -> np.ndarray: ...
+
+    def scale_roi(self, roi: tuple) -> tuple[int, int, int, int]: ...
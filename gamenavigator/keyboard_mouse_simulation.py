@@ -1,13 +1,13 @@
 """模拟键盘鼠标
 
+pyautogui和win32api在第一次输入时才导入，导入本模块不依赖Windows
+点击和滚动的延迟使用clock参数的时钟，为None时使用包默认时钟
 """
-import time
-
-import pyautogui
-import win32api
-import win32con
+from typing import Optional
 
 from .core import Pos
+from .clock import Clock, get_clock
+from .trace import span
 from . import log
 
 
@@ -17,18 +17,21 @@ def mouse_move_to(pos: Pos, duration: float = 0.0) -> None:
         raise TypeError("pos must be Pos")
     if not isinstance(duration, float):
         raise TypeError("duration must be float")
+    import pyautogui
     pyautogui.moveTo(pos.x, pos.y, duration)
     log.debug(f"mouse move to {pos}")
 
 
-def mouse_click_position(pos: Pos, button: str = "left") -> None:
-    """ 模拟鼠标点击坐标pos """
+def mouse_click_position(pos: Pos, button: str = "left", clock: Optional[Clock] = None) -> None:
+    """ 模拟鼠标点击坐标pos，按下和松开之间通过clock等待 """
     if not isinstance(pos, Pos):
         raise TypeError("pos must be Pos")
     if not isinstance(button, str):
         raise TypeError("button must be str")
     if button not in ("left", "right"):
         raise ValueError("button must be left or right")
+    import win32api
+    import win32con
     if button == "left":
         down = win32con.MOUSEEVENTF_LEFTDOWN
         up = win32con.MOUSEEVENTF_LEFTUP
@@ -38,18 +41,20 @@ def mouse_click_position(pos: Pos, button: str = "left") -> None:
     x, y = pos.x, pos.y
     win32api.SetCursorPos((x, y))
     win32api.mouse_event(down, x, y, 0, 0)
-    time.sleep(0.15)  # 过快的点击将导致游戏反应不过来最终导致点击失效
+    with span("click_delay", "input"):
+        (get_clock() if clock is None else clock).sleep(0.15)  # 过快的点击将导致游戏反应不过来最终导致点击失效
     win32api.mouse_event(up, x, y, 0, 0)
     log.debug(f"mouse click({button}): {pos}")
 
 
-def mouse_scroll(scale: int, count: int = 1) -> None:
+def mouse_scroll(scale: int, count: int = 1, clock: Optional[Clock] = None) -> None:
     """鼠标滚轮滚动
     这个“刻度”的具体滚动距离取决于你的系统设置和鼠标驱动。
 
     Args:
         scale (int): 刻度
         count (int): 次数
+        clock (Clock, None): 每次滚动后等待使用的时钟, 为None时使用包默认时钟
     """
     if not isinstance(scale, int):
         raise TypeError("scale must be int")
@@ -57,13 +62,16 @@ def mouse_scroll(scale: int, count: int = 1) -> None:
         raise TypeError("count must be int")
     if count < 1:
         raise ValueError("count must be greater than 0")
+    import pyautogui
+    clock = get_clock() if clock is None else clock
     for _ in range(count):
         try:
             pyautogui.scroll(scale)
         except pyautogui.FailSafeException:
             print("Scrolling stopped due to failure.")
             break
-        time.sleep(0.1)  # 添加0.1秒的延迟
+        with span("scroll_delay", "input"):
+            clock.sleep(0.1)  # 添加0.1秒的延迟
     log.debug(f"mouse scroll scale : {scale}, count : {count}")
 
 
@@ -83,6 +91,7 @@ def mouse_drag(start: Pos, end: Pos, button='left') -> None:
         raise ValueError("button must be left, right or middle")
     x1, y1 = start.x, start.y
     x2, y2 = end.x, end.y
+    import pyautogui
     pyautogui.mouseDown(x1, y1, button)
     pyautogui.moveTo(x2, y2, duration=1)
     pyautogui.mouseUp(x1, y1)
@@ -98,6 +107,7 @@ def mouse_click(button: str) -> None:
     if not isinstance(button, str):
         raise TypeError("button must be str")
     button = button.lower()
+    import pyautogui
     if button == "left":
         pyautogui.leftClick()
     elif button == "right":
@@ -111,6 +121,7 @@ def mouse_click(button: str) -> None:
 
 def mouse_double_click() -> None:
     """ 双击左键 """
+    import pyautogui
     pyautogui.doubleClick()
     log.debug("mouse double click")
 
@@ -119,6 +130,7 @@ def keyboard_down(key: str) -> None:
     """ 模拟键盘按键按下 """
     if not isinstance(key, str):
         raise TypeError("key must be str")
+    import pyautogui
     pyautogui.keyDown(key)
     log.debug(f"keyboard down: {key}")
 
@@ -127,6 +139,7 @@ def keyboard_up(key: str) -> None:
     """ 模拟键盘按键松开 """
     if not isinstance(key, str):
         raise TypeError("key must be str")
+    import pyautogui
     pyautogui.keyUp(key)
     log.debug(f"keyboard up: {key}")
 
@@ -135,6 +148,7 @@ def keyboard_press(key: str) -> None:
     """ 模拟键盘按键轻按 """
     if not isinstance(key, str):
         raise TypeError("key must be str")
+    import pyautogui
     pyautogui.press(key)
     log.debug(f"keyboard press: {key}")
 
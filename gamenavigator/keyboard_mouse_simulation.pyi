@@ -1,13 +1,16 @@
+from typing import Optional
+
 from .core import Pos
+from .clock import Clock
 
 
 def mouse_move_to(pos: Pos, duration: float = 0.0) -> None: ...
 
 
-def mouse_click_position(pos: Pos, button: str = "left") -> None: ...
+def mouse_click_position(pos: Pos, button: str = "left", clock: Optional[Clock] = None) -> None: ...
 
 
-def mouse_scroll(scale: int, count: int = 1) -> None: ...
+def mouse_scroll(scale: int, count: int = 1, clock: Optional[Clock] = None) -> None: ...
 
 
 def mouse_drag(start: Pos, end: Pos, button='left') -> None: ...
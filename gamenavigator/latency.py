@@ -0,0 +1,240 @@
+"""输入延迟测量
+
+发出一次输入后高频截图，比较目标区域与输入前的画面，记录从输入开始到画面第一次变化的时间。
+延迟按操作和画面分别统计，推荐的等待时间可以写回GameController.delays，代替固定的sleep，
+也可以生成等待下一个画面时使用的WaitPolicy。
+
+    meter = LatencyMeter(controller)
+    for _ in range(20):
+        meter.measure("click", lambda: controller.click_pos(Pos(640, 360)), Rect(500, 300, 780, 420), "menu")
+        controller.press("esc")
+    meter.apply()
+    controller.wait_image("bag.png", spacing=meter.policy("click", "menu"))
+
+每个样本记录两个时间: latency为从调用输入开始到画面变化，after为从输入返回(例如点击按住的时间结束)到画面变化。
+控制器在输入返回后等待，所以推荐的等待时间和等待策略使用after。
+"""
+import json
+import math
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .core import Rect
+from .clock import Clock
+from .policy import FastThenRelax, WaitPolicy
+from .trace import span
+from . import log
+
+
+class LatencyStats:
+    def __init__(self, samples: int = 256) -> None:
+        """
+        一个操作(和画面)的延迟分布，只保留最近的samples个样本
+
+        Args:
+            samples (int): 保留的样本数量 (default 256)
+        """
+        if samples <= 0:
+            raise ValueError("param samples must be positive")
+        self.latencies: deque = deque(maxlen=samples)
+        self.afters: deque = deque(maxlen=samples)
+        self.timeouts = 0
+
+    def __len__(self) -> int:
+        return len(self.latencies)
+
+    def add(self, latency: float, after: float) -> None:
+        self.latencies.append(latency)
+        self.afters.append(after)
+
+    def merge(self, other: "LatencyStats") -> None:
+        """ 合并另一组样本 """
+        self.latencies.extend(other.latencies)
+        self.afters.extend(other.afters)
+        self.timeouts += other.timeouts
+
+    def latency(self, q: float = 0.5) -> Optional[float]:
+        """ 从输入开始到画面变化的分位数, 没有样本时为None """
+        return float(np.quantile(self.latencies, q)) if self.latencies else None
+
+    def after(self, q: float = 0.5) -> Optional[float]:
+        """ 从输入返回到画面变化的分位数, 没有样本时为None """
+        return float(np.quantile(self.afters, q)) if self.afters else None
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.latencies:
+            return dict(count=0, timeouts=self.timeouts)
+        return dict(count=len(self), timeouts=self.timeouts,
+                    min=round(min(self.latencies), 4), p50=round(self.latency(0.5), 4),
+                    p90=round(self.latency(0.9), 4), p95=round(self.latency(0.95), 4),
+                    max=round(max(self.latencies), 4), after_p50=round(self.after(0.5), 4),
+                    after_p95=round(self.after(0.95), 4))
+
+
+class LatencyMeter:
+    def __init__(self, controller, interval: float = 0.005, threshold: float = 8.0, timeout: float = 2.0,
+                 size: Tuple[int, int] = (32, 32), samples: int = 256, clock: Optional[Clock] = None) -> None:
+        """
+        变化检测与ChangeWatcher相同: 区域灰度缩小到size后与输入前的平均差超过threshold时认为画面已经响应
+
+        Args:
+            controller (GameController): 控制器, 使用controller.game截图
+            interval (float): 采样间隔(秒)，截图的时间会从中扣除 (default 0.005)
+            threshold (float): 判断画面变化的平均灰度差 (default 8.0)
+            timeout (float): 超过该时间画面仍没有变化时记为超时 (default 2.0)
+            size (tuple): 比较前区域缩小到的大小 (default (32, 32))
+            samples (int): 每个操作和画面保留的样本数量 (default 256)
+            clock (Clock, None): 时钟, 为None时使用控制器的时钟
+        """
+        if interval < 0:
+            raise ValueError("param interval must not be negative")
+        if timeout <= 0:
+            raise ValueError("param timeout must be positive")
+        self.controller = controller
+        self.interval = interval
+        self.threshold = threshold
+        self.timeout = timeout
+        self.size = tuple(size)
+        self.samples = samples
+        self.clock = controller.clock if clock is None else clock
+        self._stats: Dict[Tuple[str, str], LatencyStats] = {}
+
+    def measure(self, action: str, func: Callable[[], Any], roi: Optional[Rect] = None,
+                screen: str = "") -> Optional[float]:
+        """发出一次输入并测量画面响应的时间
+
+        测量期间控制器对该操作的等待时间(delays[action])暂时为0，使after不包含之前的推荐值
+
+        Args:
+            action (str): 操作名称，与GameController.delays的键相同时apply会写回该操作的等待时间
+            func (Callable): 发出输入，例如 lambda: controller.click_pos(pos)
+            roi (Rect, None): 预期变化的区域(窗口内坐标), None为整个窗口
+            screen (str): 画面名称，同一操作在不同画面的延迟分别统计
+
+        Returns:
+            float | None: 从输入开始到画面变化的时间，超时为None
+        """
+        if not isinstance(action, str):
+            raise TypeError("param action must is str type")
+        if not callable(func):
+            raise TypeError("param func must be callable")
+        if roi is not None and not isinstance(roi, Rect):
+            raise TypeError("param roi must is Rect type")
+        stats = self._stats.setdefault((action, screen), LatencyStats(self.samples))
+        delays = self.controller.delays
+        previous = delays.get(action)
+        delays[action] = 0.0
+        with span("latency", "latency", action=action, screen=screen) as args:
+            try:
+                baseline = self._signature(roi)
+                start = self.clock.time()
+                func()
+                returned = self.clock.time()
+            finally:
+                if previous is None:
+                    delays.pop(action, None)
+                else:
+                    delays[action] = previous
+            changed = self._wait_change(baseline, roi, start)
+            args["latency"] = None if changed is None else changed - start
+        if changed is None:
+            stats.timeouts += 1
+            log.warning(f"latency {action}({screen}): no change in {self.timeout}s")
+            return None
+        stats.add(changed - start, max(changed - returned, 0.0))
+        log.debug(f"latency {action}({screen}): {changed - start:.4f}s, after input {changed - returned:.4f}s")
+        return changed - start
+
+    def _signature(self, roi: Optional[Rect]) -> np.ndarray:
+        """ 截图并将区域缩小为灰度签名 """
+        image = self.controller.game.get_screenshot()
+        if roi is not None:
+            image = image[roi.top:roi.bottom, roi.left:roi.right]
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(image, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _wait_change(self, baseline: np.ndarray, roi: Optional[Rect], start: float) -> Optional[float]:
+        """ 高频采样直到区域变化，返回开始截图的时间，超时返回None """
+        deadline = start + self.timeout
+        while True:
+            # 截图反映的是开始截图时的画面，使用开始时间作为变化时间
+            began = self.clock.time()
+            if float(np.abs(self._signature(roi) - baseline).mean()) > self.threshold:
+                return began
+            now = self.clock.time()
+            if now >= deadline:
+                return None
+            wait = min(self.interval - (now - began), deadline - now)
+            if wait > 0:
+                self.clock.sleep(wait)
+
+    def stats(self, action: str, screen: Optional[str] = None) -> LatencyStats:
+        """ 操作在某个画面的统计, screen为None时合并所有画面 """
+        if screen is not None:
+            return self._stats.get((action, screen), LatencyStats(self.samples))
+        merged = LatencyStats(self.samples * max(len(self._stats), 1))
+        for (name, _), stats in self._stats.items():
+            if name == action:
+                merged.merge(stats)
+        return merged
+
+    def recommend(self, action: str, screen: Optional[str] = None, quantile: float = 0.95,
+                  margin: float = 1.2) -> Optional[float]:
+        """推荐的输入后等待时间
+
+        Args:
+            action (str): 操作名称
+            screen (str, None): 画面名称, None为所有画面
+            quantile (float): 覆盖的响应比例 (default 0.95)
+            margin (float): 放大倍数 (default 1.2)
+
+        Returns:
+            float | None: 等待时间(秒)，没有样本时为None
+        """
+        after = self.stats(action, screen).after(quantile)
+        return None if after is None else round(after * margin, 4)
+
+    def policy(self, action: str, screen: Optional[str] = None, quantile: float = 0.95,
+               relaxed: float = 1.0) -> Optional[WaitPolicy]:
+        """等待输入后的下一个画面时使用的策略
+
+        在通常的响应时间内密集检查，之后每relaxed秒检查一次，没有样本时为None(使用控制器的policy)
+        """
+        after = self.stats(action, screen).after(quantile)
+        if after is None:
+            return None
+        fast = max(after / 8, self.interval)
+        return FastThenRelax(fast, math.ceil(after / fast) + 1, relaxed)
+
+    def delays(self, quantile: float = 0.95, margin: float = 1.2) -> Dict[str, float]:
+        """ 所有操作推荐的等待时间 """
+        delays = {}
+        for action in sorted({name for name, _ in self._stats}):
+            delay = self.recommend(action, None, quantile, margin)
+            if delay is not None:
+                delays[action] = delay
+        return delays
+
+    def apply(self, quantile: float = 0.95, margin: float = 1.2) -> Dict[str, float]:
+        """ 将所有操作推荐的等待时间写入controller.delays，返回写入的值 """
+        delays = self.delays(quantile, margin)
+        self.controller.delays.update(delays)
+        log.info(f"latency apply delays {delays}")
+        return delays
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """ 操作 -> 画面 -> 统计 """
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (action, screen), stats in sorted(self._stats.items()):
+            result.setdefault(action, {})[screen] = stats.summary()
+        return result
+
+    def save(self, path: str, quantile: float = 0.95, margin: float = 1.2) -> None:
+        """ 保存统计和推荐的等待时间，delays可以直接传给GameController(delays=...) """
+        delays = self.delays(quantile, margin)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(delays=delays, stats=self.summary()), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,63 @@
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .core import Rect
+from .clock import Clock
+from .policy import WaitPolicy
+
+
+class LatencyStats:
+    latencies: deque
+    afters: deque
+    timeouts: int
+    def __init__(self, samples: int = 256) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def add(self, latency: float, after: float) -> None: ...
+
+    def merge(self, other: LatencyStats) -> None: ...
+
+    def latency(self, q: float = 0.5) -> Optional[float]: ...
+
+    def after(self, q: float = 0.5) -> Optional[float]: ...
+
+    def summary(self) -> Dict[str, Any]: ...
+
+
+class LatencyMeter:
+    controller: Any
+    interval: float
+    threshold: float
+    timeout: float
+    size: Tuple[int, int]
+    samples: int
+    clock: Clock
+    _stats: Dict[Tuple[str, str], LatencyStats]
+    def __init__(self, controller: Any, interval: float = 0.005, threshold: float = 8.0, timeout: float = 2.0,
+                 size: Tuple[int, int] = (32, 32), samples: int = 256, clock: Optional[Clock] = None) -> None: ...
+
+    def measure(self, action: str, func: Callable[[], Any], roi: Optional[Rect] = None,
+                screen: str = "") -> Optional[float]: ...
+
+    def _signature(self, roi: Optional[Rect]) -> np.ndarray: ...
+
+    def _wait_change(self, baseline: np.ndarray, roi: Optional[Rect], start: float) -> Optional[float]: ...
+
+    def stats(self, action: str, screen: Optional[str] = None) -> LatencyStats: ...
+
+    def recommend(self, action: str, screen: Optional[str] = None, quantile: float = 0.95,
+                  margin: float = 1.2) -> Optional[float]: ...
+
+    def policy(self, action: str, screen: Optional[str] = None, quantile: float = 0.95,
+               relaxed: float = 1.0) -> Optional[WaitPolicy]: ...
+
+    def delays(self, quantile: float = 0.95, margin: float = 1.2) -> Dict[str, float]: ...
+
+    def apply(self, quantile: float = 0.95, margin: float = 1.2) -> Dict[str, float]: ...
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, Any]]]: ...
+
+    def save(self, path: str, quantile: float = 0.95, margin: float = 1.2) -> None: ...
@@ -1,11 +1,24 @@
 """OCR模块
 """
-from ppocronnx import TextSystem
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
 from numpy import ndarray, array
 
+from .trace import span
 from . import log
 
-system = TextSystem(use_angle_cls=False)
+_system = None
+
+
+def get_system():
+    """ 获取ppocronnx的TextSystem，第一次调用时才加载模型 """
+    global _system
+    if _system is None:
+        from ppocronnx import TextSystem
+        _system = TextSystem(use_angle_cls=False)
+    return _system
 
 
 def get_text_position(img: ndarray, text: str) -> ndarray:
@@ -20,7 +33,14 @@ def get_text_position(img: ndarray, text: str) -> ndarray:
     Returns:
         ndarray: 文本坐标
     """
-    res = system.detect_and_ocr(img)
+    with span("ocr", "ocr", text=text) as args:
+        res = get_system().detect_and_ocr(img)
+        args["boxes"] = len(res)
+    return _select(res, text)
+
+
+def _select(res: Sequence, text: str) -> ndarray:
+    """ 在识别结果中选择与text完全相同的文本的坐标，其次是包含text且分数最高的文本的坐标 """
     equal = None
     equal_val = 0
     similarity = None
@@ -49,3 +69,155 @@ def text_in_img(img: ndarray, text: str) -> bool:
     """ 判断图片中是否包含该文本 """
     res = get_text_position(img, text)
     return res.size != 0
+
+
+class TextBox:
+    __slots__ = ("box", "ocr_text", "score")
+
+    def __init__(self, box: ndarray, ocr_text: str, score: float) -> None:
+        """ 版面中的一个文本框，属性与ppocronnx的识别结果相同，box为窗口内的四个顶点 """
+        self.box = box
+        self.ocr_text = ocr_text
+        self.score = score
+
+    def rect(self) -> Tuple[int, int, int, int]:
+        """ 外接矩形(left, top, right, bottom) """
+        left, top = np.floor(self.box.min(axis=0)).astype(int)
+        right, bottom = np.ceil(self.box.max(axis=0)).astype(int)
+        return int(left), int(top), int(right), int(bottom)
+
+    def __repr__(self) -> str:
+        return f"TextBox({self.ocr_text!r}, {self.rect()}, {self.score:.3f})"
+
+
+class IncrementalOCR:
+    def __init__(self, tile: Tuple[int, int] = (32, 16), diff: int = 24, pixels: int = 4,
+                 full_ratio: float = 0.5, margin: int = 4, ocr=None) -> None:
+        """
+        增量OCR，适合持续更新的HUD、聊天框、战斗日志等
+
+        保存上一帧的文本框，每次update时按tile计算与上一帧的变化，只对变化的区域(以及与之相交的旧文本框)
+        重新识别，结果合并到持久的版面中，find和contains从版面中查询。
+
+            ocr = IncrementalOCR()
+            ocr.update(controller.get_screenshot())
+            ocr.contains("战斗胜利")
+
+        Args:
+            tile (tuple): 变化检测的块大小(w, h) (default (32, 16))
+            diff (int): 灰度差超过该值的像素算作变化 (default 24)
+            pixels (int): 块内变化的像素超过该数量时块算作变化 (default 4)
+            full_ratio (float): 变化的面积超过该比例时整帧重新识别 (default 0.5)
+            margin (int): 重新识别的区域向外扩展的像素 (default 4)
+            ocr: 提供detect_and_ocr(img)的识别器, 为None时使用模块的TextSystem
+        """
+        self.tile = tuple(tile)
+        self.diff = diff
+        self.pixels = pixels
+        self.full_ratio = full_ratio
+        self.margin = margin
+        self.ocr = get_system() if ocr is None else ocr
+        self.boxes: List[TextBox] = []
+        self._previous: Optional[ndarray] = None
+
+    def reset(self) -> None:
+        """ 清空版面，下一次update整帧识别 """
+        self.boxes = []
+        self._previous = None
+
+    def update(self, img: ndarray) -> List[TextBox]:
+        """输入新的一帧并更新版面
+
+        Returns:
+            list[TextBox]: 本次重新识别得到的文本框
+        """
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        previous, self._previous = self._previous, gray
+        h, w = gray.shape[:2]
+        if previous is None or previous.shape != gray.shape:
+            self.boxes = self._recognize(img, 0, 0)
+            return list(self.boxes)
+        mask = self.change_mask(previous, gray)
+        if not mask.any():
+            return []
+        tw, th = self.tile
+        if mask.mean() > self.full_ratio:
+            self.boxes = self._recognize(img, 0, 0)
+            return list(self.boxes)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=8)
+        regions = [(x * tw, y * th, min((x + bw) * tw, w), min((y + bh) * th, h))
+                   for x, y, bw, bh, _ in stats[1:count]]
+        added: List[TextBox] = []
+        for region in self._expand(regions, w, h):
+            left, top, right, bottom = region
+            # 与变化区域相交的旧文本框都会被重新识别
+            self.boxes = [b for b in self.boxes if not _intersects(b.rect(), region)]
+            added.extend(self._recognize(img[top:bottom, left:right], left, top))
+        self.boxes.extend(added)
+        return added
+
+    def change_mask(self, previous: ndarray, gray: ndarray) -> ndarray:
+        """ 每个块是否变化，返回形状为(行, 列)的bool数组 """
+        tw, th = self.tile
+        h, w = gray.shape[:2]
+        rows, cols = -(-h // th), -(-w // tw)
+        changed = np.zeros((rows * th, cols * tw), np.uint8)
+        changed[:h, :w] = cv2.absdiff(previous, gray) > self.diff
+        return changed.reshape(rows, th, cols, tw).sum(axis=(1, 3)) > self.pixels
+
+    def _expand(self, regions: List[tuple], w: int, h: int) -> List[tuple]:
+        """区域扩展margin，反复包含与之相交的旧文本框并合并相交的区域，直到没有变化
+
+        得到的区域互不相交，与区域相交的旧文本框都完整地包含在其中一个区域内
+        """
+        rects = [b.rect() for b in self.boxes]
+        pending = [(max(left - self.margin, 0), max(top - self.margin, 0),
+                    min(right + self.margin, w), min(bottom + self.margin, h))
+                   for left, top, right, bottom in regions]
+        changed = True
+        while changed:
+            changed = False
+            merged_regions: List[tuple] = []
+            for region in pending:
+                for rect in rects:
+                    if _intersects(rect, region):
+                        grown = _union(region, rect, w, h)
+                        if grown != region:
+                            region, changed = grown, True
+                for i, other in enumerate(merged_regions):
+                    if _intersects(region, other):
+                        merged_regions[i] = _union(region, other, w, h)
+                        changed = True
+                        break
+                else:
+                    merged_regions.append(region)
+            pending = merged_regions
+        return pending
+
+    def _recognize(self, img: ndarray, left: int, top: int) -> List[TextBox]:
+        with span("ocr", "ocr", region=(left, top, img.shape[1], img.shape[0])) as args:
+            res = self.ocr.detect_and_ocr(np.ascontiguousarray(img))
+            args["boxes"] = len(res)
+        offset = np.array([left, top], dtype=np.float32)
+        return [TextBox(np.asarray(r.box, dtype=np.float32) + offset, r.ocr_text, r.score) for r in res]
+
+    def find(self, text: str) -> ndarray:
+        """ 在版面中查找文本，规则与get_text_position相同 """
+        return _select(self.boxes, text)
+
+    def contains(self, text: str) -> bool:
+        return self.find(text).size != 0
+
+    def text(self) -> List[str]:
+        """ 版面中的文本，从上到下、从左到右 """
+        return [b.ocr_text for b in sorted(self.boxes, key=lambda b: (b.rect()[1], b.rect()[0]))]
+
+
+def _intersects(a: tuple, b: tuple) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _union(a: tuple, b: tuple, w: int, h: int) -> tuple:
+    """ 两个矩形的外接矩形，限制在画面内 """
+    return (max(min(a[0], b[0]), 0), max(min(a[1], b[1]), 0),
+            min(max(a[2], b[2]), w), min(max(a[3], b[3]), h))
@@ -1,7 +1,61 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
 from numpy import ndarray
 
+_system: Any
+
+
+def get_system() -> Any: ...
+
 
 def get_text_position(img: ndarray, text: str) -> ndarray: ...
 
 
+def _select(res: Sequence, text: str) -> ndarray: ...
+
+
 def text_in_img(img: ndarray, text: str) -> bool: ...
+
+
+class TextBox:
+    box: ndarray
+    ocr_text: str
+    score: float
+    def __init__(self, box: ndarray, ocr_text: str, score: float) -> None: ...
+
+    def rect(self) -> Tuple[int, int, int, int]: ...
+
+
+class IncrementalOCR:
+    tile: Tuple[int, int]
+    diff: int
+    pixels: int
+    full_ratio: float
+    margin: int
+    ocr: Any
+    boxes: List[TextBox]
+    _previous: Optional[ndarray]
+    def __init__(self, tile: Tuple[int, int] = (32, 16), diff: int = 24, pixels: int = 4,
+                 full_ratio: float = 0.5, margin: int = 4, ocr=None) -> None: ...
+
+    def reset(self) -> None: ...
+
+    def update(self, img: ndarray) -> List[TextBox]: ...
+
+    def change_mask(self, previous: ndarray, gray: ndarray) -> ndarray: ...
+
+    def _expand(self, regions: List[tuple], w: int, h: int) -> List[tuple]: ...
+
+    def _recognize(self, img: ndarray, left: int, top: int) -> List[TextBox]: ...
+
+    def find(self, text: str) -> ndarray: ...
+
+    def contains(self, text: str) -> bool: ...
+
+    def text(self) -> List[str]: ...
+
+
+def _intersects(a: tuple, b: tuple) -> bool: ...
+
+
+def _union(a: tuple, b: tuple, w: int, h: int) -> tuple: ...
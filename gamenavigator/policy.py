@@ -0,0 +1,146 @@
+"""等待策略
+
+决定轮询(等待图片、等待文字、点击重试)两次检查之间的间隔。
+poll按截止时间调度: 间隔从上一次检查开始时计算，匹配所用的时间会从睡眠中扣除，
+最后一次睡眠不会超过截止时间。
+
+    FixedPolicy(0.2)                     每0.2秒检查一次
+    BackoffPolicy(0.05, 2.0, 1.0)        0.05 0.1 0.2 ... 最大1秒
+    BackoffPolicy(0.1, jitter=0.2)       间隔随机浮动±20%
+    FastThenRelax(0.05, 10, 1.0)         前10次每0.05秒，之后每1秒
+"""
+import random
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Union
+
+from .clock import Clock, get_clock
+from .trace import span
+
+
+class WaitPolicy(ABC):
+    @abstractmethod
+    def interval(self, attempt: int) -> float:
+        """ 第attempt次(从0开始)检查开始到下一次检查开始的间隔(秒) """
+        pass
+
+
+class FixedPolicy(WaitPolicy):
+    def __init__(self, spacing: float = 1.0) -> None:
+        if spacing < 0:
+            raise ValueError("param spacing must not be negative")
+        self.spacing = spacing
+
+    def interval(self, attempt: int) -> float:
+        return self.spacing
+
+    def __repr__(self) -> str:
+        return f"FixedPolicy({self.spacing})"
+
+
+class BackoffPolicy(WaitPolicy):
+    def __init__(self, initial: float = 0.1, factor: float = 2.0, maximum: float = 1.0,
+                 jitter: float = 0.0, seed: Optional[int] = None) -> None:
+        """
+        指数退避，间隔为 initial * factor ** attempt，不超过maximum
+
+        Args:
+            initial (float): 第一次的间隔
+            factor (float): 增长倍数, 1.0为固定间隔
+            maximum (float): 最大间隔
+            jitter (float): 间隔随机浮动的比例 0.0 ~ 1.0 (default 0.0)
+            seed (int, None): 随机数种子
+        """
+        if initial < 0 or maximum < 0:
+            raise ValueError("param initial and maximum must not be negative")
+        if factor < 1.0:
+            raise ValueError("param factor must not be less than 1.0")
+        if not 0.0 <= jitter <= 1.0:
+            raise ValueError("param jitter must in [0.0, 1.0]")
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def interval(self, attempt: int) -> float:
+        spacing = min(self.initial * self.factor ** min(attempt, 64), self.maximum)
+        if self.jitter:
+            spacing *= 1.0 + self._random.uniform(-self.jitter, self.jitter)
+        return spacing
+
+    def __repr__(self) -> str:
+        return f"BackoffPolicy({self.initial}, {self.factor}, {self.maximum}, jitter={self.jitter})"
+
+
+class FastThenRelax(WaitPolicy):
+    def __init__(self, fast: float = 0.05, count: int = 10, relaxed: float = 1.0) -> None:
+        """
+        前count次使用fast间隔，之后使用relaxed间隔，适合预期很快出现但也可能很久才出现的画面
+
+        Args:
+            fast (float): 快速阶段的间隔
+            count (int): 快速阶段的检查次数
+            relaxed (float): 之后的间隔
+        """
+        if fast < 0 or relaxed < 0:
+            raise ValueError("param fast and relaxed must not be negative")
+        self.fast = fast
+        self.count = count
+        self.relaxed = relaxed
+
+    def interval(self, attempt: int) -> float:
+        return self.fast if attempt < self.count else self.relaxed
+
+    def __repr__(self) -> str:
+        return f"FastThenRelax({self.fast}, {self.count}, {self.relaxed})"
+
+
+def to_policy(spacing: Union[int, float, WaitPolicy, None] = None,
+              default: Optional[WaitPolicy] = None) -> WaitPolicy:
+    """ 将spacing参数(秒数或WaitPolicy)转换为WaitPolicy，None时返回default """
+    if spacing is None:
+        return FixedPolicy() if default is None else default
+    if isinstance(spacing, WaitPolicy):
+        return spacing
+    if isinstance(spacing, bool) or not isinstance(spacing, (int, float)):
+        raise TypeError("param spacing must is int, float or WaitPolicy type")
+    return FixedPolicy(spacing)
+
+
+def poll(timeout: float, policy: WaitPolicy, clock: Optional[Clock] = None) -> Iterator[int]:
+    """按策略轮询直到超时
+
+    每次迭代产生检查次数(从0开始)，调用方在循环体中检查一次，成功时跳出循环，
+    循环正常结束表示超时。第一次检查立即进行
+
+        for _ in poll(10, FastThenRelax()):
+            if found():
+                break
+        else:
+            raise TimeoutError
+
+    Args:
+        timeout (int, float): 超时时间(秒)
+        policy (WaitPolicy): 等待策略
+        clock (Clock, None): 时钟, 为None时使用包默认时钟
+    """
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)):
+        raise TypeError("param timeout must is int or float type")
+    if not isinstance(policy, WaitPolicy):
+        raise TypeError("param policy must is WaitPolicy type")
+    clock = get_clock() if clock is None else clock
+    start = clock.time()
+    attempt = 0
+    while True:
+        began = clock.time()
+        yield attempt
+        now = clock.time()
+        remaining = start + timeout - now
+        if remaining <= 0:
+            return
+        # 扣除本次检查所用的时间，且不睡过截止时间
+        wait = min(policy.interval(attempt) - (now - began), remaining)
+        attempt += 1
+        if wait > 0:
+            with span("poll_sleep", "wait", attempt=attempt, wait=wait):
+                clock.sleep(wait)
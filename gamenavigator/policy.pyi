@@ -0,0 +1,45 @@
+import random
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, Union
+
+from .clock import Clock
+
+
+class WaitPolicy(ABC):
+    @abstractmethod
+    def interval(self, attempt: int) -> float: ...
+
+
+class FixedPolicy(WaitPolicy):
+    spacing: float
+    def __init__(self, spacing: float = 1.0) -> None: ...
+
+    def interval(self, attempt: int) -> float: ...
+
+
+class BackoffPolicy(WaitPolicy):
+    initial: float
+    factor: float
+    maximum: float
+    jitter: float
+    _random: random.Random
+    def __init__(self, initial: float = 0.1, factor: float = 2.0, maximum: float = 1.0,
+                 jitter: float = 0.0, seed: Optional[int] = None) -> None: ...
+
+    def interval(self, attempt: int) -> float: ...
+
+
+class FastThenRelax(WaitPolicy):
+    fast: float
+    count: int
+    relaxed: float
+    def __init__(self, fast: float = 0.05, count: int = 10, relaxed: float = 1.0) -> None: ...
+
+    def interval(self, attempt: int) -> float: ...
+
+
+def to_policy(spacing: Union[int, float, WaitPolicy, None] = None,
+              default: Optional[WaitPolicy] = None) -> WaitPolicy: ...
+
+
+def poll(timeout: float, policy: WaitPolicy, clock: Optional[Clock] = None) -> Iterator[int]: ...
@@ -0,0 +1,350 @@
+"""多窗口控制器池
+
+同一台机器上运行多个游戏客户端时，所有窗口共享一次桌面截图，
+每个窗口得到的是桌面截图中自己矩形区域的视图(不拷贝)；
+需要前台焦点的输入统一交给FocusArbiter调度，同一窗口的输入合并执行以减少前台切换。
+
+控制器的每个输入都会等待执行完成，调度线程执行完当前窗口的输入后会等待grace秒，
+期间该窗口提交的下一个输入不需要切换前台。需要连续执行一组操作时可以持有焦点:
+
+    with pool.focus(controller):
+        controller.click_image("a.png")
+        controller.wait_and_click_image("b.png")
+"""
+import time
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from numpy import ndarray
+
+from .backend import get_backend
+from .clock import Clock, get_clock
+from .game_controller import Game, GameController
+from . import keyboard_mouse_simulation
+from . import log
+
+
+class DesktopCapture:
+    def __init__(self, interval: float = 0.05, clock: Optional[Clock] = None, backend=None) -> None:
+        """
+        在interval秒内的多次请求共用同一张桌面截图
+
+        Args:
+            interval (float): 一次截图的有效时间(default 0.05)
+            clock (Clock, None): 时钟, 为None时使用包默认时钟
+            backend: 窗口后端, 需要grab和get_desktop_origin, 为None时使用当前平台的后端(见backend模块)
+        """
+        if not isinstance(interval, (int, float)):
+            raise TypeError("param interval must is int or float type")
+        self.interval = interval
+        self.clock = get_clock() if clock is None else clock
+        self._backend = get_backend() if backend is None else backend
+        self._frame: Optional[ndarray] = None
+        self._time = float("-inf")
+        self._tick = 0
+        self._origin = (0, 0)
+        self._lock = Lock()
+
+    @property
+    def tick(self) -> int:
+        """ 已截图的次数 """
+        return self._tick
+
+    @property
+    def origin(self) -> Tuple[int, int]:
+        """ 截图左上角在屏幕上的坐标 """
+        return self._origin
+
+    def grab(self) -> ndarray:
+        """ 立即截取整个桌面 """
+        with self._lock:
+            return self._grab()
+
+    def frame(self) -> ndarray:
+        """ 返回当前的桌面截图，过期时重新截图 """
+        with self._lock:
+            if self._frame is None or self.clock.time() - self._time >= self.interval:
+                return self._grab()
+            return self._frame
+
+    def view(self, left: int, top: int, right: int, bottom: int) -> ndarray:
+        """返回桌面截图中某个矩形区域的视图
+
+        矩形部分超出桌面时返回拷贝，桌面以外的部分为黑色，使画面坐标与窗口坐标保持一致
+        """
+        frame = self.frame()
+        x, y = self._origin
+        h, w = frame.shape[:2]
+        top, bottom, left, right = top - y, bottom - y, left - x, right - x
+        if 0 <= left and 0 <= top and right <= w and bottom <= h:
+            return frame[top:bottom, left:right]
+        view = np.zeros((max(bottom - top, 0), max(right - left, 0)) + frame.shape[2:], frame.dtype)
+        x1, y1, x2, y2 = max(left, 0), max(top, 0), min(right, w), min(bottom, h)
+        if x1 < x2 and y1 < y2:
+            view[y1 - top:y2 - top, x1 - left:x2 - left] = frame[y1:y2, x1:x2]
+        return view
+
+    def _grab(self) -> ndarray:
+        # 每次分配新的数组，之前交出去的视图不会被覆盖
+        self._frame = self._backend.grab(all_screens=True)
+        self._origin = self._backend.get_desktop_origin()
+        self._time = self.clock.time()
+        self._tick += 1
+        return self._frame
+
+
+class PooledGame(Game):
+    def __init__(self, game_class: Union[str, None], game_name: str, capture: DesktopCapture) -> None:
+        """
+        截图来自共享的DesktopCapture，前台焦点由FocusArbiter管理
+
+        :param game_class: 游戏类名
+        :param game_name: 游戏名称
+        :param capture: 共享的桌面截图
+        """
+        super().__init__(game_class, game_name)
+        self.capture = capture
+
+    def is_foreground(self) -> bool:
+        """ 焦点由FocusArbiter在输入前切换，控制器不需要自行切换 """
+        return True
+
+    def activate(self) -> None:
+        """ 真正将窗口设置到前台，只应由FocusArbiter调用 """
+        super().set_foreground()
+
+    def set_foreground(self) -> None:
+        pass
+
+    def get_screenshot(self) -> ndarray:
+        """ 共享桌面截图中本窗口区域的视图 """
+        self.screenshot = self.capture.view(*self.get_rect().rect())
+        return self.screenshot
+
+
+class _FocusLease:
+    def __init__(self, arbiter: "FocusArbiter", game: PooledGame) -> None:
+        """ with语句期间调度线程只执行game的输入 """
+        self.arbiter = arbiter
+        self.game = game
+
+    def __enter__(self) -> PooledGame:
+        arbiter = self.arbiter
+        with arbiter._condition:
+            while arbiter._lease is not None and arbiter._lease is not self.game:
+                arbiter._condition.wait()
+            arbiter._lease = self.game
+            arbiter._lease_depth += 1
+        return self.game
+
+    def __exit__(self, *exc) -> None:
+        arbiter = self.arbiter
+        with arbiter._condition:
+            arbiter._lease_depth -= 1
+            if arbiter._lease_depth == 0:
+                arbiter._lease = None
+                arbiter._condition.notify_all()
+
+
+class FocusArbiter:
+    def __init__(self, settle: float = 1.0, max_batch: int = 32, grace: float = 0.1,
+                 clock: Optional[Clock] = None) -> None:
+        """
+        所有需要前台焦点的输入都由调度线程执行。调度线程优先执行当前前台窗口的输入，
+        其次是等待输入最多的窗口，每次切换后连续执行该窗口最多max_batch个输入
+
+        控制器在上一个输入完成后才会提交下一个输入，因此当前窗口没有等待的输入时，
+        调度线程最多等待grace秒再切换到其他窗口。grace是实际经过的时间，不使用clock
+
+        Args:
+            settle (float): 切换前台后的等待时间(default 1.0)
+            max_batch (int): 一次切换后最多连续执行的输入数量, 防止其他窗口饿死(default 32)
+            grace (float): 当前窗口没有输入时切换前的等待时间, 0为立即切换(default 0.1)
+            clock (Clock, None): 时钟, 为None时使用包默认时钟
+        """
+        if not isinstance(grace, (int, float)):
+            raise TypeError("param grace must is int or float type")
+        self.settle = settle
+        self.max_batch = max_batch
+        self.grace = grace
+        self.clock = get_clock() if clock is None else clock
+        self.switches = 0
+        self._pending: Dict[PooledGame, List[Tuple[Callable, Future]]] = {}
+        self._current: Optional[PooledGame] = None
+        self._streak = 0
+        self._lease: Optional[PooledGame] = None
+        self._lease_depth = 0
+        self._condition = Condition()
+        self._running = True
+        self._thread = Thread(target=self._run, name="FocusArbiter", daemon=True)
+        self._thread.start()
+
+    def submit(self, game: PooledGame, func: Callable, *args, **kwargs) -> Future:
+        """ 提交一个需要game处于前台的输入 """
+        future: Future = Future()
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("FocusArbiter is closed")
+            self._pending.setdefault(game, []).append((lambda: func(*args, **kwargs), future))
+            self._condition.notify_all()
+        return future
+
+    def run(self, game: PooledGame, func: Callable, *args, **kwargs) -> Any:
+        """ 提交输入并等待执行完成 """
+        return self.submit(game, func, *args, **kwargs).result()
+
+    def focus(self, game: PooledGame) -> _FocusLease:
+        """持有前台焦点，with语句期间只执行game的输入，其他窗口的输入等待到退出with
+
+        同一窗口可以嵌套持有，其他窗口持有时等待其释放。持有期间不受max_batch限制
+        """
+        return _FocusLease(self, game)
+
+    def close(self) -> None:
+        """ 执行完剩余的输入后停止调度线程 """
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _select(self) -> Optional[PooledGame]:
+        """ 选择下一个执行输入的窗口，持有焦点的窗口没有输入时返回None """
+        current, lease = self._current, self._lease
+        if lease is not None and self._running:
+            return lease if lease in self._pending else None
+        others = [g for g in self._pending if g is not current]
+        # 连续执行max_batch个输入后，有其他窗口等待时让给其他窗口
+        if current in self._pending and (not others or self._streak < self.max_batch):
+            return current
+        return max(others, key=lambda g: len(self._pending[g]))
+
+    def _next_batch(self) -> Tuple[Optional[PooledGame], List[Tuple[Callable, Future]]]:
+        with self._condition:
+            deadline = None
+            while True:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._pending:
+                    return None, []
+                game = self._select()
+                if game is None:
+                    self._condition.wait()
+                    continue
+                if game is not self._current and self._current is not None and self._lease is None \
+                        and self._running and self._streak < self.max_batch:
+                    # 当前窗口的下一个输入通常在上一个完成后立即提交，短暂等待以避免切换前台
+                    now = time.monotonic()
+                    deadline = now + self.grace if deadline is None else deadline
+                    if now < deadline:
+                        self._condition.wait(deadline - now)
+                        continue
+                break
+            if game is not self._current or self._lease is not None or len(self._pending) == 1:
+                self._streak = 0
+            tasks = self._pending.pop(game)
+            size = max(self.max_batch - self._streak, 1)
+            batch, rest = tasks[:size], tasks[size:]
+            if rest:
+                self._pending[game] = rest
+            self._streak += len(batch)
+            return game, batch
+
+    def _run(self) -> None:
+        while True:
+            game, batch = self._next_batch()
+            if game is None:
+                return
+            if self._current is not game:
+                try:
+                    game.activate()
+                    self.clock.sleep(self.settle)
+                except Exception as e:
+                    # 窗口已关闭等原因无法切换时，本批输入全部失败，调度线程继续运行
+                    log.error(f"focus switch to {game.name} failed: {e!r}")
+                    self._current = None
+                    for _, future in batch:
+                        if future.set_running_or_notify_cancel():
+                            future.set_exception(e)
+                    continue
+                self.switches += 1
+                log.debug(f"focus switch to {game.name}")
+            self._current = game
+            for func, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func())
+                except Exception as e:
+                    future.set_exception(e)
+
+
+class ArbitratedInput:
+    def __init__(self, game: PooledGame, arbiter: FocusArbiter, backend=None) -> None:
+        """
+        将键鼠模拟后端的调用交给FocusArbiter执行
+
+        注意按下和松开是两次独立的输入，中间可能切换到其他窗口，需要保持前台时使用ControllerPool.focus
+
+        Args:
+            game (PooledGame): 输入的目标窗口
+            arbiter (FocusArbiter): 焦点调度器
+            backend: 键鼠模拟后端, 为None时使用keyboard_mouse_simulation
+        """
+        self.game = game
+        self.arbiter = arbiter
+        self.backend = keyboard_mouse_simulation if backend is None else backend
+
+    def __getattr__(self, name: str) -> Callable:
+        func = getattr(self.backend, name)
+
+        def call(*args, **kwargs):
+            return self.arbiter.run(self.game, func, *args, **kwargs)
+        return call
+
+
+class ControllerPool:
+    def __init__(self, interval: float = 0.05, settle: float = 1.0, backend=None,
+                 clock: Optional[Clock] = None) -> None:
+        """
+        Args:
+            interval (float): 一次桌面截图的有效时间(default 0.05)
+            settle (float): 切换前台后的等待时间(default 1.0)
+            backend: 键鼠模拟后端, 为None时使用keyboard_mouse_simulation
+            clock (Clock, None): 时钟, 为None时使用包默认时钟
+        """
+        self.clock = get_clock() if clock is None else clock
+        self.capture = DesktopCapture(interval, self.clock)
+        self.arbiter = FocusArbiter(settle, clock=self.clock)
+        self.backend = backend
+        self.controllers: List[GameController] = []
+
+    def add(self, game_class: Union[str, None], game_name: str, **kwargs) -> GameController:
+        """添加一个游戏窗口
+
+        Keyword Arguments:
+            与GameController相同的debug filename recorder参数
+
+        Returns:
+            GameController
+        """
+        game = PooledGame(game_class, game_name, self.capture)
+        backend = ArbitratedInput(game, self.arbiter, self.backend)
+        controller = GameController(game_class, game_name, game=game, backend=backend, clock=self.clock, **kwargs)
+        self.controllers.append(controller)
+        return controller
+
+    def focus(self, controller: GameController) -> _FocusLease:
+        """ with语句期间前台焦点只给controller的窗口，见FocusArbiter.focus """
+        return self.arbiter.focus(controller.game)
+
+    def tick(self) -> ndarray:
+        """ 立即截取一次桌面，之后interval秒内的截图请求共用该截图 """
+        return self.capture.grab()
+
+    def close(self) -> None:
+        self.arbiter.close()
+
+    def __len__(self) -> int:
+        return len(self.controllers)
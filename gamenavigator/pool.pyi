@@ -0,0 +1,119 @@
+from concurrent.futures import Future
+from threading import Condition, Lock, Thread
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from numpy import ndarray
+
+from .clock import Clock
+from .game_controller import Game, GameController
+
+
+class DesktopCapture:
+    interval: float
+    clock: Clock
+    _backend: ModuleType
+    _frame: Optional[ndarray]
+    _time: float
+    _tick: int
+    _origin: Tuple[int, int]
+    _lock: Lock
+    def __init__(self, interval: float = 0.05, clock: Optional[Clock] = None, backend: Any = None) -> None: ...
+
+    @property
+    def tick(self) -> int: ...
+
+    @property
+    def origin(self) -> Tuple[int, int]: ...
+
+    def grab(self) -> ndarray: ...
+
+    def frame(self) -> ndarray: ...
+
+    def view(self, left: int, top: int, right: int, bottom: int) -> ndarray: ...
+
+    def _grab(self) -> ndarray: ...
+
+
+class PooledGame(Game):
+    capture: DesktopCapture
+    def __init__(self, game_class: Union[str, None], game_name: str, capture: DesktopCapture) -> None: ...
+
+    def is_foreground(self) -> bool: ...
+
+    def activate(self) -> None: ...
+
+    def set_foreground(self) -> None: ...
+
+    def get_screenshot(self) -> ndarray: ...
+
+
+class _FocusLease:
+    arbiter: FocusArbiter
+    game: PooledGame
+    def __init__(self, arbiter: FocusArbiter, game: PooledGame) -> None: ...
+
+    def __enter__(self) -> PooledGame: ...
+
+    def __exit__(self, *exc) -> None: ...
+
+
+class FocusArbiter:
+    settle: float
+    max_batch: int
+    grace: float
+    clock: Clock
+    switches: int
+    _pending: Dict[PooledGame, List[Tuple[Callable, Future]]]
+    _current: Optional[PooledGame]
+    _streak: int
+    _lease: Optional[PooledGame]
+    _lease_depth: int
+    _condition: Condition
+    _running: bool
+    _thread: Thread
+    def __init__(self, settle: float = 1.0, max_batch: int = 32, grace: float = 0.1,
+                 clock: Optional[Clock] = None) -> None: ...
+
+    def submit(self, game: PooledGame, func: Callable, *args, **kwargs) -> Future: ...
+
+    def run(self, game: PooledGame, func: Callable, *args, **kwargs) -> Any: ...
+
+    def focus(self, game: PooledGame) -> _FocusLease: ...
+
+    def close(self) -> None: ...
+
+    def _select(self) -> Optional[PooledGame]: ...
+
+    def _next_batch(self) -> Tuple[Optional[PooledGame], List[Tuple[Callable, Future]]]: ...
+
+    def _run(self) -> None: ...
+
+
+class ArbitratedInput:
+    game: PooledGame
+    arbiter: FocusArbiter
+    backend: Any
+    def __init__(self, game: PooledGame, arbiter: FocusArbiter, backend=None) -> None: ...
+
+    def __getattr__(self, name: str) -> Callable: ...
+
+
+class ControllerPool:
+    clock: Clock
+    capture: DesktopCapture
+    arbiter: FocusArbiter
+    backend: Any
+    controllers: List[GameController]
+    def __init__(self, interval: float = 0.05, settle: float = 1.0, backend=None,
+                 clock: Optional[Clock] = None) -> None: ...
+
+    def add(self, game_class: Union[str, None], game_name: str, **kwargs) -> GameController: ...
+
+    def focus(self, controller: GameController) -> _FocusLease: ...
+
+    def tick(self) -> ndarray: ...
+
+    def close(self) -> None: ...
+
+    def __len__(self) -> int: ...
@@ -0,0 +1,115 @@
+"""像素探针
+
+用于“按钮是否亮起”“血条是否低于30%”这类不需要模板匹配的状态检查。
+探针在创建时预编译成坐标数组，检查时一次NumPy索引取出所有像素并比较。
+
+    lit = ProbeSet([(Pos(10, 20), (40, 200, 250), 30), (Pos(12, 20), (40, 200, 250), 30)])
+    lit(screenshot)
+    hp = BarProbe(Pos(100, 40), Pos(300, 40), (30, 30, 200), 40)
+    hp.fill(screenshot) < 0.3
+"""
+from typing import Iterable, Sequence, Tuple, Union
+
+import numpy as np
+
+from .core import Pos
+from .exception import WindowOutOfBoundsError
+
+MODES = ("all", "any", "count")
+
+
+class ProbeSet:
+    def __init__(self, probes: Iterable[Tuple[Pos, Sequence[int], int]], mode: str = "all", count: int = 1) -> None:
+        """
+        Args:
+            probes: (Pos, 期望的BGR颜色, 容差) 的序列，容差为每个通道允许的最大差值
+            mode (str): __call__的判断方式 all any count (default all)
+            count (int): mode为count时至少需要满足的探针数量 (default 1)
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must in {MODES}")
+        xs, ys, colors, tolerances = [], [], [], []
+        for pos, color, tolerance in probes:
+            if not isinstance(pos, Pos):
+                raise TypeError("probe position must be Pos")
+            if len(color) != 3:
+                raise ValueError("probe color must be (b, g, r)")
+            xs.append(pos.x)
+            ys.append(pos.y)
+            colors.append(tuple(color))
+            tolerances.append(tolerance)
+        if not xs:
+            raise ValueError("probes is empty")
+        self.xs = np.array(xs, dtype=np.intp)
+        self.ys = np.array(ys, dtype=np.intp)
+        self.colors = np.array(colors, dtype=np.int16)
+        self.tolerances = np.array(tolerances, dtype=np.int16)
+        self.mode = mode
+        self.count_required = count
+        self._max_x = int(self.xs.max())
+        self._max_y = int(self.ys.max())
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def test(self, img: np.ndarray) -> np.ndarray:
+        """ 每个探针是否满足，返回bool数组 """
+        h, w = img.shape[:2]
+        if self._max_x >= w or self._max_y >= h or self.xs.min() < 0 or self.ys.min() < 0:
+            raise WindowOutOfBoundsError(f"probe outside the image ({w}, {h})")
+        pixels = img[self.ys, self.xs].astype(np.int16)
+        if pixels.ndim == 1:
+            # 灰度图与B通道比较
+            pixels = pixels[:, None]
+            return np.abs(pixels - self.colors[:, :1]).max(axis=1) <= self.tolerances
+        return np.abs(pixels - self.colors).max(axis=1) <= self.tolerances
+
+    def all(self, img: np.ndarray) -> bool:
+        return bool(self.test(img).all())
+
+    def any(self, img: np.ndarray) -> bool:
+        return bool(self.test(img).any())
+
+    def count(self, img: np.ndarray) -> int:
+        return int(self.test(img).sum())
+
+    def __call__(self, img: np.ndarray) -> bool:
+        """ 按mode判断 """
+        if self.mode == "all":
+            return self.all(img)
+        if self.mode == "any":
+            return self.any(img)
+        return self.count(img) >= self.count_required
+
+
+class BarProbe:
+    def __init__(self, start: Pos, end: Pos, color: Sequence[int], tolerance: int, samples: int = 0) -> None:
+        """
+        测量从start到end的进度条(血条等)的填充比例
+
+        Args:
+            start (Pos): 进度条起点(满值方向的反方向)
+            end (Pos): 进度条终点
+            color (Sequence[int]): 已填充部分的BGR颜色
+            tolerance (int): 每个通道允许的最大差值
+            samples (int): 采样点数量, 0表示逐像素采样 (default 0)
+        """
+        if samples <= 0:
+            samples = max(abs(end.x - start.x), abs(end.y - start.y)) + 1
+        t = np.linspace(0.0, 1.0, samples)
+        xs = np.rint(start.x + (end.x - start.x) * t).astype(int)
+        ys = np.rint(start.y + (end.y - start.y) * t).astype(int)
+        self.probes = ProbeSet(((Pos(int(x), int(y)), color, tolerance) for x, y in zip(xs, ys)))
+
+    def fill(self, img: np.ndarray) -> float:
+        """ 满足颜色的采样点比例 0.0 ~ 1.0 """
+        return float(self.probes.test(img).mean())
+
+    def below(self, img: np.ndarray, ratio: float) -> bool:
+        return self.fill(img) < ratio
+
+    def __call__(self, img: np.ndarray) -> float:
+        return self.fill(img)
+
+
+Probe = Union[ProbeSet, BarProbe]
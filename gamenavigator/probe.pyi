@@ -0,0 +1,45 @@
+from typing import Iterable, Sequence, Tuple, Union
+
+import numpy as np
+
+from .core import Pos
+
+MODES: tuple[str, ...]
+
+
+class ProbeSet:
+    xs: np.ndarray
+    ys: np.ndarray
+    colors: np.ndarray
+    tolerances: np.ndarray
+    mode: str
+    count_required: int
+    _max_x: int
+    _max_y: int
+    def __init__(self, probes: Iterable[Tuple[Pos, Sequence[int], int]], mode: str = "all", count: int = 1) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def test(self, img: np.ndarray) -> np.ndarray: ...
+
+    def all(self, img: np.ndarray) -> bool: ...
+
+    def any(self, img: np.ndarray) -> bool: ...
+
+    def count(self, img: np.ndarray) -> int: ...
+
+    def __call__(self, img: np.ndarray) -> bool: ...
+
+
+class BarProbe:
+    probes: ProbeSet
+    def __init__(self, start: Pos, end: Pos, color: Sequence[int], tolerance: int, samples: int = 0) -> None: ...
+
+    def fill(self, img: np.ndarray) -> float: ...
+
+    def below(self, img: np.ndarray, ratio: float) -> bool: ...
+
+    def __call__(self, img: np.ndarray) -> float: ...
+
+
+Probe = Union[ProbeSet, BarProbe]
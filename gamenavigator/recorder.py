@@ -0,0 +1,235 @@
+"""调试记录器
+
+在内存中以环形缓冲区保存最近N帧截图以及与之关联的操作和匹配分数，
+出错时由后台写入线程异步导出，避免在出错线程上同步编码PNG。
+"""
+import json
+import os
+import queue
+from collections import deque
+from threading import Lock, Thread
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .clock import Clock, get_clock
+from . import log
+
+ENCODINGS = ("bmp", "jpg", "png", "raw")
+
+
+class _Entry:
+    """ 环形缓冲区中的一帧 """
+    __slots__ = ("index", "timestamp", "frame", "actions", "matches")
+
+    def __init__(self, index: int, timestamp: float, frame: np.ndarray) -> None:
+        self.index = index
+        self.timestamp = timestamp
+        self.frame = frame
+        self.actions: List[Dict[str, Any]] = []
+        self.matches: List[Dict[str, Any]] = []
+
+    def copy(self) -> "_Entry":
+        """ 导出用的快照，之后关联到该帧的操作和匹配不会影响快照 """
+        entry = _Entry(self.index, self.timestamp, self.frame)
+        entry.actions = list(self.actions)
+        entry.matches = list(self.matches)
+        return entry
+
+
+class FlightRecorder:
+    def __init__(self, capacity: int = 30, max_bytes: int = 256 * 1024 * 1024,
+                 encoding: str = "bmp", min_interval: float = 5.0, max_pending: int = 2,
+                 clock: Optional[Clock] = None) -> None:
+        """
+        Args:
+            capacity (int): 最多保存的帧数(default 30)
+            max_bytes (int): 缓冲区帧数据的内存上限(default 256MB)
+            encoding (str): 导出格式 bmp jpg png raw(default bmp)
+            min_interval (float): 两次导出之间的最小间隔秒数, 限制写入频率(default 5.0)
+            max_pending (int): 等待写入的导出任务上限, 超出后丢弃新的导出(default 2)
+            clock (Clock, None): 时间戳使用的时钟, 为None时使用包默认时钟
+        """
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("param capacity must be a positive int")
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError("param max_bytes must be a positive int")
+        if encoding not in ENCODINGS:
+            raise ValueError(f"encoding must in {ENCODINGS}")
+        if not isinstance(min_interval, (int, float)):
+            raise TypeError("param min_interval must is int or float type")
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.encoding = encoding
+        self.min_interval = min_interval
+        self.clock = get_clock() if clock is None else clock
+        self._entries: Deque[_Entry] = deque()
+        self._bytes = 0
+        self._count = 0
+        self._lock = Lock()
+        self._queue: "queue.Queue[Optional[Tuple[str, List[_Entry], Dict[str, Any]]]]" = queue.Queue(maxsize=max_pending)
+        self._writer: Optional[Thread] = None
+        self._last_dump = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """ 缓冲区中帧数据占用的字节数 """
+        return self._bytes
+
+    def record_frame(self, frame: np.ndarray) -> int:
+        """记录一帧截图
+
+        截图只保存引用不做拷贝，调用者不应在之后原地修改该数组
+
+        Returns:
+            int: 帧序号
+        """
+        if not isinstance(frame, np.ndarray):
+            raise TypeError("param frame must is ndarray type")
+        with self._lock:
+            entry = _Entry(self._count, self.clock.time(), frame)
+            self._count += 1
+            self._entries.append(entry)
+            self._bytes += _owned_bytes(frame)
+            while len(self._entries) > 1 and (len(self._entries) > self.capacity or self._bytes > self.max_bytes):
+                self._bytes -= _owned_bytes(self._entries.popleft().frame)
+            return entry.index
+
+    def record_action(self, action: str, **info) -> None:
+        """ 记录一个操作，关联到最近一帧 """
+        self._attach("actions", dict(action=action, time=self.clock.time(), **info))
+
+    def record_match(self, template: str, score: float, loc: Tuple[int, int], **info) -> None:
+        """ 记录一次匹配的分数与位置，关联到最近一帧 """
+        self._attach("matches", dict(template=template, score=float(score),
+                                     loc=[int(loc[0]), int(loc[1])], **info))
+
+    def clear(self) -> None:
+        """ 清空缓冲区 """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def dump(self, directory: str, **info) -> bool:
+        """异步导出缓冲区内容到directory
+
+        超过写入频率限制或等待队列已满时丢弃本次导出，info会写入meta.json中(例如游戏窗口的几何信息)
+
+        Returns:
+            bool: 是否已提交导出任务
+        """
+        with self._lock:
+            now = self.clock.time()
+            if now - self._last_dump < self.min_interval:
+                log.warning(f"flight recorder dump skipped: interval < {self.min_interval}s")
+                return False
+            # 写入线程序列化时主线程仍会向最近一帧追加记录，需要在锁内拷贝列表
+            snapshot = [entry.copy() for entry in self._entries]
+            try:
+                self._queue.put_nowait((directory, snapshot, info))
+            except queue.Full:
+                log.warning("flight recorder dump skipped: writer busy")
+                return False
+            self._last_dump = now
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = Thread(target=self._run, name="FlightRecorderWriter", daemon=True)
+                self._writer.start()
+        return True
+
+    def flush(self) -> None:
+        """ 阻塞直到所有导出任务写入完成 """
+        self._queue.join()
+
+    def close(self) -> None:
+        """ 写完剩余的导出任务并停止写入线程 """
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        self._queue.put(None)
+        writer.join()
+        self._writer = None
+
+    def _attach(self, key: str, item: Dict[str, Any]) -> None:
+        with self._lock:
+            if not self._entries:
+                return
+            getattr(self._entries[-1], key).append(item)
+
+    def _run(self) -> None:
+        """ 写入线程 """
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                self._write(*task)
+            except Exception as e:
+                log.error(f"flight recorder dump failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, directory: str, entries: List[_Entry], info: Dict[str, Any]) -> None:
+        os.makedirs(directory, exist_ok=True)
+        frames = []
+        raw = None
+        offset = 0
+        if self.encoding == "raw":
+            raw = open(os.path.join(directory, "frames.raw"), "wb")
+        try:
+            for entry in entries:
+                frame = entry.frame
+                meta = dict(index=entry.index, time=entry.timestamp, shape=list(frame.shape),
+                            dtype=str(frame.dtype), actions=entry.actions, matches=entry.matches)
+                if raw is not None:
+                    data = np.ascontiguousarray(frame)
+                    raw.write(data.tobytes())
+                    meta["offset"] = offset
+                    offset += data.nbytes
+                else:
+                    name = f"{entry.index:06d}.{self.encoding}"
+                    cv2.imwrite(os.path.join(directory, name), frame, _encode_params(self.encoding))
+                    meta["file"] = name
+                frames.append(meta)
+        finally:
+            if raw is not None:
+                raw.close()
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(dict(info, encoding=self.encoding, frames=frames), f, ensure_ascii=False)
+        log.debug(f"flight recorder dumped {len(frames)} frames to {directory}")
+
+
+def _owned_bytes(frame: np.ndarray) -> int:
+    """帧实际占用的内存，视图按其底层数组计算(例如共享桌面截图中的窗口区域)
+
+    memmap的视图(例如ReplayGame.from_bundle的帧)只计算帧本身，整个文件并没有读入内存
+    """
+    root = frame
+    while isinstance(root.base, np.ndarray):
+        if isinstance(root, np.memmap):
+            return frame.nbytes
+        root = root.base
+    return frame.nbytes if isinstance(root, np.memmap) else root.nbytes
+
+
+def _encode_params(encoding: str) -> List[int]:
+    """ 偏向速度的编码参数 """
+    if encoding == "png":
+        return [cv2.IMWRITE_PNG_COMPRESSION, 1]
+    if encoding == "jpg":
+        return [cv2.IMWRITE_JPEG_QUALITY, 90]
+    return []
+
+
+def load_raw_frames(directory: str) -> List[np.ndarray]:
+    """ 以memmap方式读取raw格式导出的帧 """
+    with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta["encoding"] != "raw":
+        raise ValueError("dump encoding is not raw")
+    path = os.path.join(directory, "frames.raw")
+    return [np.memmap(path, dtype=m["dtype"], mode="r", offset=m["offset"], shape=tuple(m["shape"]))
+            for m in meta["frames"]]
@@ -0,0 +1,69 @@
+from threading import Lock, Thread
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .clock import Clock
+
+ENCODINGS: Tuple[str, ...]
+
+
+class _Entry:
+    index: int
+    timestamp: float
+    frame: np.ndarray
+    actions: List[Dict[str, Any]]
+    matches: List[Dict[str, Any]]
+    def __init__(self, index: int, timestamp: float, frame: np.ndarray) -> None: ...
+    def copy(self) -> _Entry: ...
+
+
+class FlightRecorder:
+    capacity: int
+    max_bytes: int
+    encoding: str
+    min_interval: float
+    clock: Clock
+    _entries: Deque[_Entry]
+    _bytes: int
+    _count: int
+    _lock: Lock
+    _writer: Optional[Thread]
+    _last_dump: float
+    def __init__(self, capacity: int = 30, max_bytes: int = 256 * 1024 * 1024,
+                 encoding: str = "bmp", min_interval: float = 5.0, max_pending: int = 2,
+                 clock: Optional[Clock] = None) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    @property
+    def nbytes(self) -> int: ...
+
+    def record_frame(self, frame: np.ndarray) -> int: ...
+
+    def record_action(self, action: str, **info) -> None: ...
+
+    def record_match(self, template: str, score: float, loc: Tuple[int, int], **info) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def dump(self, directory: str, **info) -> bool: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+    def _attach(self, key: str, item: Dict[str, Any]) -> None: ...
+
+    def _run(self) -> None: ...
+
+    def _write(self, directory: str, entries: List[_Entry], info: Dict[str, Any]) -> None: ...
+
+
+def _owned_bytes(frame: np.ndarray) -> int: ...
+
+
+def _encode_params(encoding: str) -> List[int]: ...
+
+
+def load_raw_frames(directory: str) -> List[np.ndarray]: ...
@@ -0,0 +1,280 @@
+"""回放模块
+
+使用录制的画面代替真实的游戏窗口，配合记录操作的假键鼠后端，
+可以在没有Windows和游戏客户端的机器上完整运行GameController脚本。
+
+    game = ReplayGame.from_directory("records/login")
+    controller = GameController(game.cls, game.name, game=game, backend=ReplayInput(game))
+"""
+import glob
+import json
+import os
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+from .core import Pos, Rect
+from .clock import Clock, get_clock
+from .recorder import load_raw_frames
+from . import log
+
+ADVANCES = ("clock", "input")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+class _VideoFrames:
+    """ 按顺序解码视频帧，只保留当前帧 """
+
+    def __init__(self, path: str) -> None:
+        self._capture = cv2.VideoCapture(path)
+        if not self._capture.isOpened():
+            raise FileNotFoundError(f"can not open video {path}")
+        self._length = int(self._capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._index = -1
+        self._frame: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        if index < self._index:
+            self._capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self._index = index - 1
+        while self._index < index:
+            # 跳过的帧只grab不解码
+            if self._index < index - 1:
+                ok = self._capture.grab()
+            else:
+                ok, self._frame = self._capture.read()
+            if not ok:
+                self._length = self._index + 1
+                break
+            self._index += 1
+        return self._frame
+
+
+class _ImageFrames:
+    """ 按需读取图片文件，只缓存当前帧 """
+
+    def __init__(self, files: Sequence[str]) -> None:
+        self._files = list(files)
+        self._index = -1
+        self._frame: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        if index != self._index:
+            self._frame = cv2.imread(self._files[index])
+            self._index = index
+        return self._frame
+
+
+class ReplayGame:
+    def __init__(self, frames: Sequence[np.ndarray], timestamps: Optional[Sequence[float]] = None,
+                 meta: Optional[Dict[str, Any]] = None, advance: str = "clock", speed: float = 1.0,
+                 fps: float = 10.0, clock: Optional[Clock] = None) -> None:
+        """
+        advance为clock时按照经过的时间选择帧，为input时每收到一次输入前进一帧
+
+        Args:
+            frames (Sequence[ndarray]): BGR帧序列
+            timestamps (Sequence[float], None): 每帧的时间戳(秒)，为None时按fps生成
+            meta (dict, None): 游戏窗口信息 cls name rect scaling，rect缺省时使用帧的大小
+            advance (str): 前进方式 clock input (default clock)
+            speed (float): clock模式下的回放倍速 (default 1.0)
+            fps (float): 没有时间戳时使用的帧率 (default 10.0)
+            clock (Clock, None): clock模式下使用的时钟, 为None时使用包默认时钟
+        """
+        if advance not in ADVANCES:
+            raise ValueError(f"advance must in {ADVANCES}")
+        if not isinstance(speed, (int, float)) or speed <= 0:
+            raise ValueError("param speed must be a positive number")
+        if len(frames) == 0:
+            raise ValueError("frames is empty")
+        if timestamps is None:
+            timestamps = [i / fps for i in range(len(frames))]
+        if len(timestamps) != len(frames):
+            raise ValueError("timestamps and frames length not equal")
+        meta = dict(meta or {})
+        self.screenshot: np.ndarray
+        self._frames = frames
+        self._timestamps = [t - timestamps[0] for t in timestamps]
+        self._advance = advance
+        self._speed = speed
+        self._clock = get_clock() if clock is None else clock
+        self._game_class = meta.get("cls")
+        self._game_name = meta.get("name", "replay")
+        self._scaling = meta.get("scaling", 1.0)
+        rect = meta.get("rect")
+        if rect is None:
+            h, w = frames[0].shape[:2]
+            rect = (0, 0, w, h)
+        self._rect = Rect(*rect)
+        self._index = 0
+        self._start: Optional[float] = None
+
+    @classmethod
+    def from_directory(cls, path: str, **kwargs) -> "ReplayGame":
+        """读取目录
+
+        支持FlightRecorder导出的目录(meta.json)，以及按文件名排序的图片目录
+        """
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            frames_meta = meta.get("frames", [])
+            if meta.get("encoding") == "raw":
+                frames = load_raw_frames(path)
+            else:
+                frames = _ImageFrames([os.path.join(path, m["file"]) for m in frames_meta])
+            timestamps = [m["time"] for m in frames_meta] if frames_meta else None
+            kwargs.setdefault("timestamps", timestamps)
+            kwargs.setdefault("meta", meta.get("game"))
+            return cls(frames, **kwargs)
+        files = sorted(f for f in glob.glob(os.path.join(path, "*")) if f.lower().endswith(IMAGE_EXTENSIONS))
+        return cls(_ImageFrames(files), **kwargs)
+
+    @classmethod
+    def from_video(cls, path: str, **kwargs) -> "ReplayGame":
+        """ 读取视频，时间戳由视频帧率生成 """
+        frames = _VideoFrames(path)
+        fps = frames._capture.get(cv2.CAP_PROP_FPS) or 10.0
+        kwargs.setdefault("fps", fps)
+        return cls(frames, **kwargs)
+
+    @classmethod
+    def from_bundle(cls, path: str, **kwargs) -> "ReplayGame":
+        """读取帧包
+
+        帧包是形状为(N, H, W, 3)的.npy文件，以memmap方式打开；
+        同名.json文件(可选)中保存timestamps和game信息
+        """
+        frames = np.load(path, mmap_mode="r")
+        meta_path = os.path.splitext(path)[0] + ".json"
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            kwargs.setdefault("timestamps", meta.get("timestamps"))
+            kwargs.setdefault("meta", meta.get("game"))
+        return cls(frames, **kwargs)
+
+    @property
+    def cls(self) -> Union[str, None]:
+        return self._game_class
+
+    @property
+    def hwnd(self) -> int:
+        return 0
+
+    @property
+    def width(self) -> int:
+        return self._rect.right - self._rect.left
+
+    @property
+    def height(self) -> int:
+        return self._rect.bottom - self._rect.top
+
+    @property
+    def top_left(self) -> Pos:
+        return Pos(self._rect.left, self._rect.top)
+
+    @property
+    def scaling(self) -> float:
+        return self._scaling
+
+    @property
+    def name(self) -> str:
+        return self._game_name
+
+    @property
+    def index(self) -> int:
+        """ 当前帧序号 """
+        return self._index
+
+    @property
+    def finished(self) -> bool:
+        """ 是否已经到达最后一帧 """
+        return self._index >= len(self._frames) - 1
+
+    def is_foreground(self) -> bool:
+        return True
+
+    def set_foreground(self) -> None:
+        pass
+
+    def get_screenshot(self) -> np.ndarray:
+        """ 返回当前帧 """
+        if self._advance == "clock":
+            now = self._clock.time()
+            if self._start is None:
+                self._start = now
+            elapsed = (now - self._start) * self._speed
+            self._index = max(bisect_right(self._timestamps, elapsed) - 1, 0)
+        frame = self._frames[min(self._index, len(self._frames) - 1)]
+        self.screenshot = np.ascontiguousarray(frame)
+        return self.screenshot
+
+    def get_rect(self) -> Rect:
+        return self._rect
+
+    def on_input(self) -> None:
+        """ 收到一次输入，input模式下前进一帧 """
+        if self._advance == "input" and not self.finished:
+            self._index += 1
+
+    def seek(self, index: int) -> None:
+        """ 跳转到某一帧 """
+        if not 0 <= index < len(self._frames):
+            raise IndexError(f"frame index {index} out of range")
+        self._index = index
+        self._start = None
+        if self._advance == "clock":
+            self._timestamps = [t - self._timestamps[index] for t in self._timestamps]
+
+
+class ReplayInput:
+    def __init__(self, game: Optional[ReplayGame] = None) -> None:
+        """
+        假的键鼠模拟后端，只记录操作不产生真实的输入
+
+        Args:
+            game (ReplayGame, None): 每次输入后通知game，用于input模式的回放
+        """
+        self.game = game
+        self.actions: List[Dict[str, Any]] = []
+
+    def mouse_move_to(self, pos: Pos, duration: float = 0.0) -> None:
+        self._emit("mouse_move_to", pos=(pos.x, pos.y), duration=duration)
+
+    def mouse_click_position(self, pos: Pos, button: str = "left", clock: Optional[Clock] = None) -> None:
+        self._emit("mouse_click_position", pos=(pos.x, pos.y), button=button)
+
+    def mouse_scroll(self, scale: int, count: int = 1, clock: Optional[Clock] = None) -> None:
+        self._emit("mouse_scroll", scale=scale, count=count)
+
+    def mouse_drag(self, start: Pos, end: Pos, button="left") -> None:
+        self._emit("mouse_drag", start=(start.x, start.y), end=(end.x, end.y), button=button)
+
+    def keyboard_down(self, key: str) -> None:
+        self._emit("keyboard_down", key=key)
+
+    def keyboard_up(self, key: str) -> None:
+        self._emit("keyboard_up", key=key)
+
+    def keyboard_press(self, key: str) -> None:
+        self._emit("keyboard_press", key=key)
+
+    def clear(self) -> None:
+        """ 清空记录的操作 """
+        self.actions.clear()
+
+    def _emit(self, action: str, **info) -> None:
+        self.actions.append(dict(action=action, **info))
+        log.debug(f"replay input: {action} {info}")
+        if self.game is not None:
+            self.game.on_input()
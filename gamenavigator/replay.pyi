@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .core import Pos, Rect
+from .clock import Clock
+
+ADVANCES: tuple[str, ...]
+IMAGE_EXTENSIONS: tuple[str, ...]
+
+
+class _VideoFrames:
+    _length: int
+    _index: int
+    _frame: Optional[np.ndarray]
+    def __init__(self, path: str) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int) -> np.ndarray: ...
+
+
+class _ImageFrames:
+    _files: List[str]
+    _index: int
+    _frame: Optional[np.ndarray]
+    def __init__(self, files: Sequence[str]) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __getitem__(self, index: int) -> np.ndarray: ...
+
+
+class ReplayGame:
+    screenshot: np.ndarray
+    _frames: Sequence[np.ndarray]
+    _timestamps: List[float]
+    _advance: str
+    _speed: float
+    _clock: Clock
+    _game_class: Union[str, None]
+    _game_name: str
+    _scaling: float
+    _rect: Rect
+    _index: int
+    _start: Optional[float]
+    def __init__(self, frames: Sequence[np.ndarray], timestamps: Optional[Sequence[float]] = None,
+                 meta: Optional[Dict[str, Any]] = None, advance: str = "clock", speed: float = 1.0,
+                 fps: float = 10.0, clock: Optional[Clock] = None) -> None: ...
+
+    @classmethod
+    def from_directory(cls, path: str, **kwargs) -> "ReplayGame": ...
+
+    @classmethod
+    def from_video(cls, path: str, **kwargs) -> "ReplayGame": ...
+
+    @classmethod
+    def from_bundle(cls, path: str, **kwargs) -> "ReplayGame": ...
+
+    @property
+    def cls(self) -> Union[str, None]: ...
+
+    @property
+    def hwnd(self) -> int: ...
+
+    @property
+    def width(self) -> int: ...
+
+    @property
+    def height(self) -> int: ...
+
+    @property
+    def top_left(self) -> Pos: ...
+
+    @property
+    def scaling(self) -> float: ...
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def index(self) -> int: ...
+
+    @property
+    def finished(self) -> bool: ...
+
+    def is_foreground(self) -> bool: ...
+
+    def set_foreground(self) -> None: ...
+
+    def get_screenshot(self) -> np.ndarray: ...
+
+    def get_rect(self) -> Rect: ...
+
+    def on_input(self) -> None: ...
+
+    def seek(self, index: int) -> None: ...
+
+
+class ReplayInput:
+    game: Optional[ReplayGame]
+    actions: List[Dict[str, Any]]
+    def __init__(self, game: Optional[ReplayGame] = None) -> None: ...
+
+    def mouse_move_to(self, pos: Pos, duration: float = 0.0) -> None: ...
+
+    def mouse_click_position(self, pos: Pos, button: str = "left", clock: Optional[Clock] = None) -> None: ...
+
+    def mouse_scroll(self, scale: int, count: int = 1, clock: Optional[Clock] = None) -> None: ...
+
+    def mouse_drag(self, start: Pos, end: Pos, button='left') -> None: ...
+
+    def keyboard_down(self, key: str) -> None: ...
+
+    def keyboard_up(self, key: str) -> None: ...
+
+    def keyboard_press(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def _emit(self, action: str, **info) -> None: ...
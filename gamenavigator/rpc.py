@@ -0,0 +1,371 @@
+"""本地RPC客户端与协议
+
+编排进程、监控面板、标注工具等通过ControllerClient调用另一个进程中的GameController，
+不需要导入pywin32、也不需要自己截图。画面通过multiprocessing.shared_memory共享，
+客户端拿到的是共享内存上的只读视图，多个客户端读取同一帧没有复制开销。
+
+    with ControllerClient(("127.0.0.1", 8765)) as client:
+        client.click_image("start", timeout=5)
+        seq, frame = client.frame()
+
+协议: 每条消息为 <I 长度> + 内容
+    请求内容: <B 操作码><I 请求id> + 参数
+    响应内容: <B 状态><I 请求id> + 返回值或(异常类型, 异常信息)
+服务端设置了token时，连接后的第一条请求必须是携带token的OP_AUTH
+参数和返回值使用带类型标记的紧凑二进制编码，支持None bool int float str bytes list tuple dict
+以及Pos Rect MatchResult和ndarray(模板等)
+"""
+import os
+import socket
+import struct
+from threading import Lock
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .core import Pos, Rect, MatchResult
+from .exception import TemplateMathingFailure, TextMatchingFailure, WindowOutOfBoundsError
+from . import log
+
+OP_CALL = 1
+OP_INFO = 2
+OP_GRAB = 3
+OP_AUTH = 4
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_LENGTH = struct.Struct("<I")
+_MESSAGE = struct.Struct("<BI")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_POS = struct.Struct("<qq?")
+_RECT = struct.Struct("<qqqq")
+
+ERRORS = {e.__name__: e for e in (TemplateMathingFailure, TextMatchingFailure, WindowOutOfBoundsError,
+                                  TimeoutError, TypeError, ValueError, KeyError, AttributeError,
+                                  FileNotFoundError, PermissionError)}
+
+
+def encode(value: Any, out: List[bytes]) -> None:
+    """ 将value编码后追加到out """
+    if value is None:
+        out.append(b"N")
+    elif value is True or value is False:
+        out.append(b"T" if value else b"F")
+    elif isinstance(value, (int, np.integer)):
+        out.append(b"i" + _INT.pack(int(value)))
+    elif isinstance(value, (float, np.floating)):
+        out.append(b"d" + _FLOAT.pack(float(value)))
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(b"s" + _LENGTH.pack(len(data)) + data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        out.append(b"b" + _LENGTH.pack(len(value)) + bytes(value))
+    elif isinstance(value, Pos):
+        out.append(b"p" + _POS.pack(value.x, value.y, value.is_game))
+    elif isinstance(value, Rect):
+        out.append(b"r" + _RECT.pack(*value.rect()))
+    elif isinstance(value, MatchResult):
+        out.append(b"M")
+        encode(tuple(value), out)
+    elif isinstance(value, (list, tuple)):
+        out.append((b"l" if isinstance(value, list) else b"t") + _LENGTH.pack(len(value)))
+        for item in value:
+            encode(item, out)
+    elif isinstance(value, dict):
+        out.append(b"m" + _LENGTH.pack(len(value)))
+        for key, item in value.items():
+            encode(key, out)
+            encode(item, out)
+    elif isinstance(value, np.ndarray):
+        dtype = value.dtype.str.encode("ascii")
+        out.append(b"a" + bytes([len(dtype)]) + dtype + bytes([value.ndim]) +
+                   struct.pack(f"<{value.ndim}I", *value.shape))
+        data = np.ascontiguousarray(value).tobytes()
+        out.append(_LENGTH.pack(len(data)) + data)
+    else:
+        raise TypeError(f"can not encode {type(value).__name__}")
+
+
+def decode(buffer: memoryview, offset: int = 0) -> Tuple[Any, int]:
+    """ 从offset处解码一个值，返回(值, 下一个值的offset) """
+    tag = bytes(buffer[offset:offset + 1])
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag in (b"T", b"F"):
+        return tag == b"T", offset
+    if tag == b"i":
+        return _INT.unpack_from(buffer, offset)[0], offset + _INT.size
+    if tag == b"d":
+        return _FLOAT.unpack_from(buffer, offset)[0], offset + _FLOAT.size
+    if tag in (b"s", b"b"):
+        length = _LENGTH.unpack_from(buffer, offset)[0]
+        offset += _LENGTH.size
+        data = bytes(buffer[offset:offset + length])
+        return (data.decode("utf-8") if tag == b"s" else data), offset + length
+    if tag == b"p":
+        x, y, is_game = _POS.unpack_from(buffer, offset)
+        return Pos(x, y, is_game=is_game), offset + _POS.size
+    if tag == b"r":
+        return Rect(*_RECT.unpack_from(buffer, offset)), offset + _RECT.size
+    if tag == b"M":
+        fields, offset = decode(buffer, offset)
+        template, pos, size, score, timestamp = fields
+        return MatchResult(template, pos, tuple(size), score, timestamp), offset
+    if tag in (b"l", b"t"):
+        count = _LENGTH.unpack_from(buffer, offset)[0]
+        offset += _LENGTH.size
+        items = []
+        for _ in range(count):
+            item, offset = decode(buffer, offset)
+            items.append(item)
+        return (items if tag == b"l" else tuple(items)), offset
+    if tag == b"m":
+        count = _LENGTH.unpack_from(buffer, offset)[0]
+        offset += _LENGTH.size
+        result = {}
+        for _ in range(count):
+            key, offset = decode(buffer, offset)
+            result[key], offset = decode(buffer, offset)
+        return result, offset
+    if tag == b"a":
+        length = buffer[offset]
+        dtype = np.dtype(bytes(buffer[offset + 1:offset + 1 + length]).decode("ascii"))
+        offset += 1 + length
+        ndim = buffer[offset]
+        shape = struct.unpack_from(f"<{ndim}I", buffer, offset + 1)
+        offset += 1 + 4 * ndim
+        size = _LENGTH.unpack_from(buffer, offset)[0]
+        offset += _LENGTH.size
+        array = np.frombuffer(buffer[offset:offset + size], dtype=dtype).reshape(shape).copy()
+        return array, offset + size
+    raise ValueError(f"unknown tag {tag!r}")
+
+
+def pack_message(code: int, request_id: int, value: Any) -> bytes:
+    """ 编码一条完整的消息(含长度前缀) """
+    out = [_MESSAGE.pack(code, request_id)]
+    encode(value, out)
+    body = b"".join(out)
+    return _LENGTH.pack(len(body)) + body
+
+
+def unpack_message(body: bytes) -> Tuple[int, int, Any]:
+    """ 解码消息内容(不含长度前缀)，返回(操作码或状态, 请求id, 值) """
+    code, request_id = _MESSAGE.unpack_from(body, 0)
+    value, _ = decode(memoryview(body), _MESSAGE.size)
+    return code, request_id, value
+
+
+def recv_message(sock: socket.socket) -> Optional[bytes]:
+    """ 读取一条消息的内容，连接关闭时返回None """
+    header = _recv_exact(sock, _LENGTH.size)
+    if header is None:
+        return None
+    return _recv_exact(sock, _LENGTH.unpack(header)[0])
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            return None
+        received += n
+    return bytes(buffer)
+
+
+# 本进程创建的共享内存名称
+_owned: Set[str] = set()
+
+
+class SharedFrame:
+    _HEADER = struct.Struct("<4sIQQ")
+    _SLOT = struct.Struct("<QIII")
+    MAGIC = b"GWNF"
+    SLOT_HEADER = 64
+
+    def __init__(self, name: Optional[str] = None, capacity: int = 0, slots: int = 3) -> None:
+        """
+        共享内存中的帧缓冲，写入方每次发布一帧到下一个槽位并递增序号，读取方得到最新一帧的视图。
+        有slots个槽位，读取到的视图在之后的slots-1次发布内不会被覆盖，可以用valid检查
+
+        Args:
+            name (str, None): 共享内存名称, 为None时创建新的共享内存(写入方)
+            capacity (int): 创建时每个槽位能容纳的最大字节数
+            slots (int): 创建时的槽位数量 (default 3)
+        """
+        if name is None:
+            if capacity <= 0:
+                raise ValueError("param capacity must be positive")
+            if slots < 2:
+                raise ValueError("param slots must not be less than 2")
+            slot_bytes = self.SLOT_HEADER + (capacity + 63) // 64 * 64
+            self.shm = shared_memory.SharedMemory(create=True, size=self.SLOT_HEADER + slot_bytes * slots)
+            self._HEADER.pack_into(self.shm.buf, 0, self.MAGIC, slots, slot_bytes, 0)
+            self.owner = True
+            _owned.add(self.shm.name)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if os.name == "posix" and self.shm.name not in _owned:
+                # 读取方不负责释放，避免resource_tracker在进程退出时删除共享内存
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self.shm._name, "shared_memory")
+            magic, slots, slot_bytes, _ = self._HEADER.unpack_from(self.shm.buf, 0)
+            if magic != self.MAGIC:
+                self.shm.close()
+                raise ValueError(f"{name} is not a shared frame")
+            self.owner = False
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.capacity = slot_bytes - self.SLOT_HEADER
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def seq(self) -> int:
+        """ 最新一帧的序号, 0表示还没有发布 """
+        return self._HEADER.unpack_from(self.shm.buf, 0)[3]
+
+    def _slot(self, seq: int) -> int:
+        return self.SLOT_HEADER + (seq % self.slots) * self.slot_bytes
+
+    def publish(self, image: np.ndarray) -> int:
+        """ 发布一帧，返回序号，超过容量时不发布并返回0 """
+        if image.dtype != np.uint8 or image.ndim not in (2, 3):
+            raise TypeError("only uint8 images can be published")
+        if image.nbytes > self.capacity:
+            log.warning(f"frame of {image.nbytes} bytes exceeds shared frame capacity {self.capacity}")
+            return 0
+        seq = self.seq + 1
+        offset = self._slot(seq)
+        h, w = image.shape[:2]
+        c = image.shape[2] if image.ndim == 3 else 0
+        buf = self.shm.buf
+        # 写入期间槽位序号为0，读取方会发现序号不一致
+        self._SLOT.pack_into(buf, offset, 0, h, w, c)
+        target = np.ndarray(image.shape, np.uint8, buf, offset + self.SLOT_HEADER)
+        target[...] = image
+        del target
+        self._SLOT.pack_into(buf, offset, seq, h, w, c)
+        struct.pack_into("<Q", buf, 16, seq)
+        return seq
+
+    def read(self, copy: bool = False) -> Tuple[int, Optional[np.ndarray]]:
+        """读取最新一帧
+
+        Args:
+            copy (bool): 返回副本, 为False时返回共享内存上的只读视图 (default False)
+
+        Returns:
+            (seq, ndarray) 还没有发布时返回(0, None)
+        """
+        for _ in range(self.slots):
+            seq = self.seq
+            if seq == 0:
+                return 0, None
+            offset = self._slot(seq)
+            slot_seq, h, w, c = self._SLOT.unpack_from(self.shm.buf, offset)
+            if slot_seq != seq:
+                # 写入方已经覆盖了这个槽位，重新读取最新序号
+                continue
+            shape = (h, w, c) if c else (h, w)
+            view = np.ndarray(shape, np.uint8, self.shm.buf, offset + self.SLOT_HEADER)
+            view.flags.writeable = False
+            if copy:
+                view = view.copy()
+                if not self.valid(seq):
+                    continue
+            return seq, view
+        return 0, None
+
+    def valid(self, seq: int) -> bool:
+        """ 序号为seq的帧是否还没有被覆盖 """
+        return self._SLOT.unpack_from(self.shm.buf, self._slot(seq))[0] == seq
+
+    def close(self) -> None:
+        """ 关闭共享内存，写入方同时释放共享内存，关闭前需要释放read返回的视图 """
+        try:
+            self.shm.close()
+        except BufferError:
+            log.warning("shared frame views are still alive, memory is released when they are freed")
+        if self.owner:
+            self.shm.unlink()
+            _owned.discard(self.shm.name)
+
+
+class RemoteError(Exception):
+    """ 服务端抛出了客户端不认识的异常 """
+    pass
+
+
+class ControllerClient:
+    def __init__(self, address: Tuple[str, int], timeout: Optional[float] = None,
+                 token: Optional[str] = None) -> None:
+        """
+        连接ControllerServer，GameController的操作可以直接作为方法调用
+
+        Args:
+            address (tuple): 服务端地址(host, port)
+            timeout (float, None): socket超时时间, None为不超时
+            token (str, None): 服务端要求的token
+        """
+        self.sock = socket.create_connection(address, timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._lock = Lock()
+        self._request_id = 0
+        if token is not None:
+            self._request(OP_AUTH, token)
+        info = self._request(OP_INFO, None)
+        self.info: Dict[str, Any] = info
+        self.methods = frozenset(info["methods"])
+        self.frames = SharedFrame(info["shm"])
+
+    def _request(self, op: int, value: Any) -> Any:
+        with self._lock:
+            self._request_id = (self._request_id + 1) & 0xFFFFFFFF
+            self.sock.sendall(pack_message(op, self._request_id, value))
+            body = recv_message(self.sock)
+        if body is None:
+            raise ConnectionError("server closed the connection")
+        status, _, value = unpack_message(body)
+        if status == STATUS_ERROR:
+            name, message = value
+            raise ERRORS.get(name, RemoteError)(message if name in ERRORS else f"{name}: {message}")
+        return value
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """ 调用服务端GameController的方法 """
+        return self._request(OP_CALL, (method, args, kwargs))
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name not in self.__dict__.get("methods", ()):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+        return call
+
+    def grab(self) -> int:
+        """ 让服务端截图并发布，返回帧序号 """
+        return self._request(OP_GRAB, None)
+
+    def frame(self, copy: bool = False) -> Tuple[int, Optional[np.ndarray]]:
+        """ 服务端最近一次截图, 见SharedFrame.read """
+        return self.frames.read(copy)
+
+    def close(self) -> None:
+        self.sock.close()
+        self.frames.close()
+
+    def __enter__(self) -> "ControllerClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,93 @@
+import socket
+import struct
+from threading import Lock
+from multiprocessing import shared_memory
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Type
+
+import numpy as np
+
+OP_CALL: int
+OP_INFO: int
+OP_GRAB: int
+OP_AUTH: int
+STATUS_OK: int
+STATUS_ERROR: int
+ERRORS: Dict[str, Type[Exception]]
+_owned: Set[str]
+
+
+def encode(value: Any, out: List[bytes]) -> None: ...
+
+
+def decode(buffer: memoryview, offset: int = 0) -> Tuple[Any, int]: ...
+
+
+def pack_message(code: int, request_id: int, value: Any) -> bytes: ...
+
+
+def unpack_message(body: bytes) -> Tuple[int, int, Any]: ...
+
+
+def recv_message(sock: socket.socket) -> Optional[bytes]: ...
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]: ...
+
+
+class SharedFrame:
+    _HEADER: struct.Struct
+    _SLOT: struct.Struct
+    MAGIC: bytes
+    SLOT_HEADER: int
+    shm: shared_memory.SharedMemory
+    owner: bool
+    slots: int
+    slot_bytes: int
+    capacity: int
+    def __init__(self, name: Optional[str] = None, capacity: int = 0, slots: int = 3) -> None: ...
+
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def seq(self) -> int: ...
+
+    def _slot(self, seq: int) -> int: ...
+
+    def publish(self, image: np.ndarray) -> int: ...
+
+    def read(self, copy: bool = False) -> Tuple[int, Optional[np.ndarray]]: ...
+
+    def valid(self, seq: int) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+class RemoteError(Exception): ...
+
+
+class ControllerClient:
+    sock: socket.socket
+    _lock: Lock
+    _request_id: int
+    info: Dict[str, Any]
+    methods: FrozenSet[str]
+    frames: SharedFrame
+    def __init__(self, address: Tuple[str, int], timeout: Optional[float] = None,
+                 token: Optional[str] = None) -> None: ...
+
+    def _request(self, op: int, value: Any) -> Any: ...
+
+    def call(self, method: str, *args, **kwargs) -> Any: ...
+
+    def __getattr__(self, name: str) -> Any: ...
+
+    def grab(self) -> int: ...
+
+    def frame(self, copy: bool = False) -> Tuple[int, Optional[np.ndarray]]: ...
+
+    def close(self) -> None: ...
+
+    def __enter__(self) -> "ControllerClient": ...
+
+    def __exit__(self, *args) -> None: ...
@@ -0,0 +1,221 @@
+"""本地RPC服务端
+
+在本地socket上提供GameController的操作，控制器每次截图都会发布到共享内存(见rpc.SharedFrame)，
+所有客户端共享同一次截图。
+
+    controller = GameController("UnityWndClass", "game")
+    with ControllerServer(controller, ("127.0.0.1", 8765)) as server:
+        server.serve_forever()
+
+    python -m gamenavigator.server UnityWndClass game --port 8765
+
+服务端可以控制本机的鼠标和键盘，默认只监听本机地址。监听其他地址时必须设置token，
+客户端连接后需要先发送相同的token(ControllerClient(address, token=...))，
+token以明文传输，只应在可信的网络中使用。共享内存的画面只有本机的客户端可以读取。
+"""
+import argparse
+import hmac
+import ipaddress
+import socket
+from threading import Lock, Thread
+from typing import Any, List, Optional, Tuple
+
+from .game_controller import GameController
+from .rpc import (OP_CALL, OP_INFO, OP_GRAB, OP_AUTH, STATUS_OK, STATUS_ERROR, SharedFrame,
+                  pack_message, unpack_message, recv_message)
+from . import log
+
+METHODS = frozenset((
+    "click_pos", "click_image", "click_text", "down_keyboard_time", "press", "set_foreground",
+    "mouse_move_to", "mouse_drag", "mouse_scroll", "wait_image", "wait_and_click_image",
+    "wait_text", "wait_and_click_text", "image_debug", "poll_watchers",
+))
+
+
+def _is_loopback(host: str) -> bool:
+    """ host是否只能从本机访问，主机名解析后的所有地址都必须是回环地址 """
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        pass
+    if not host:
+        return False
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+    except socket.gaierror:
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(a.split("%")[0]).is_loopback for a in addresses)
+
+
+class _PublishingGame:
+    """ 代理游戏对象，截图时发布到共享内存 """
+
+    def __init__(self, game, frames: SharedFrame) -> None:
+        self.game = game
+        self.frames = frames
+
+    def get_screenshot(self):
+        screenshot = self.game.get_screenshot()
+        self.frames.publish(screenshot)
+        return screenshot
+
+    def __getattr__(self, name: str):
+        return getattr(self.game, name)
+
+
+class ControllerServer:
+    def __init__(self, controller: GameController, address: Tuple[str, int] = ("127.0.0.1", 0),
+                 capacity: int = 0, slots: int = 3, token: Optional[str] = None) -> None:
+        """
+        创建时截图一次，用于确定共享内存的大小
+
+        控制器的调用是串行的，多个客户端同时调用时按到达顺序执行
+
+        Args:
+            controller (GameController): 控制器
+            address (tuple): 监听地址, 端口为0时由系统分配 (default ("127.0.0.1", 0))
+            capacity (int): 一帧的最大字节数, 0为第一次截图的大小
+            slots (int): 共享内存中的帧槽位数量 (default 3)
+            token (str, None): 客户端必须提供的token, 监听非本机地址时必须设置
+        """
+        if not isinstance(controller, GameController):
+            raise TypeError("param controller must is GameController type")
+        if token is None and not _is_loopback(address[0]):
+            raise ValueError(f"refuse to listen on non-loopback host {address[0]!r} without a token")
+        if token is not None and not _is_loopback(address[0]):
+            log.warning(f"controller server on {address[0]!r} accepts remote input, token is sent in plain text")
+        self.token = token
+        self.controller = controller
+        screenshot = controller.game.get_screenshot()
+        self.frames = SharedFrame(capacity=max(capacity, screenshot.nbytes), slots=slots)
+        self.frames.publish(screenshot)
+        self._game = controller.game
+        controller.game = _PublishingGame(controller.game, self.frames)
+        self._lock = Lock()
+        self._clients: List[socket.socket] = []
+        self._thread: Optional[Thread] = None
+        self._closed = False
+        self.sock = socket.create_server(address)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """ 实际监听的地址 """
+        return self.sock.getsockname()[:2]
+
+    def start(self) -> "ControllerServer":
+        """ 在后台线程中运行服务 """
+        self._thread = Thread(target=self.serve_forever, name="ControllerServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        log.info(f"controller server listening on {self.address}, frames in {self.frames.name}")
+        while not self._closed:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                break
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients.append(client)
+            Thread(target=self._handle, args=(client,), name="ControllerServerClient", daemon=True).start()
+
+    def _handle(self, client: socket.socket) -> None:
+        authenticated = self.token is None
+        try:
+            while True:
+                body = recv_message(client)
+                if body is None:
+                    break
+                op, request_id, value = unpack_message(body)
+                if not authenticated:
+                    authenticated = op == OP_AUTH and isinstance(value, str) and \
+                        hmac.compare_digest(value.encode("utf-8"), self.token.encode("utf-8"))
+                    if not authenticated:
+                        log.warning("controller server rejected a client with a wrong token")
+                        client.sendall(pack_message(STATUS_ERROR, request_id, ("PermissionError", "invalid token")))
+                        break
+                try:
+                    status, result = STATUS_OK, self._dispatch(op, value)
+                    message = pack_message(status, request_id, result)
+                except Exception as e:
+                    log.debug(f"controller server request failed: {e!r}")
+                    message = pack_message(STATUS_ERROR, request_id, (type(e).__name__, str(e)))
+                client.sendall(message)
+        except OSError:
+            pass
+        finally:
+            client.close()
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def _dispatch(self, op: int, value: Any) -> Any:
+        if op == OP_AUTH:
+            return True
+        if op == OP_INFO:
+            game = self._game
+            return dict(shm=self.frames.name, slots=self.frames.slots, methods=sorted(METHODS),
+                        name=game.name, width=game.width, height=game.height)
+        if op == OP_GRAB:
+            with self._lock:
+                self.controller.get_screenshot()
+            return self.frames.seq
+        if op == OP_CALL:
+            method, args, kwargs = value
+            if method not in METHODS:
+                raise AttributeError(f"method {method} is not exposed")
+            with self._lock:
+                result = getattr(self.controller, method)(*args, **kwargs)
+            if isinstance(result, Thread):
+                # 线程对象不能发送，down_keyboard_time(thread=True)返回None
+                result = None
+            return result
+        raise ValueError(f"unknown operation {op}")
+
+    def close(self) -> None:
+        """ 停止服务，断开所有客户端并释放共享内存 """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            # 唤醒阻塞在accept的线程
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        for client in list(self._clients):
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            client.close()
+        if self._thread is not None:
+            self._thread.join()
+        self.controller.game = self._game
+        self.frames.close()
+
+    def __enter__(self) -> "ControllerServer":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="expose a GameController on a local socket")
+    parser.add_argument("game_class", help="window class, use '' for any")
+    parser.add_argument("game_name", help="window title")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token", default=None, help="token required from clients, needed for non-loopback hosts")
+    args = parser.parse_args(argv)
+    controller = GameController(args.game_class or None, args.game_name)
+    with ControllerServer(controller, (args.host, args.port), token=args.token) as server:
+        print(f"serving {args.game_name} on {server.address}, frames in {server.frames.name}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import socket
+from threading import Lock, Thread
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from numpy import ndarray
+
+from .game_controller import GameController
+from .rpc import SharedFrame
+
+METHODS: FrozenSet[str]
+
+
+def _is_loopback(host: str) -> bool: ...
+
+
+class _PublishingGame:
+    game: Any
+    frames: SharedFrame
+    def __init__(self, game, frames: SharedFrame) -> None: ...
+
+    def get_screenshot(self) -> ndarray: ...
+
+    def __getattr__(self, name: str) -> Any: ...
+
+
+class ControllerServer:
+    controller: GameController
+    token: Optional[str]
+    frames: SharedFrame
+    _game: Any
+    _lock: Lock
+    _clients: List[socket.socket]
+    _thread: Optional[Thread]
+    _closed: bool
+    sock: socket.socket
+    def __init__(self, controller: GameController, address: Tuple[str, int] = ("127.0.0.1", 0),
+                 capacity: int = 0, slots: int = 3, token: Optional[str] = None) -> None: ...
+
+    @property
+    def address(self) -> Tuple[str, int]: ...
+
+    def start(self) -> "ControllerServer": ...
+
+    def serve_forever(self) -> None: ...
+
+    def _handle(self, client: socket.socket) -> None: ...
+
+    def _dispatch(self, op: int, value: Any) -> Any: ...
+
+    def close(self) -> None: ...
+
+    def __enter__(self) -> "ControllerServer": ...
+
+    def __exit__(self, *args) -> None: ...
+
+
+def main(argv: Optional[List[str]] = None) -> None: ...
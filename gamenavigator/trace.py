@@ -0,0 +1,154 @@
+"""时间线追踪
+
+开启后截图、模板匹配、OCR、set_foreground的等待、键鼠输入的延迟以及down_keyboard_time的子线程
+都会以开始/结束事件记录下来，可以导出为Chrome Trace Event格式的JSON，
+在chrome://tracing或https://ui.perfetto.dev中查看各线程的时间分布。
+
+事件保存在预先分配的环形缓冲区中，长时间运行时只保留最近的capacity个事件，内存占用固定。
+
+    set_tracer(Tracer())
+    ...
+    get_tracer().export("trace.json")
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from .clock import Clock, get_clock
+
+BEGIN = "B"
+END = "E"
+INSTANT = "i"
+
+
+class Span:
+    __slots__ = ("tracer", "name", "cat", "args")
+
+    def __init__(self, tracer: Optional["Tracer"], name: str, cat: str, args: Dict[str, Any]) -> None:
+        """ with语句的开始和结束分别记录一个事件，在with中向args添加的参数记录在结束事件上 """
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> Dict[str, Any]:
+        if self.tracer is not None:
+            self.tracer.add(BEGIN, self.name, self.cat, self.args)
+            self.args = {}
+        return self.args
+
+    def __exit__(self, *exc) -> None:
+        if self.tracer is not None:
+            self.tracer.add(END, self.name, self.cat, self.args)
+
+
+class Tracer:
+    def __init__(self, capacity: int = 1 << 20, clock: Optional[Clock] = None) -> None:
+        """
+        Args:
+            capacity (int): 环形缓冲区能保存的事件数量 (default 1048576)
+            clock (Clock, None): 时钟, 为None时使用包默认时钟
+        """
+        if capacity <= 0:
+            raise ValueError("param capacity must be positive")
+        self.capacity = capacity
+        self.clock = get_clock() if clock is None else clock
+        self._events: List[Optional[tuple]] = [None] * capacity
+        self._next = 0
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        self._start = self.clock.time()
+
+    def add(self, phase: str, name: str, cat: str = "", args: Optional[Dict[str, Any]] = None) -> None:
+        """ 记录一个事件，phase为B(开始) E(结束) i(瞬时) """
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        with self._lock:
+            index = self._next
+            self._next += 1
+        self._events[index % self.capacity] = (index, self.clock.time(), phase, tid, name, cat, args or None)
+
+    def span(self, name: str, cat: str = "", **args) -> Span:
+        return Span(self, name, cat, args)
+
+    def instant(self, name: str, cat: str = "", **args) -> None:
+        self.add(INSTANT, name, cat, args)
+
+    def __len__(self) -> int:
+        return min(self._next, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """ 被覆盖的事件数量 """
+        return max(self._next - self.capacity, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events = [None] * self.capacity
+            self._next = 0
+        self._start = self.clock.time()
+
+    def events(self) -> List[Dict[str, Any]]:
+        """按时间顺序返回Chrome Trace Event格式的事件
+
+        开始事件被环形缓冲区覆盖的结束事件会被丢弃，使导出的时间线保持配对
+        """
+        records = sorted((e for e in self._events if e is not None), key=lambda e: e[0])
+        pid = os.getpid()
+        stacks: Dict[int, List[str]] = {}
+        result: List[Dict[str, Any]] = []
+        for tid, name in self._threads.items():
+            result.append(dict(name="thread_name", ph="M", pid=pid, tid=tid, args=dict(name=name)))
+        for _, ts, phase, tid, name, cat, args in records:
+            stack = stacks.setdefault(tid, [])
+            if phase == BEGIN:
+                stack.append(name)
+            elif phase == END:
+                if not stack or stack[-1] != name:
+                    continue
+                stack.pop()
+            event = dict(name=name, cat=cat, ph=phase, ts=round((ts - self._start) * 1e6, 3), pid=pid, tid=tid)
+            if phase == INSTANT:
+                event["s"] = "t"
+            if args:
+                event["args"] = args
+            result.append(event)
+        return result
+
+    def to_json(self) -> Dict[str, Any]:
+        return dict(traceEvents=self.events(), displayTimeUnit="ms", otherData=dict(dropped=self.dropped))
+
+    def export(self, path: str) -> None:
+        """ 导出为Chrome Trace Event格式的JSON文件 """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, default=_jsonable)
+
+
+def _jsonable(value: Any) -> Any:
+    """ numpy标量和数组等转换为JSON类型 """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    """ 获取当前的追踪器，没有开启时为None """
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """ 设置追踪器，None为关闭追踪 """
+    global _tracer
+    if tracer is not None and not isinstance(tracer, Tracer):
+        raise TypeError("param tracer must is Tracer type")
+    _tracer = tracer
+
+
+def span(name: str, cat: str = "", **args) -> Span:
+    """ 使用当前追踪器记录一段时间，没有开启追踪时几乎没有开销 """
+    return Span(_tracer, name, cat, args)
@@ -0,0 +1,65 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from .clock import Clock
+
+BEGIN: str
+END: str
+INSTANT: str
+
+
+class Span:
+    tracer: Optional[Tracer]
+    name: str
+    cat: str
+    args: Dict[str, Any]
+    def __init__(self, tracer: Optional[Tracer], name: str, cat: str, args: Dict[str, Any]) -> None: ...
+
+    def __enter__(self) -> Dict[str, Any]: ...
+
+    def __exit__(self, *exc) -> None: ...
+
+
+class Tracer:
+    capacity: int
+    clock: Clock
+    _events: List[Optional[tuple]]
+    _next: int
+    _lock: threading.Lock
+    _threads: Dict[int, str]
+    _start: float
+    def __init__(self, capacity: int = 1 << 20, clock: Optional[Clock] = None) -> None: ...
+
+    def add(self, phase: str, name: str, cat: str = "", args: Optional[Dict[str, Any]] = None) -> None: ...
+
+    def span(self, name: str, cat: str = "", **args) -> Span: ...
+
+    def instant(self, name: str, cat: str = "", **args) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    @property
+    def dropped(self) -> int: ...
+
+    def clear(self) -> None: ...
+
+    def events(self) -> List[Dict[str, Any]]: ...
+
+    def to_json(self) -> Dict[str, Any]: ...
+
+    def export(self, path: str) -> None: ...
+
+
+def _jsonable(value: Any) -> Any: ...
+
+
+_tracer: Optional[Tracer]
+
+
+def get_tracer() -> Optional[Tracer]: ...
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None: ...
+
+
+def span(name: str, cat: str = "", **args) -> Span: ...
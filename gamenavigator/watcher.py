@@ -0,0 +1,266 @@
+"""区域监视器
+
+注册条件和回调后，每次截图时由WatcherSet统一检查所有监视器，
+条件从不满足变为满足时调用一次回调。同一帧内的灰度图等转换只计算一次，
+监视区域内每个像素与上次检查时的差都不超过tolerance时直接沿用上次的结果。
+
+    watchers = controller.watchers
+    watchers.add(TemplateWatcher("disconnect.png", on_disconnect, priority=10))
+    watchers.add(PixelWatcher(Pos(120, 40), (0, 0, 150), (60, 60, 255), on_low_hp))
+"""
+from abc import ABC, abstractmethod
+from threading import RLock
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from .core import Pos, Rect
+from .image_recognition import load_template, match_template, template_thresh
+from . import log
+
+
+class Frame:
+    def __init__(self, image: np.ndarray) -> None:
+        """ 一帧截图，缓存同一帧内共享的转换结果 """
+        self.image = image
+        self._gray: Optional[np.ndarray] = None
+
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY) if self.image.ndim == 3 else self.image
+        return self._gray
+
+    def crop(self, roi: Optional[Rect], gray: bool = False) -> np.ndarray:
+        """ 返回roi区域的视图，roi为None时返回整帧 """
+        image = self.gray if gray else self.image
+        if roi is None:
+            return image
+        return image[roi.top:roi.bottom, roi.left:roi.right]
+
+
+class Watcher(ABC):
+    def __init__(self, callback: Callable, roi: Optional[Rect] = None, priority: int = 0,
+                 once: bool = False, name: str = "") -> None:
+        """
+        Args:
+            callback (Callable): 条件满足时调用 callback(watcher, frame)
+            roi (Rect, None): 监视区域(窗口内坐标), None为整个窗口
+            priority (int): 优先级, 数值大的先检查先回调 (default 0)
+            once (bool): 回调一次后自动移除 (default False)
+            name (str): 名称, 用于日志
+        """
+        if not callable(callback):
+            raise TypeError("param callback must be callable")
+        if roi is not None and not isinstance(roi, Rect):
+            raise TypeError("param roi must is Rect type")
+        self.callback = callback
+        self.roi = roi
+        self.priority = priority
+        self.once = once
+        self.name = name or self.__class__.__name__
+        self.active = True
+        self.state = False
+
+    @abstractmethod
+    def check(self, frame: Frame) -> bool:
+        """ 当前帧条件是否满足 """
+        pass
+
+    def signature_gray(self) -> bool:
+        """ 判断区域是否变化时是否使用灰度图 """
+        return True
+
+    def __str__(self) -> str:
+        return f"<Watcher : {self.name}>"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class TemplateWatcher(Watcher):
+    def __init__(self, template: Union[str, np.ndarray, MatLike], callback: Callable, appear: bool = True,
+                 threshold: float = 0.8, mode: str = "color", **kwargs) -> None:
+        """
+        模板出现(appear=True)或消失(appear=False)时回调
+
+        Keyword Arguments:
+            与Watcher相同的roi priority once name
+        """
+        kwargs.setdefault("name", template if isinstance(template, str) else "")
+        super().__init__(callback, **kwargs)
+        self.template = load_template(template, mode)
+        self.thresh = template_thresh(template)
+        self.appear = appear
+        self.threshold = threshold
+        self.mode = mode
+
+    def check(self, frame: Frame) -> bool:
+        image = frame.crop(self.roi, gray=self.mode != "color")
+        h, w = self.template.shape[:2]
+        if image.shape[0] < h or image.shape[1] < w:
+            found = False
+        else:
+            _, max_val, _, _ = match_template(image, self.template, mode=self.mode, thresh=self.thresh)
+            found = max_val >= self.threshold
+        return found == self.appear
+
+
+class ChangeWatcher(Watcher):
+    def __init__(self, callback: Callable, roi: Optional[Rect] = None, threshold: float = 8.0, **kwargs) -> None:
+        """
+        区域内灰度的平均差超过threshold时回调(与上一帧比较)
+
+        Keyword Arguments:
+            与Watcher相同的priority once name
+        """
+        super().__init__(callback, roi, **kwargs)
+        self.threshold = threshold
+        self._previous: Optional[np.ndarray] = None
+
+    def check(self, frame: Frame) -> bool:
+        image = frame.crop(self.roi, gray=True)
+        previous, self._previous = self._previous, image
+        if previous is None or previous.shape != image.shape:
+            return False
+        return float(cv2.absdiff(previous, image).mean()) > self.threshold
+
+
+class PixelWatcher(Watcher):
+    def __init__(self, pos: Pos, lower: Tuple[int, int, int], upper: Tuple[int, int, int],
+                 callback: Callable, **kwargs) -> None:
+        """
+        像素pos的BGR颜色在[lower, upper]范围内时回调
+
+        Keyword Arguments:
+            与Watcher相同的priority once name
+        """
+        super().__init__(callback, Rect(pos.x, pos.y, pos.x + 1, pos.y + 1), **kwargs)
+        self.pos = pos
+        self.lower = np.array(lower)
+        self.upper = np.array(upper)
+
+    def check(self, frame: Frame) -> bool:
+        h, w = frame.image.shape[:2]
+        if not (0 <= self.pos.x < w and 0 <= self.pos.y < h):
+            # 像素不在画面内(例如窗口缩小后)时条件不满足
+            return False
+        pixel = frame.crop(self.roi)[0, 0]
+        return bool(np.all((pixel >= self.lower) & (pixel <= self.upper)))
+
+    def signature_gray(self) -> bool:
+        return False
+
+
+class TextWatcher(Watcher):
+    def __init__(self, text: str, callback: Callable, **kwargs) -> None:
+        """
+        区域内出现text时回调，建议设置roi以减少OCR的计算量
+
+        Keyword Arguments:
+            与Watcher相同的roi priority once name
+        """
+        kwargs.setdefault("name", text)
+        super().__init__(callback, **kwargs)
+        self.text = text
+
+    def check(self, frame: Frame) -> bool:
+        from .ocr_recognition import text_in_img
+        return text_in_img(np.ascontiguousarray(frame.crop(self.roi)), self.text)
+
+
+class WatcherSet:
+    def __init__(self, tolerance: int = 2) -> None:
+        """
+        统一检查所有监视器
+
+        监视区域内每个像素与上次检查时的差值都不超过tolerance时认为区域没有变化，直接沿用上次的结果。
+        按原分辨率逐像素比较，不缩小区域，小图标的出现和消失不会被平均掉
+
+        Args:
+            tolerance (int): 判断区域未变化的像素差 (default 2)
+        """
+        self.tolerance = tolerance
+        self._watchers: List[Watcher] = []
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._lock = RLock()
+        self._evaluating = False
+
+    def __len__(self) -> int:
+        return len(self._watchers)
+
+    def __iter__(self):
+        return iter(list(self._watchers))
+
+    def add(self, watcher: Watcher) -> Watcher:
+        """ 添加监视器，返回watcher本身 """
+        if not isinstance(watcher, Watcher):
+            raise TypeError("param watcher must is Watcher type")
+        with self._lock:
+            self._watchers.append(watcher)
+            self._watchers.sort(key=lambda w: -w.priority)
+        return watcher
+
+    def remove(self, watcher: Watcher) -> None:
+        with self._lock:
+            if watcher in self._watchers:
+                self._watchers.remove(watcher)
+            self._signatures.pop(id(watcher), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._watchers.clear()
+            self._signatures.clear()
+
+    def evaluate(self, image: np.ndarray) -> List[Watcher]:
+        """检查所有启用的监视器并调用条件刚变为满足的回调
+
+        回调中再次截图不会重复触发检查
+
+        Returns:
+            list[Watcher]: 本帧触发的监视器
+        """
+        with self._lock:
+            if self._evaluating or not self._watchers:
+                return []
+            self._evaluating = True
+            try:
+                fired = self._evaluate(Frame(image))
+            finally:
+                self._evaluating = False
+        return fired
+
+    def _evaluate(self, frame: Frame) -> List[Watcher]:
+        fired: List[Watcher] = []
+        signatures: Dict[tuple, np.ndarray] = {}
+        for watcher in list(self._watchers):
+            if not watcher.active:
+                continue
+            if not isinstance(watcher, ChangeWatcher):
+                key = (watcher.roi.rect() if watcher.roi is not None else None, watcher.signature_gray())
+                if key not in signatures:
+                    signatures[key] = self._signature(frame, watcher)
+                previous = self._signatures.get(id(watcher))
+                if previous is not None and previous.shape == signatures[key].shape and \
+                        int(cv2.absdiff(previous, signatures[key]).max()) <= self.tolerance:
+                    # 区域与上次检查时没有变化，沿用上次的结果
+                    continue
+            state = watcher.check(frame)
+            if not isinstance(watcher, ChangeWatcher):
+                # 只在检查后更新签名，缓慢的变化累积超过tolerance时仍会重新检查
+                self._signatures[id(watcher)] = signatures[key]
+            if state and not watcher.state:
+                fired.append(watcher)
+            watcher.state = state
+        for watcher in fired:
+            log.debug(f"watcher fired: {watcher.name}")
+            if watcher.once:
+                self.remove(watcher)
+            watcher.callback(watcher, frame)
+        return fired
+
+    def _signature(self, frame: Frame, watcher: Watcher) -> np.ndarray:
+        """ 区域的拷贝，截图可能在之后被复用或修改 """
+        return frame.crop(watcher.roi, gray=watcher.signature_gray()).copy()
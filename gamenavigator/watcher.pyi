@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from threading import RLock
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from cv2.typing import MatLike
+
+from .core import Pos, Rect
+
+
+class Frame:
+    image: np.ndarray
+    _gray: Optional[np.ndarray]
+    def __init__(self, image: np.ndarray) -> None: ...
+
+    @property
+    def gray(self) -> np.ndarray: ...
+
+    def crop(self, roi: Optional[Rect], gray: bool = False) -> np.ndarray: ...
+
+
+class Watcher(ABC):
+    callback: Callable
+    roi: Optional[Rect]
+    priority: int
+    once: bool
+    name: str
+    active: bool
+    state: bool
+    def __init__(self, callback: Callable, roi: Optional[Rect] = None, priority: int = 0,
+                 once: bool = False, name: str = "") -> None: ...
+
+    @abstractmethod
+    def check(self, frame: Frame) -> bool: ...
+
+    def signature_gray(self) -> bool: ...
+
+    def __str__(self) -> str: ...
+
+    def __repr__(self) -> str: ...
+
+
+class TemplateWatcher(Watcher):
+    template: np.ndarray
+    appear: bool
+    threshold: float
+    mode: str
+    thresh: int
+    def __init__(self, template: Union[str, np.ndarray, MatLike], callback: Callable, appear: bool = True,
+                 threshold: float = 0.8, mode: str = "color", **kwargs) -> None: ...
+
+    def check(self, frame: Frame) -> bool: ...
+
+
+class ChangeWatcher(Watcher):
+    threshold: float
+    _previous: Optional[np.ndarray]
+    def __init__(self, callback: Callable, roi: Optional[Rect] = None, threshold: float = 8.0, **kwargs) -> None: ...
+
+    def check(self, frame: Frame) -> bool: ...
+
+
+class PixelWatcher(Watcher):
+    pos: Pos
+    lower: np.ndarray
+    upper: np.ndarray
+    def __init__(self, pos: Pos, lower: Tuple[int, int, int], upper: Tuple[int, int, int],
+                 callback: Callable, **kwargs) -> None: ...
+
+    def check(self, frame: Frame) -> bool: ...
+
+    def signature_gray(self) -> bool: ...
+
+
+class TextWatcher(Watcher):
+    text: str
+    def __init__(self, text: str, callback: Callable, **kwargs) -> None: ...
+
+    def check(self, frame: Frame) -> bool: ...
+
+
+class WatcherSet:
+    tolerance: int
+    _watchers: List[Watcher]
+    _signatures: Dict[int, np.ndarray]
+    _lock: RLock
+    _evaluating: bool
+    def __init__(self, tolerance: int = 2) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[Watcher]: ...
+
+    def add(self, watcher: Watcher) -> Watcher: ...
+
+    def remove(self, watcher: Watcher) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def evaluate(self, image: np.ndarray) -> List[Watcher]: ...
+
+    def _evaluate(self, frame: Frame) -> List[Watcher]: ...
+
+    def _signature(self, frame: Frame, watcher: Watcher) -> np.ndarray: ...
@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from gamenavigator.bundle import TemplateBundle, compile_bundle
+from gamenavigator.calibrate import calibrate
+
+
+class TestCalibrate(unittest.TestCase):
+
+    def test_calibrate(self) -> None:
+        rng = np.random.default_rng(3)
+        template = rng.integers(0, 255, (12, 16, 3), dtype=np.uint8)
+        with tempfile.TemporaryDirectory() as directory:
+            template_dir = os.path.join(directory, "templates")
+            frame_dir = os.path.join(directory, "frames")
+            os.makedirs(template_dir)
+            os.makedirs(frame_dir)
+            cv2.imwrite(os.path.join(template_dir, "start.png"), template)
+            labels = {}
+            for i in range(12):
+                frame = rng.integers(0, 255, (60, 80, 3), dtype=np.uint8)
+                names = []
+                if i % 2 == 0:
+                    x, y = 40 + i, 30 + i // 2
+                    frame[y:y + 12, x:x + 16] = template
+                    names.append("start")
+                cv2.imwrite(os.path.join(frame_dir, f"{i}.png"), frame)
+                labels[f"frames/{i}.png"] = names
+            labels_path = os.path.join(directory, "labels.json")
+            with open(labels_path, "w", encoding="utf-8") as f:
+                json.dump(labels, f)
+
+            config = calibrate(template_dir, labels_path, processes=2, padding=2)["start"]
+            self.assertEqual(1.0, config["calibration"]["accuracy"])
+            self.assertEqual([38, 28, 68, 49], config["roi"])
+            self.assertLess(config["calibration"]["negative_max"], config["threshold"])
+
+            compile_bundle(template_dir, os.path.join(directory, "templates.gwnb"))
+            bundle = TemplateBundle(os.path.join(directory, "templates.gwnb"))
+            self.assertEqual((38, 28, 68, 49), bundle.roi("start"))
+            self.assertEqual(config["mode"], bundle.option("start", "mode"))
+
+
+if __name__ == '__main__':
+    unittest.main()
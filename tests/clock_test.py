@@ -0,0 +1,64 @@
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from gamenavigator.clock import RealClock, VirtualClock
+from gamenavigator.core import Pos
+from gamenavigator.game_controller import GameController
+from gamenavigator.replay import ReplayGame
+
+
+class TestClock(unittest.TestCase):
+
+    def test_virtual(self) -> None:
+        clock = VirtualClock()
+        clock.sleep(1.5)
+        clock.advance(0.5)
+        self.assertEqual(2.0, clock.time())
+        self.assertRaises(ValueError, clock.advance, -1)
+
+    def test_real_monotonic(self) -> None:
+        clock = RealClock()
+        t = clock.time()
+        clock.sleep(0)
+        self.assertLessEqual(t, clock.time())
+
+    def test_replay_clock_advance(self) -> None:
+        clock = VirtualClock()
+        frames = [np.full((2, 2, 3), i, np.uint8) for i in range(5)]
+        game = ReplayGame(frames, fps=10, clock=clock)
+        self.assertEqual(0, game.get_screenshot()[0, 0, 0])
+        clock.sleep(0.25)
+        self.assertEqual(2, game.get_screenshot()[0, 0, 0])
+        clock.sleep(10)
+        self.assertEqual(4, game.get_screenshot()[0, 0, 0])
+
+
+class FailSafeException(Exception):
+    pass
+
+
+class TestInputClock(unittest.TestCase):
+
+    def test_controller_clock(self) -> None:
+        # 键鼠模拟使用控制器的时钟，VirtualClock下点击和滚动不会真实等待
+        clock = VirtualClock()
+        game = ReplayGame([np.zeros((20, 30, 3), np.uint8)], clock=clock)
+        controller = GameController(None, "replay", game=game, clock=clock)
+        modules = dict(win32api=mock.MagicMock(), win32con=mock.MagicMock(),
+                       pyautogui=mock.MagicMock(FailSafeException=FailSafeException))
+        with mock.patch.dict("sys.modules", modules):
+            start = time.monotonic()
+            controller.click_pos(Pos(5, 5))
+            controller.mouse_scroll(Pos(5, 5), 3, 4)
+            elapsed = time.monotonic() - start
+        self.assertLess(elapsed, 0.1)
+        self.assertAlmostEqual(0.15 + 0.4, clock.time())
+        self.assertEqual(2, modules["win32api"].mouse_event.call_count)
+        self.assertEqual(4, modules["pyautogui"].scroll.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
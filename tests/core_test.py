@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from gamenavigator.core import Pos, PosArray, Rect, RectArray, MatchResult
+
+
+class TestPos(unittest.TestCase):
+
+    def test_numpy_int(self) -> None:
+        pos = Pos((np.int64(3), np.int32(4)))
+        self.assertEqual(Pos(3, 4), pos)
+        self.assertEqual(hash(Pos(3, 4)), hash(pos))
+        self.assertRaises(TypeError, Pos, 1.5, 2)
+
+    def test_immutable(self) -> None:
+        pos = Pos(1, 2)
+        with self.assertRaises(AttributeError):
+            pos.x = 3
+        with self.assertRaises(AttributeError):
+            pos.is_game = True
+
+
+class TestArray(unittest.TestCase):
+
+    def test_pos_array(self) -> None:
+        positions = PosArray([(1, 2), (3, 4), (100, 100)])
+        screen = positions.to_screen(Rect(10, 10, 60, 60))
+        self.assertEqual(True, screen.is_game)
+        self.assertEqual([(11, 12), (13, 14), (110, 110)], screen.tolist())
+        self.assertEqual([True, True, False], positions.in_bounds(Rect(0, 0, 50, 50)).tolist())
+        self.assertEqual(Pos(3, 4), positions[1])
+
+    def test_rect_array(self) -> None:
+        rects = RectArray.from_positions(PosArray([(0, 0), (40, 40)]), 20, 20)
+        self.assertEqual([(10, 10), (50, 50)], rects.centers().tolist())
+        intersection, valid = rects.intersect(Rect(10, 10, 45, 45))
+        self.assertEqual([(10, 10, 20, 20), (40, 40, 45, 45)], intersection.tolist())
+        self.assertEqual([True, True], valid.tolist())
+        _, valid = rects.intersect(Rect(100, 100, 120, 120))
+        self.assertEqual([False, False], valid.tolist())
+
+
+class TestMatchResult(unittest.TestCase):
+
+    def test_points(self) -> None:
+        result = MatchResult("button", Pos(10, 20), (30, 10), 0.95, 1.0)
+        self.assertEqual(Pos(25, 25), result.center)
+        self.assertEqual(Pos(10, 25), result.point("left"))
+        self.assertEqual(Pos(40, 25), result.point("right"))
+        self.assertIsNone(MatchResult("probe", None, (0, 0), 1.0, 1.0).center)
+
+
+if __name__ == '__main__':
+    unittest.main()
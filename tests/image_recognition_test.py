@@ -0,0 +1,174 @@
+import json
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from gamenavigator.bundle import TemplateBundle, compile_bundle, set_bundle
+from gamenavigator.clock import VirtualClock
+from gamenavigator.game_controller import GameController
+from gamenavigator.image_recognition import (IconLibrary, TemplateScaler, load_template, match_template,
+                                             match_template_multiscale, _resize)
+from gamenavigator.replay import ReplayGame, ReplayInput
+
+rng = np.random.default_rng(0)
+icons = [rng.integers(0, 255, (32, 32, 3), dtype=np.uint8) for _ in range(100)]
+
+
+class TestIconLibrary(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.library = IconLibrary()
+        for i, icon in enumerate(icons):
+            self.library.add(f"icon{i}", icon)
+
+    def test_identify(self) -> None:
+        crop = np.zeros((40, 40, 3), np.uint8)
+        crop[4:36, 4:36] = icons[42]
+        name, max_val, max_loc = self.library.identify(crop)
+        self.assertEqual("icon42", name)
+        self.assertEqual((4, 4), max_loc)
+
+    def test_shortlist(self) -> None:
+        self.assertEqual("icon7", self.library.shortlist(icons[7], 3)[0][0])
+
+    def test_duplicate(self) -> None:
+        self.assertRaises(ValueError, self.library.add, "icon0", icons[0])
+
+
+class TestTemplateBundle(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.screen = rng.integers(0, 255, (100, 150, 3), dtype=np.uint8)
+        directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(directory, "inventory"))
+        cv2.imwrite(os.path.join(directory, "inventory", "sword.png"), self.screen[20:50, 40:80])
+        with open(os.path.join(directory, "bundle.json"), "w", encoding="utf-8") as f:
+            json.dump({"inventory/sword": {"roi": [30, 10, 100, 60], "threshold": 0.9}}, f)
+        self.path = os.path.join(directory, "templates.gwnb")
+        self.assertEqual(1, compile_bundle(directory, self.path))
+
+    def test_load(self) -> None:
+        bundle = TemplateBundle(self.path)
+        self.assertEqual(["inventory/sword"], bundle.names)
+        self.assertEqual((30, 40, 3), bundle.get("inventory/sword").shape)
+        self.assertEqual((30, 40), bundle.get("inventory/sword", "gray").shape)
+        self.assertEqual((30, 10, 100, 60), bundle.roi("inventory/sword"))
+        self.assertEqual(0.9, bundle.threshold("inventory/sword"))
+
+    def test_duplicate_name(self) -> None:
+        directory = tempfile.mkdtemp()
+        for file in ("sword.png", "sword.jpg"):
+            cv2.imwrite(os.path.join(directory, file), self.screen[20:50, 40:80])
+        self.assertRaises(ValueError, compile_bundle, directory, os.path.join(directory, "templates.gwnb"))
+        self.assertFalse(os.path.exists(os.path.join(directory, "templates.gwnb")))
+
+    def test_match_by_name(self) -> None:
+        bundle = TemplateBundle(self.path)
+        template = load_template("inventory/sword", "gray", bundle)
+        _, max_val, _, max_loc = match_template(self.screen, template, mode="gray")
+        self.assertEqual((40, 20), max_loc)
+
+
+class TestBinaryBundle(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # 模板中的110在阈值100和127下二值化的结果不同
+        template = rng.choice(np.array([20, 110, 200], np.uint8), (30, 40))
+        self.template = cv2.cvtColor(template, cv2.COLOR_GRAY2BGR)
+        self.screen = rng.integers(0, 255, (100, 150, 3), dtype=np.uint8)
+        self.screen[0:30, 0:40] = self.template
+        self.screen[20:50, 40:80] = self.template
+        directory = tempfile.mkdtemp()
+        cv2.imwrite(os.path.join(directory, "sword.png"), self.template)
+        with open(os.path.join(directory, "bundle.json"), "w", encoding="utf-8") as f:
+            json.dump({"sword": {"roi": [30, 10, 100, 60], "threshold": 0.95, "mode": "binary"}}, f)
+        self.path = os.path.join(directory, "templates.gwnb")
+        compile_bundle(directory, self.path, thresh=100)
+
+    def tearDown(self) -> None:
+        set_bundle(None)
+
+    def test_match_template(self) -> None:
+        set_bundle(TemplateBundle(self.path))
+        _, max_val, _, _ = match_template(self.screen, "sword", mode="binary")
+        self.assertGreater(max_val, 0.999)
+        _, max_val, _, _ = match_template(self.screen, "sword", mode="binary", thresh=127)
+        self.assertGreater(max_val, 0.999)
+
+    def test_controller_roi_threshold(self) -> None:
+        clock = VirtualClock()
+        game = ReplayGame([self.screen], clock=clock)
+        controller = GameController(None, "replay", game=game, backend=ReplayInput(game), clock=clock,
+                                    bundle=TemplateBundle(self.path))
+        result = controller.wait_image("sword", timeout=0)[0]
+        # 只在roi内搜索，(0, 0)处的模板被排除
+        self.assertEqual((40, 20), (result.pos.x, result.pos.y))
+        self.assertGreater(result.score, 0.999)
+
+
+def smooth(h: int, w: int) -> np.ndarray:
+    """ 平滑的随机图像，缩放后仍能匹配 """
+    return cv2.GaussianBlur(rng.integers(0, 255, (h, w, 3), dtype=np.uint8), (0, 0), 3)
+
+
+class TestMultiscale(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.template = smooth(40, 40)
+        self.screen = np.zeros((120, 160, 3), np.uint8)
+        scaled = _resize(self.template, 1.2)
+        self.screen[10:10 + scaled.shape[0], 20:20 + scaled.shape[1]] = scaled
+
+    def test_match(self) -> None:
+        _, max_val, _, max_loc, scale = match_template_multiscale(self.screen, self.template)
+        self.assertEqual(1.2, scale)
+        self.assertEqual((20, 10), max_loc)
+        self.assertGreater(max_val, 0.99)
+
+    def test_larger_than_image(self) -> None:
+        self.assertRaises(ValueError, match_template_multiscale, self.screen[:30, :30], self.template)
+
+    def test_controller(self) -> None:
+        clock = VirtualClock()
+        game = ReplayGame([self.screen], clock=clock)
+        controller = GameController(None, "replay", game=game, backend=ReplayInput(game), clock=clock)
+        result = controller.wait_image(self.template, multiscale=True, threshold=0.99, timeout=0)[0]
+        # 返回的大小与实际匹配的模板相同
+        self.assertEqual(_resize(self.template, 1.2).shape[1::-1], result.size)
+        self.assertEqual((20, 10), (result.pos.x, result.pos.y))
+        # 模板比画面大时视为匹配失败，不会抛出ValueError
+        big = smooth(200, 200)
+        self.assertRaises(TimeoutError, controller.wait_image, big, multiscale=True, timeout=0)
+
+
+class TestTemplateScaler(unittest.TestCase):
+
+    def test_scale(self) -> None:
+        scaler = TemplateScaler((100, 50))
+        self.assertEqual(2.0, scaler.update((200, 120)))
+        template = smooth(10, 20)
+        scaled = scaler.scale(template)
+        self.assertEqual((20, 40, 3), scaled.shape)
+        self.assertIs(scaled, scaler.scale(template))
+        self.assertEqual((20, 10, 60, 40), scaler.scale_roi((10, 5, 30, 20)))
+        scaler.update((100, 50))
+        self.assertIs(template, scaler.scale(template))
+
+    def test_cache_bound(self) -> None:
+        scaler = TemplateScaler((100, 100), cache_size=2)
+        scaler.update((50, 50))
+        templates = [smooth(20, 20) for _ in range(3)]
+        for template in templates:
+            scaler.scale(template)
+        self.assertEqual(2, len(scaler._cache))
+        # 不同的数组不会得到其他数组的缓存
+        other = smooth(20, 20)
+        self.assertEqual(other[::2, ::2].shape, scaler.scale(other).shape)
+        self.assertFalse(np.shares_memory(scaler.scale(other), scaler.scale(templates[-1])))
+
+
+if __name__ == '__main__':
+    unittest.main()
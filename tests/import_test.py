@@ -0,0 +1,29 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY = ("cv2", "win32api", "win32gui", "win32con", "win32ui", "pyautogui", "PIL", "ppocronnx")
+
+
+def loaded_modules(statement: str) -> set:
+    """ 在新的解释器中执行statement，返回之后已加载的重量级模块 """
+    code = f"import sys\n{statement}\nprint(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_package(self) -> None:
+        self.assertEqual(set(), loaded_modules("import gamenavigator"))
+
+    def test_core(self) -> None:
+        self.assertEqual(set(), loaded_modules("import gamenavigator.core\nfrom gamenavigator import config"))
+
+    def test_lazy_name(self) -> None:
+        # 访问名称时才导入所在的子模块
+        self.assertEqual({"cv2"}, loaded_modules("import gamenavigator\ngamenavigator.match_template"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import json
+import tempfile
+import unittest
+
+import numpy as np
+
+from gamenavigator.clock import VirtualClock
+from gamenavigator.core import Pos, Rect
+from gamenavigator.game_controller import GameController
+from gamenavigator.latency import LatencyMeter, LatencyStats
+from gamenavigator.policy import FastThenRelax
+from gamenavigator.replay import ReplayGame, ReplayInput
+
+
+def make_controller(change: float):
+    """ change秒后(20, 10, 40, 30)区域变白 """
+    clock = VirtualClock()
+    before = np.zeros((40, 60, 3), np.uint8)
+    after = before.copy()
+    after[10:30, 20:40] = 255
+    game = ReplayGame([before, after], timestamps=[0.0, change], clock=clock)
+    return GameController(None, "replay", game=game, backend=ReplayInput(game), clock=clock)
+
+
+class TestLatencyMeter(unittest.TestCase):
+
+    def test_measure(self) -> None:
+        controller = make_controller(0.3)
+        meter = LatencyMeter(controller, interval=0.01)
+        latency = meter.measure("click", lambda: controller.click_pos(Pos(1, 1)), Rect(20, 10, 40, 30), "menu")
+        self.assertAlmostEqual(0.3, latency, delta=0.011)
+        self.assertEqual(1, len(meter.stats("click", "menu")))
+        self.assertEqual(1, len(meter.stats("click")))
+        self.assertEqual(0, len(meter.stats("press")))
+
+    def test_unchanged_roi(self) -> None:
+        controller = make_controller(0.3)
+        meter = LatencyMeter(controller, interval=0.01, timeout=1.0)
+        self.assertIsNone(meter.measure("press", lambda: controller.press("esc"), Rect(0, 0, 10, 10)))
+        self.assertEqual(1, meter.stats("press", "").timeouts)
+        self.assertIsNone(meter.recommend("press"))
+        self.assertIsNone(meter.policy("press"))
+
+    def test_apply(self) -> None:
+        controller = make_controller(0.5)
+        meter = LatencyMeter(controller, interval=0.01)
+        controller.delays["click"] = 2.0
+        meter.measure("click", lambda: controller.click_pos(Pos(1, 1)), Rect(20, 10, 40, 30))
+        self.assertEqual(2.0, controller.delays["click"])
+        delays = meter.apply(margin=1.0)
+        self.assertAlmostEqual(0.5, delays["click"], delta=0.011)
+        self.assertEqual(delays["click"], controller.delays["click"])
+        self.assertIsInstance(meter.policy("click"), FastThenRelax)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "latency.json")
+            meter.save(path, margin=1.0)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        self.assertEqual(delays, data["delays"])
+        self.assertEqual(1, data["stats"]["click"][""]["count"])
+
+    def test_controller_delays(self) -> None:
+        controller = make_controller(0.5)
+        controller.delays["press"] = 0.25
+        start = controller.clock.time()
+        controller.press("esc")
+        self.assertEqual(0.25, controller.clock.time() - start)
+
+
+class TestLatencyStats(unittest.TestCase):
+
+    def test_quantile(self) -> None:
+        stats = LatencyStats(samples=4)
+        for value in (0.1, 0.2, 0.3, 0.4, 0.5):
+            stats.add(value, value / 2)
+        self.assertEqual(4, len(stats))
+        self.assertAlmostEqual(0.35, stats.latency(0.5))
+        self.assertAlmostEqual(0.175, stats.after(0.5))
+        self.assertEqual(0.2, stats.summary()["min"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 import unittest
+from types import SimpleNamespace
 
 import cv2
+import numpy as np
 
-from gamenavigator.ocr_recognition import text_in_img
+from gamenavigator.ocr_recognition import text_in_img, IncrementalOCR
 
 apex = cv2.imread(r".\images\Apex Legends.png")
 star_rail = cv2.imread(r".\images\StarRail.png")
@@ -25,5 +27,68 @@ class TestInImage(unittest.TestCase):
         self.assertEqual(False, text_in_img(star_rail, "迷惑之谈"))
 
 
+class BlockOCR:
+    """ 把每种灰度的色块识别为一个文本, 记录每次识别的图像大小 """
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def detect_and_ocr(self, img):
+        self.calls.append(img.shape[:2])
+        result = []
+        for value in np.unique(img[..., 0]):
+            ys, xs = np.nonzero(img[..., 0] == value)
+            if value == 0 or len(xs) < 20:
+                continue
+            left, top, right, bottom = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+            box = np.array([[left, top], [right, top], [right, bottom], [left, bottom]], np.float32)
+            result.append(SimpleNamespace(box=box, ocr_text=f"text{value}", score=0.9))
+        return result
+
+
+class TestIncrementalOCR(unittest.TestCase):
+
+    def test_update_changed_region(self) -> None:
+        frame = np.zeros((240, 320, 3), np.uint8)
+        frame[10:22, 10:100] = 50
+        frame[40:52, 10:120] = 60
+        frame[200:212, 200:300] = 70
+        ocr = BlockOCR()
+        incremental = IncrementalOCR(ocr=ocr)
+        incremental.update(frame)
+        self.assertEqual(["text50", "text60", "text70"], incremental.text())
+        self.assertEqual([], incremental.update(frame))
+        self.assertEqual(1, len(ocr.calls))
+
+        frame = frame.copy()
+        frame[40:52, 10:120] = 0
+        frame[40:52, 10:80] = 61
+        self.assertEqual(["text61"], [b.ocr_text for b in incremental.update(frame)])
+        # 只识别了变化的行
+        self.assertLess(ocr.calls[-1][0] * ocr.calls[-1][1], 240 * 320 // 10)
+        self.assertEqual(["text50", "text61", "text70"], incremental.text())
+        self.assertFalse(incremental.contains("text60"))
+        self.assertEqual((10, 40), tuple(incremental.find("text61")[0].astype(int)))
+
+    def test_regions_bridged_by_text(self) -> None:
+        frame = np.zeros((240, 320, 3), np.uint8)
+        frame[98:110, 10:300] = 80
+        frame[70:86, 302:318] = 70
+        ocr = BlockOCR()
+        incremental = IncrementalOCR(ocr=ocr)
+        incremental.update(frame)
+
+        # 两处变化都与文本框80相交，合并后的区域与文本框70相交，需要完整地重新识别
+        frame = frame.copy()
+        frame[90:98, 10:30] = 90
+        frame[114:122, 270:290] = 91
+        added = incremental.update(frame)
+        self.assertEqual(2, len(ocr.calls))
+        self.assertEqual(["text70", "text80", "text90", "text91"], sorted(b.ocr_text for b in added))
+        self.assertEqual(["text70", "text80", "text90", "text91"], sorted(incremental.text()))
+        rects = {b.ocr_text: b.rect() for b in incremental.boxes}
+        self.assertEqual((302, 70, 318, 86), rects["text70"])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from gamenavigator.clock import VirtualClock
+from gamenavigator.policy import FixedPolicy, BackoffPolicy, FastThenRelax, poll, to_policy
+
+
+class TestPolicy(unittest.TestCase):
+
+    def test_intervals(self) -> None:
+        backoff = BackoffPolicy(0.05, 2.0, 0.3)
+        self.assertEqual([0.05, 0.1, 0.2, 0.3, 0.3], [backoff.interval(i) for i in range(5)])
+        relax = FastThenRelax(0.05, 2, 1.0)
+        self.assertEqual([0.05, 0.05, 1.0], [relax.interval(i) for i in range(3)])
+        jitter = BackoffPolicy(1.0, 1.0, 1.0, jitter=0.2, seed=1)
+        self.assertTrue(all(0.8 <= jitter.interval(i) <= 1.2 for i in range(20)))
+
+    def test_to_policy(self) -> None:
+        self.assertEqual(0.2, to_policy(0.2).interval(0))
+        self.assertRaises(TypeError, to_policy, "1")
+
+    def test_poll_subtracts_work_time(self) -> None:
+        clock = VirtualClock()
+        starts = []
+        for _ in poll(1.0, FixedPolicy(0.25), clock):
+            starts.append(clock.time())
+            clock.advance(0.1)  # 模拟匹配耗时
+        self.assertEqual([0.0, 0.25, 0.5, 0.75, 1.0], [round(t, 6) for t in starts])
+
+    def test_poll_deadline(self) -> None:
+        clock = VirtualClock()
+        count = sum(1 for _ in poll(1.0, FixedPolicy(0.4), clock))
+        # 0.0 0.4 0.8 以及截止时间1.0
+        self.assertEqual(4, count)
+        self.assertEqual(1.0, clock.time())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from threading import Event, Thread
+
+import numpy as np
+
+from gamenavigator.clock import VirtualClock
+from gamenavigator.pool import DesktopCapture, FocusArbiter
+
+
+class FakeGame:
+    def __init__(self, name: str, fail: bool = False) -> None:
+        self.name = name
+        self.fail = fail
+        self.activations = 0
+
+    def activate(self) -> None:
+        if self.fail:
+            raise OSError(f"window {self.name} is closed")
+        self.activations += 1
+
+
+class FakeBackend:
+    def __init__(self, frame: np.ndarray, origin=(0, 0)) -> None:
+        self.frame = frame
+        self.origin = origin
+
+    def grab(self, bbox=None, all_screens=False) -> np.ndarray:
+        return self.frame
+
+    def get_desktop_origin(self):
+        return self.origin
+
+
+class TestFocusArbiter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.arbiter = FocusArbiter(settle=1.0, clock=VirtualClock())
+        self.order = []
+
+    def tearDown(self) -> None:
+        self.arbiter.close()
+
+    def block(self, game: FakeGame):
+        """ 提交一个阻塞的输入，返回后调度线程停在该输入中 """
+        started, release = Event(), Event()
+
+        def func():
+            started.set()
+            release.wait()
+            self.order.append(game.name)
+        future = self.arbiter.submit(game, func)
+        started.wait()
+        return future, release
+
+    def test_batching_order(self) -> None:
+        a, b = FakeGame("a"), FakeGame("b")
+        future, release = self.block(a)
+        futures = [self.arbiter.submit(game, self.order.append, name)
+                   for game, name in ((b, "b1"), (a, "a2"), (b, "b2"), (b, "b3"))]
+        release.set()
+        for f in futures:
+            f.result()
+        # 当前前台窗口的输入优先，之后切换一次执行另一个窗口的所有输入
+        self.assertEqual(["a", "a2", "b1", "b2", "b3"], self.order)
+        self.assertEqual(2, self.arbiter.switches)
+
+    def test_max_batch_yield(self) -> None:
+        self.arbiter.max_batch = 2
+        a, b = FakeGame("a"), FakeGame("b")
+        future, release = self.block(b)
+        futures = [self.arbiter.submit(game, self.order.append, name)
+                   for game, name in ((a, "a1"), (a, "a2"), (a, "a3"), (b, "b2"))]
+        release.set()
+        for f in futures:
+            f.result()
+        # b的输入执行后切换到a，a执行max_batch个后让给b，b没有输入时再回到a
+        self.assertEqual(["b", "b2", "a1", "a2", "a3"], self.order)
+
+    def test_activate_failure(self) -> None:
+        closed, alive = FakeGame("closed", fail=True), FakeGame("alive")
+        futures = [self.arbiter.submit(closed, self.order.append, i) for i in range(3)]
+        for f in futures:
+            with self.assertRaises(OSError):
+                f.result(timeout=5)
+        self.assertEqual("ok", self.arbiter.submit(alive, lambda: "ok").result(timeout=5))
+        self.assertEqual([], self.order)
+        self.assertEqual(1, alive.activations)
+
+    def test_concurrent_run(self) -> None:
+        # 每个控制器的输入都等待完成后才提交下一个，grace期间不切换前台
+        games = [FakeGame(name) for name in "abc"]
+
+        def worker(game: FakeGame) -> None:
+            for i in range(20):
+                self.arbiter.run(game, self.order.append, game.name)
+        threads = [Thread(target=worker, args=(game,)) for game in games]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(60, len(self.order))
+        self.assertLessEqual(self.arbiter.switches, 6)
+
+    def test_focus(self) -> None:
+        a, b = FakeGame("a"), FakeGame("b")
+        self.arbiter.grace = 0
+        with self.arbiter.focus(a):
+            self.arbiter.run(a, self.order.append, "a1")
+            future = self.arbiter.submit(b, self.order.append, "b1")
+            # 持有焦点期间其他窗口的输入等待
+            self.arbiter.run(a, self.order.append, "a2")
+            self.assertFalse(future.done())
+        future.result(timeout=5)
+        self.assertEqual(["a1", "a2", "b1"], self.order)
+        self.assertEqual(2, self.arbiter.switches)
+
+
+class TestDesktopCapture(unittest.TestCase):
+
+    def test_view(self) -> None:
+        frame = np.arange(20 * 30, dtype=np.uint8).reshape(20, 30)
+        capture = DesktopCapture(clock=VirtualClock(), backend=FakeBackend(frame, origin=(-10, 0)))
+        view = capture.view(0, 5, 10, 10)
+        self.assertEqual(frame[5:10, 10:20].tolist(), view.tolist())
+        self.assertTrue(np.shares_memory(frame, view))
+
+    def test_view_off_desktop(self) -> None:
+        frame = np.full((20, 30, 3), 255, np.uint8)
+        capture = DesktopCapture(clock=VirtualClock(), backend=FakeBackend(frame))
+        view = capture.view(-5, 15, 10, 25)
+        # 超出桌面的部分为黑色，窗口内坐标不偏移
+        self.assertEqual((10, 15, 3), view.shape)
+        self.assertEqual(0, view[0, 0, 0])
+        self.assertEqual(255, view[0, 5, 0])
+        self.assertEqual(0, view[5, 5, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from gamenavigator.core import Interface, Pos
+from gamenavigator.exception import WindowOutOfBoundsError
+from gamenavigator.probe import BarProbe, ProbeSet
+
+img = np.zeros((50, 100, 3), np.uint8)
+img[10, 10] = (40, 200, 250)
+img[20, 0:30] = (30, 30, 200)
+
+
+class TestProbe(unittest.TestCase):
+
+    def test_probe_set(self) -> None:
+        probes = ProbeSet([(Pos(10, 10), (40, 200, 240), 20), (Pos(11, 10), (40, 200, 240), 20)])
+        self.assertEqual([True, False], probes.test(img).tolist())
+        self.assertEqual(False, probes(img))
+        self.assertEqual(True, probes.any(img))
+        self.assertEqual(1, probes.count(img))
+
+    def test_bar(self) -> None:
+        bar = BarProbe(Pos(0, 20), Pos(99, 20), (30, 30, 200), 10)
+        self.assertAlmostEqual(0.3, bar.fill(img))
+        self.assertEqual(False, bar.below(img, 0.3))
+
+    def test_outside(self) -> None:
+        probes = ProbeSet([(Pos(100, 10), (0, 0, 0), 0)])
+        self.assertRaises(WindowOutOfBoundsError, probes.test, img)
+
+    def test_interface_detect(self) -> None:
+        main = Interface("main")
+        shop = Interface("shop")
+        main.add_subinterface(shop, lambda: None)
+        shop.set_detector(ProbeSet([(Pos(10, 10), (40, 200, 250), 0)]))
+        self.assertIs(shop, main.detect(img))
+        self.assertIs(shop, main.current())
+        self.assertIsNone(main.detect(np.zeros_like(img)))
+
+
+if __name__ == '__main__':
+    unittest.main()
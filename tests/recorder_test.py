@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+from threading import Event
+
+import numpy as np
+
+from gamenavigator.recorder import FlightRecorder, load_raw_frames
+
+
+class TestFlightRecorder(unittest.TestCase):
+
+    def test_capacity(self) -> None:
+        recorder = FlightRecorder(capacity=3)
+        for i in range(5):
+            recorder.record_frame(np.full((4, 5, 3), i, np.uint8))
+        self.assertEqual(3, len(recorder))
+        self.assertEqual(3 * 60, recorder.nbytes)
+
+    def test_max_bytes(self) -> None:
+        recorder = FlightRecorder(max_bytes=100)
+        for _ in range(5):
+            recorder.record_frame(np.zeros((4, 5, 3), np.uint8))
+        self.assertEqual(1, len(recorder))
+
+    def test_memmap_bytes(self) -> None:
+        # 帧包中的帧只按帧本身计算，不计算整个文件
+        path = os.path.join(tempfile.mkdtemp(), "frames.npy")
+        np.save(path, np.zeros((50, 4, 5, 3), np.uint8))
+        frames = np.load(path, mmap_mode="r")
+        recorder = FlightRecorder(capacity=10, max_bytes=10 * 60)
+        for frame in frames[:10]:
+            recorder.record_frame(frame)
+        self.assertEqual(10, len(recorder))
+        self.assertEqual(10 * 60, recorder.nbytes)
+        recorder.record_frame(np.asarray(frames[10])[1:3])
+        self.assertEqual(10 * 60 - 60 + 30, recorder.nbytes)
+
+    def test_dump_raw(self) -> None:
+        recorder = FlightRecorder(capacity=2, encoding="raw", min_interval=0)
+        for i in range(3):
+            recorder.record_frame(np.full((4, 5, 3), i, np.uint8))
+            recorder.record_action("click", pos=(i, i))
+            recorder.record_match("button.png", 0.5, (i, i))
+        directory = tempfile.mkdtemp()
+        self.assertEqual(True, recorder.dump(directory))
+        recorder.close()
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.assertEqual([1, 2], [m["index"] for m in meta["frames"]])
+        self.assertEqual("click", meta["frames"][0]["actions"][0]["action"])
+        frames = load_raw_frames(directory)
+        self.assertEqual(2, int(frames[1][0, 0, 0]))
+
+    def test_dump_interval(self) -> None:
+        recorder = FlightRecorder(min_interval=60)
+        recorder.record_frame(np.zeros((4, 5, 3), np.uint8))
+        self.assertEqual(True, recorder.dump(tempfile.mkdtemp()))
+        self.assertEqual(False, recorder.dump(tempfile.mkdtemp()))
+        recorder.close()
+
+    def test_dump_snapshot(self) -> None:
+        release = Event()
+
+        class BlockedRecorder(FlightRecorder):
+            def _write(self, *args) -> None:
+                release.wait()
+                super()._write(*args)
+
+        recorder = BlockedRecorder(encoding="raw", min_interval=0)
+        recorder.record_frame(np.zeros((4, 5, 3), np.uint8))
+        recorder.record_action("click")
+        directory = tempfile.mkdtemp()
+        self.assertEqual(True, recorder.dump(directory))
+        # 导出提交后追加的记录不写入本次导出
+        recorder.record_action("press")
+        recorder.record_match("button.png", 0.5, (1, 1))
+        release.set()
+        recorder.close()
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.assertEqual(["click"], [a["action"] for a in meta["frames"][0]["actions"]])
+        self.assertEqual([], meta["frames"][0]["matches"])
+        self.assertEqual(2, len(recorder._entries[-1].actions))
+
+
+if __name__ == '__main__':
+    unittest.main()
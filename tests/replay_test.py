@@ -0,0 +1,151 @@
+import glob
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from gamenavigator.clock import VirtualClock
+from gamenavigator.core import Pos
+from gamenavigator.exception import TemplateMathingFailure
+from gamenavigator.game_controller import GameController
+from gamenavigator.replay import ReplayGame, ReplayInput
+
+frames = [np.full((20, 30, 3), i, np.uint8) for i in range(5)]
+
+
+screens = [np.full((60, 80, 3), i, np.uint8) for i in range(5)]
+# 文字"开始"所在的OCR多边形(左上、右上、右下、左下)，外接矩形为(10, 20)-(50, 34)
+TEXT_BOX = np.array([[10, 20], [50, 22], [50, 34], [10, 32]], np.float32)
+
+
+def fake_text_position(img: np.ndarray, text: str) -> np.ndarray:
+    """ 画面左上角像素为1时识别到文字 """
+    return TEXT_BOX.copy() if text == "开始" and img[0, 0, 0] == 1 else np.array([])
+
+
+class ClosedGame(ReplayGame):
+    """ 窗口已关闭，无法获取几何信息 """
+
+    def get_rect(self):
+        raise OSError("window is closed")
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_geometry(self) -> None:
+        game = ReplayGame(frames, meta={"rect": [100, 50, 130, 70], "name": "StarRail"})
+        self.assertEqual(30, game.width)
+        self.assertEqual(20, game.height)
+        self.assertEqual((100, 50), (game.top_left.x, game.top_left.y))
+        self.assertEqual("StarRail", game.name)
+
+    def test_input_advance(self) -> None:
+        game = ReplayGame(frames, advance="input")
+        backend = ReplayInput(game)
+        self.assertEqual(0, game.get_screenshot()[0, 0, 0])
+        backend.mouse_click_position(Pos(1, 2))
+        backend.keyboard_press("esc")
+        self.assertEqual(2, game.get_screenshot()[0, 0, 0])
+        self.assertEqual(["mouse_click_position", "keyboard_press"], [a["action"] for a in backend.actions])
+        for _ in range(10):
+            backend.keyboard_press("esc")
+        self.assertEqual(True, game.finished)
+        self.assertEqual(4, game.get_screenshot()[0, 0, 0])
+
+
+class TestReplayController(unittest.TestCase):
+
+    def test_script(self) -> None:
+        # 主菜单点击开始按钮后进入下一个画面，按esc返回
+        rng = np.random.default_rng(1)
+        button = cv2.GaussianBlur(rng.integers(0, 255, (20, 40, 3), dtype=np.uint8), (0, 0), 2)
+        bag = cv2.GaussianBlur(rng.integers(0, 255, (30, 30, 3), dtype=np.uint8), (0, 0), 2)
+        menu = np.zeros((120, 160, 3), np.uint8)
+        menu[60:80, 50:90] = button
+        game_screen = np.zeros((120, 160, 3), np.uint8)
+        game_screen[10:40, 100:130] = bag
+        clock = VirtualClock()
+        game = ReplayGame([menu, game_screen, menu], meta={"rect": [200, 100, 360, 220]}, advance="input",
+                          clock=clock)
+        backend = ReplayInput(game)
+        controller = GameController(None, "replay", game=game, backend=backend, clock=clock)
+
+        result = controller.wait_and_click_image(button, timeout=5)
+        self.assertEqual((50, 60), (result.pos.x, result.pos.y))
+        bag_result = controller.wait_image(bag, timeout=5)[0]
+        self.assertEqual((100, 10), (bag_result.pos.x, bag_result.pos.y))
+        controller.press("esc")
+        self.assertRaises(TimeoutError, controller.wait_image, bag, timeout=3)
+        self.assertEqual([dict(action="mouse_click_position", pos=(270, 170), button="left"),
+                          dict(action="keyboard_press", key="esc")], backend.actions)
+        # 超时等待只推进虚拟时钟
+        self.assertEqual(3.0, clock.time())
+
+    def replay_controller(self, images, timestamps=None):
+        """ 窗口位于(200, 100)的回放控制器 """
+        clock = VirtualClock()
+        game = ReplayGame(images, timestamps=timestamps, meta={"rect": [200, 100, 280, 160]}, clock=clock)
+        backend = ReplayInput(game)
+        controller = GameController(None, "replay", game=game, backend=backend, clock=clock)
+        return controller, backend, clock
+
+    @mock.patch("gamenavigator.game_controller.get_text_position", fake_text_position)
+    def test_wait_text(self) -> None:
+        controller, backend, clock = self.replay_controller(screens, timestamps=[0, 2, 4, 6, 8])
+        result = controller.wait_text("开始", timeout=5, spacing=0.5)
+        self.assertEqual("开始", result.template)
+        self.assertEqual((10, 20), (result.pos.x, result.pos.y))
+        self.assertEqual((40, 14), result.size)
+        self.assertEqual(2.0, clock.time())
+        self.assertRaises(TimeoutError, controller.wait_text, "结束", timeout=1, spacing=0.5)
+
+    @mock.patch("gamenavigator.game_controller.get_text_position", fake_text_position)
+    def test_click_text_position(self) -> None:
+        # wait_and_click_text与click_text点击外接矩形上相同的点
+        controller, backend, clock = self.replay_controller([screens[1]])
+        expected = dict(left=(210, 127), center=(230, 127), right=(250, 127))
+        for position, pos in expected.items():
+            backend.clear()
+            controller.wait_and_click_text("开始", position, timeout=1)
+            controller.click_text("开始", position)
+            self.assertEqual([pos, pos], [a["pos"] for a in backend.actions])
+        self.assertRaises(ValueError, controller.wait_and_click_text, "开始", "top")
+
+    def test_wait_image_all(self) -> None:
+        # all=True时返回同一帧中所有图片的匹配结果
+        rng = np.random.default_rng(3)
+        a, b = (cv2.GaussianBlur(rng.integers(0, 255, (12, 12, 3), dtype=np.uint8), (0, 0), 1.5) for _ in range(2))
+        only_a = np.zeros((60, 80, 3), np.uint8)
+        only_a[5:17, 5:17] = a
+        both = only_a.copy()
+        both[30:42, 50:62] = b
+        controller, backend, clock = self.replay_controller([only_a, both], timestamps=[0, 1])
+        results = controller.wait_image(a, b, all=True, timeout=5, spacing=0.5)
+        self.assertEqual([(5, 5), (50, 30)], [(r.pos.x, r.pos.y) for r in results])
+        self.assertEqual(1, len({r.timestamp for r in results}))
+        self.assertEqual(1.0, clock.time())
+
+    def test_debug_dump_without_window(self) -> None:
+        # 获取窗口信息失败时仍然导出调试记录，并抛出原来的异常
+        clock = VirtualClock()
+        game = ClosedGame(frames, clock=clock)
+        directory = tempfile.mkdtemp()
+        controller = GameController(None, "replay", debug=True, filename=directory, game=game,
+                                    backend=ReplayInput(game), clock=clock)
+        controller.recorder.min_interval = 0
+        template = np.random.default_rng(2).integers(0, 255, (8, 8, 3), dtype=np.uint8)
+        self.assertRaises(TemplateMathingFailure, controller.click_image, template)
+        controller.recorder.close()
+        dumps = glob.glob(os.path.join(directory, "*", "meta.json"))
+        self.assertEqual(1, len(dumps))
+        with open(dumps[0], encoding="utf-8") as f:
+            meta = json.load(f)
+        self.assertEqual(dict(cls=None, name="replay"), meta["game"])
+
+
+if __name__ == '__main__':
+    unittest.main()
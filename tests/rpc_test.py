@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+
+from gamenavigator.clock import VirtualClock
+from gamenavigator.core import Pos, Rect, MatchResult
+from gamenavigator.exception import WindowOutOfBoundsError
+from gamenavigator.game_controller import GameController
+from gamenavigator.replay import ReplayGame, ReplayInput
+from gamenavigator.rpc import ControllerClient, SharedFrame, pack_message, unpack_message
+from gamenavigator.server import ControllerServer
+
+
+class TestProtocol(unittest.TestCase):
+
+    def test_round_trip(self) -> None:
+        value = dict(pos=Pos(1, 2, is_game=True), rect=Rect(0, 0, 3, 4), items=[1, 2.5, "文字", None, True],
+                     result=MatchResult("a", Pos(3, 4), (5, 6), 0.9, 1.0), template=np.eye(3, dtype=np.uint8))
+        message = pack_message(1, 7, value)
+        op, request_id, decoded = unpack_message(message[4:])
+        self.assertEqual((1, 7), (op, request_id))
+        template = decoded.pop("template")
+        self.assertTrue(np.array_equal(np.eye(3, dtype=np.uint8), template))
+        value.pop("template")
+        self.assertEqual(value, decoded)
+
+    def test_shared_frame(self) -> None:
+        writer = SharedFrame(capacity=2 * 3 * 3, slots=2)
+        reader = SharedFrame(writer.name)
+        try:
+            self.assertEqual((0, None), reader.read())
+            seq = writer.publish(np.full((2, 3, 3), 7, np.uint8))
+            read_seq, frame = reader.read()
+            self.assertEqual((1, 7), (read_seq, frame[0, 0, 0]))
+            writer.publish(np.zeros((2, 3), np.uint8))
+            writer.publish(np.zeros((2, 3), np.uint8))
+            self.assertFalse(reader.valid(seq))
+            self.assertEqual(0, writer.publish(np.zeros((9, 9), np.uint8)))
+            del frame
+        finally:
+            reader.close()
+            writer.close()
+
+
+class TestServer(unittest.TestCase):
+
+    def test_remote_controller(self) -> None:
+        clock = VirtualClock()
+        frame = np.zeros((40, 60, 3), np.uint8)
+        template = np.random.RandomState(0).randint(0, 255, (8, 10, 3)).astype(np.uint8)
+        found = frame.copy()
+        found[10:18, 20:30] = template
+        game = ReplayGame([frame, found], timestamps=[0, 2], clock=clock)
+        backend = ReplayInput(game)
+        controller = GameController(game.cls, game.name, game=game, backend=backend, clock=clock)
+        with ControllerServer(controller).start() as server, ControllerClient(server.address) as client:
+            result = client.wait_and_click_image(template, timeout=5, spacing=0.5)
+            self.assertEqual(Pos(20, 10), result.pos)
+            self.assertEqual((25, 14), backend.actions[-1]["pos"])
+            seq, shared = client.frame()
+            self.assertEqual(seq + 1, client.grab())
+            self.assertTrue(np.array_equal(found, shared))
+            del shared
+            self.assertRaises(WindowOutOfBoundsError, client.click_pos, Pos(100, 100))
+            self.assertRaises(AttributeError, client.call, "get_screenshot")
+        self.assertIs(game, controller.game)
+
+    def test_token(self) -> None:
+        clock = VirtualClock()
+        game = ReplayGame([np.zeros((40, 60, 3), np.uint8)], clock=clock)
+        backend = ReplayInput(game)
+        controller = GameController(game.cls, game.name, game=game, backend=backend, clock=clock)
+        self.assertRaises(ValueError, ControllerServer, controller, ("0.0.0.0", 0))
+        with ControllerServer(controller, token="secret").start() as server:
+            self.assertRaises(PermissionError, ControllerClient, server.address)
+            self.assertRaises(PermissionError, ControllerClient, server.address, token="wrong")
+            with ControllerClient(server.address, token="secret") as client:
+                client.press("a")
+        self.assertEqual("a", backend.actions[-1]["key"])
+
+
+if __name__ == '__main__':
+    unittest.main()
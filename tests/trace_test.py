@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+from threading import Thread
+
+from gamenavigator.clock import VirtualClock
+from gamenavigator.trace import Tracer, get_tracer, set_tracer, span
+
+
+class TestTracer(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        set_tracer(None)
+
+    def test_span_args(self) -> None:
+        clock = VirtualClock()
+        tracer = Tracer(clock=clock)
+        set_tracer(tracer)
+        with span("match", "match", template="start") as args:
+            clock.sleep(0.002)
+            args["score"] = 0.93
+        events = [e for e in tracer.events() if e["ph"] != "M"]
+        self.assertEqual(["B", "E"], [e["ph"] for e in events])
+        self.assertEqual({"template": "start"}, events[0]["args"])
+        self.assertEqual({"score": 0.93}, events[1]["args"])
+        self.assertEqual(2000.0, events[1]["ts"] - events[0]["ts"])
+
+    def test_disabled(self) -> None:
+        self.assertIsNone(get_tracer())
+        with span("capture") as args:
+            args["ignored"] = True
+
+    def test_ring_buffer(self) -> None:
+        tracer = Tracer(capacity=5)
+        for i in range(4):
+            with tracer.span(f"step{i}"):
+                pass
+        self.assertEqual(5, len(tracer))
+        self.assertEqual(3, tracer.dropped)
+        # step1的开始事件已被覆盖，其结束事件也不会导出
+        names = [(e["name"], e["ph"]) for e in tracer.events() if e["ph"] != "M"]
+        self.assertEqual([("step2", "B"), ("step2", "E"), ("step3", "B"), ("step3", "E")], names)
+
+    def test_threads_export(self) -> None:
+        tracer = Tracer()
+        thread = Thread(target=lambda: tracer.instant("worker"), name="worker-thread")
+        thread.start()
+        thread.join()
+        tracer.instant("main")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            tracer.export(path)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        names = {e["args"]["name"] for e in data["traceEvents"] if e["ph"] == "M"}
+        self.assertIn("worker-thread", names)
+        self.assertEqual(2, len({e["tid"] for e in data["traceEvents"] if e["ph"] == "i"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+import numpy as np
+
+from gamenavigator.core import Pos, Rect
+from gamenavigator.watcher import ChangeWatcher, PixelWatcher, TemplateWatcher, WatcherSet
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full((20, 30, 3), value, np.uint8)
+
+
+class TestWatcherSet(unittest.TestCase):
+
+    def test_gradual_change(self) -> None:
+        # 每帧只变化2(不超过tolerance)，累积的变化仍然需要重新检查
+        fired = []
+        watchers = WatcherSet(tolerance=2)
+        watchers.add(PixelWatcher(Pos(5, 5), (200, 200, 200), (255, 255, 255), lambda w, f: fired.append(w)))
+        for value in range(0, 255, 2):
+            watchers.evaluate(frame(value))
+        self.assertEqual(1, len(fired))
+
+    def test_once(self) -> None:
+        fired = []
+        watchers = WatcherSet()
+        watchers.add(PixelWatcher(Pos(0, 0), (100, 100, 100), (255, 255, 255), lambda w, f: fired.append(w),
+                                  once=True))
+        watchers.evaluate(frame(200))
+        watchers.evaluate(frame(0))
+        watchers.evaluate(frame(200))
+        self.assertEqual(1, len(fired))
+        self.assertEqual(0, len(watchers))
+
+    def test_edge_trigger(self) -> None:
+        fired = []
+        watchers = WatcherSet()
+        watchers.add(PixelWatcher(Pos(0, 0), (100, 100, 100), (255, 255, 255), lambda w, f: fired.append(w)))
+        for value in (200, 200, 0, 200):
+            watchers.evaluate(frame(value))
+        self.assertEqual(2, len(fired))
+
+    def test_priority(self) -> None:
+        order = []
+        watchers = WatcherSet()
+        for name, priority in (("low", 0), ("high", 10), ("middle", 5)):
+            watchers.add(PixelWatcher(Pos(0, 0), (100, 100, 100), (255, 255, 255),
+                                      lambda w, f: order.append(w.name), priority=priority, name=name))
+        watchers.evaluate(frame(200))
+        self.assertEqual(["high", "middle", "low"], order)
+
+    def test_no_reentrancy(self) -> None:
+        nested = []
+        watchers = WatcherSet()
+
+        def callback(watcher, f):
+            # 回调中再次截图检查不会重复触发
+            nested.append(watchers.evaluate(frame(0)))
+
+        watchers.add(PixelWatcher(Pos(0, 0), (100, 100, 100), (255, 255, 255), callback))
+        watchers.evaluate(frame(200))
+        self.assertEqual([[]], nested)
+
+    def test_change_watcher(self) -> None:
+        fired = []
+        watchers = WatcherSet()
+        watchers.add(ChangeWatcher(lambda w, f: fired.append(w), Rect(0, 0, 10, 10), threshold=8.0))
+        watchers.evaluate(frame(0))
+        watchers.evaluate(frame(5))
+        self.assertEqual(0, len(fired))
+        watchers.evaluate(frame(50))
+        self.assertEqual(1, len(fired))
+
+    def test_pixel_outside_frame(self) -> None:
+        fired = []
+        watchers = WatcherSet()
+        watchers.add(PixelWatcher(Pos(100, 100), (0, 0, 0), (255, 255, 255), lambda w, f: fired.append(w)))
+        watchers.evaluate(frame(200))
+        self.assertEqual(0, len(fired))
+
+
+def icon() -> np.ndarray:
+    """ 灰色背景，中心为红色的16x16图标 """
+    image = np.full((16, 16, 3), 60, np.uint8)
+    image[4:12, 4:12] = (0, 0, 255)
+    return image
+
+
+def screen(pos=None) -> np.ndarray:
+    image = np.full((1080, 1920, 3), 60, np.uint8)
+    if pos is not None:
+        image[pos.y:pos.y + 16, pos.x:pos.x + 16] = icon()
+    return image
+
+
+class TestTemplateWatcher(unittest.TestCase):
+
+    def test_appear(self) -> None:
+        # 整个窗口中出现的小图标不会因为区域缩小而被忽略
+        fired = []
+        watchers = WatcherSet()
+        watchers.add(TemplateWatcher(icon(), lambda w, f: fired.append(w)))
+        watchers.evaluate(screen())
+        watchers.evaluate(screen())
+        self.assertEqual(0, len(fired))
+        watchers.evaluate(screen(Pos(900, 500)))
+        self.assertEqual(1, len(fired))
+
+    def test_disappear(self) -> None:
+        fired = []
+        watchers = WatcherSet()
+        watchers.add(TemplateWatcher(icon(), lambda w, f: fired.append(w), appear=False))
+        watchers.evaluate(screen(Pos(100, 100)))
+        self.assertEqual(0, len(fired))
+        watchers.evaluate(screen())
+        self.assertEqual(1, len(fired))
+
+    def test_roi(self) -> None:
+        fired = []
+        watchers = WatcherSet()
+        watchers.add(TemplateWatcher(icon(), lambda w, f: fired.append(w), roi=Rect(0, 0, 200, 200)))
+        watchers.evaluate(screen(Pos(900, 500)))
+        self.assertEqual(0, len(fired))
+        watchers.evaluate(screen(Pos(50, 60)))
+        self.assertEqual(1, len(fired))
+
+
+if __name__ == '__main__':
+    unittest.main()